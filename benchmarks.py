@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmarks - SPY, QQQ y ETFs sectoriales cargados una vez por ejecución
+=======================================================================
+
+📦 Conjunto configurable (BENCHMARK_SYMBOLS, SECTOR_BENCHMARKS) descargado en un solo lote
+   a través del data fetcher: con la caché al día, 0 requests
+📐 Matriz de rendimientos benchmarks x horizontes (20d/60d/90d) precalculada al cargar
+🗂️ Sector -> ETF SPDR (nombres de NASDAQ y de Yahoo): outperformance de cada acción contra
+   su sector además de contra SPY, sin requests por acción
+🛟 Benchmark ausente o con histórico corto: se omite (SPY cae a DEFAULT_BENCHMARK)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from screening_core import DEFAULT_BENCHMARK, compute_period_returns
+
+PRIMARY_BENCHMARK = 'SPY'
+HORIZONS = (20, 60, 90)
+RETURN_KEYS = tuple(f'return_{days}d' for days in HORIZONS)
+LOAD_WORKERS = 4
+
+# Sector (NASDAQ screener o ticker.info de Yahoo) -> ETF Select Sector SPDR
+SECTOR_ETFS = {
+    'Technology': 'XLK',
+    'Health Care': 'XLV',
+    'Healthcare': 'XLV',
+    'Finance': 'XLF',
+    'Financial Services': 'XLF',
+    'Energy': 'XLE',
+    'Consumer Discretionary': 'XLY',
+    'Consumer Cyclical': 'XLY',
+    'Consumer Staples': 'XLP',
+    'Consumer Defensive': 'XLP',
+    'Industrials': 'XLI',
+    'Basic Materials': 'XLB',
+    'Real Estate': 'XLRE',
+    'Utilities': 'XLU',
+    'Telecommunications': 'XLC',
+    'Communication Services': 'XLC',
+}
+
+
+def configured_benchmarks():
+    """SPY + BENCHMARK_SYMBOLS (QQQ por defecto) + ETFs sectoriales salvo SECTOR_BENCHMARKS=false"""
+    extra = os.environ.get('BENCHMARK_SYMBOLS', 'QQQ')
+    symbols = [PRIMARY_BENCHMARK] + [s.strip().upper() for s in extra.split(',') if s.strip()]
+    if os.environ.get('SECTOR_BENCHMARKS', 'true').lower() != 'false':
+        symbols += SECTOR_ETFS.values()
+    return list(dict.fromkeys(symbols))
+
+
+class BenchmarkSet:
+    """Rendimientos por horizonte de todos los benchmarks (una fila por benchmark)"""
+
+    def __init__(self, returns_by_symbol):
+        self.symbols = list(returns_by_symbol)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.returns = np.array([[returns_by_symbol[s][key] for key in RETURN_KEYS] for s in self.symbols],
+                                dtype=float).reshape(len(self.symbols), len(HORIZONS))
+
+    @classmethod
+    def load(cls, fetch_history, symbols=None, period='6mo'):
+        """fetch_history(símbolo, period) -> DataFrame; los benchmarks se piden en paralelo"""
+        symbols = symbols or configured_benchmarks()
+
+        def returns_of(symbol):
+            try:
+                return compute_period_returns(fetch_history(symbol, period=period))
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+            loaded = dict(zip(symbols, executor.map(returns_of, symbols)))
+        return cls({symbol: returns for symbol, returns in loaded.items() if returns is not None})
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def returns_of(self, symbol):
+        """{'return_20d': ..., 'return_60d': ..., 'return_90d': ...} o None si no se cargó"""
+        row = self.index.get(symbol)
+        if row is None:
+            return None
+        return {key: float(value) for key, value in zip(RETURN_KEYS, self.returns[row])}
+
+    def primary(self):
+        """Rendimientos de SPY (DEFAULT_BENCHMARK si no se pudo cargar)"""
+        return self.returns_of(PRIMARY_BENCHMARK) or dict(DEFAULT_BENCHMARK)
+
+    def sector_benchmark(self, sector):
+        """ETF del sector si está cargado (None: sector desconocido o ETF no disponible)"""
+        etf = SECTOR_ETFS.get(sector)
+        return etf if etf in self.index else None
+
+    def outperformance(self, stock_returns, benchmark):
+        """Rendimiento de la acción menos el del benchmark en cada horizonte (None si no está)"""
+        row = self.index.get(benchmark)
+        if row is None:
+            return None
+        stock = np.array([stock_returns[key] for key in RETURN_KEYS], dtype=float)
+        return {key: float(value) for key, value in zip(RETURN_KEYS, stock - self.returns[row])}
+
+    def context(self):
+        """Rendimientos de todos los benchmarks (para benchmark_context del JSON de resultados)"""
+        return {symbol: {f'{days}d': round(float(value), 2) for days, value in zip(HORIZONS, self.returns[i])}
+                for i, symbol in enumerate(self.symbols)}
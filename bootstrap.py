@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Bootstrap - Arranque concurrente con grafo de dependencias
+==========================================================
+
+🕸️ Cada tarea empieza en cuanto terminan sus dependencias (sin esperar a las demás)
+⏱️ Timeout común (BOOTSTRAP_TIMEOUT_SECONDS) + timeout propio opcional por tarea
+🛟 Error o timeout: se usa el fallback de la tarea y las dependientes siguen con ese valor
+📋 summary(): segundos y estado (ok / error / timeout) por tarea, para run_metrics.json
+🪶 Solo stdlib: lo usan también los subcomandos ligeros (rotación)
+
+Uso:
+    boot = Bootstrap()
+    boot.add('nyse', fetch_nyse, fallback=list, timeout=45)
+    boot.add('nasdaq', fetch_nasdaq, fallback=list, timeout=45)
+    boot.add('universe', merge, deps=('nyse', 'nasdaq'), fallback=backup_symbols)
+    results = boot.run()
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+BOOTSTRAP_TIMEOUT = float(os.environ.get('BOOTSTRAP_TIMEOUT_SECONDS', '300'))
+
+
+class Bootstrap:
+    """Tareas de arranque independientes en paralelo; el resultado de una alimenta a sus dependientes"""
+
+    def __init__(self, timeout=BOOTSTRAP_TIMEOUT, clock=time.monotonic):
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.clock = clock
+        self.tasks = {}
+        self.report = {}
+        self.seconds = None
+
+    def add(self, name, func, deps=(), timeout=None, fallback=None):
+        """func(*resultados de deps); fallback() da el valor si falla o vence su timeout"""
+        unknown = [dep for dep in deps if dep not in self.tasks]
+        if unknown:
+            raise ValueError(f"Dependencias no registradas para '{name}': {', '.join(unknown)}")
+        self.tasks[name] = {'func': func, 'deps': tuple(deps), 'timeout': timeout, 'fallback': fallback}
+        return self
+
+    def _resolve(self, results, name, started, status, value=None, error=None):
+        if status != 'ok':
+            fallback = self.tasks[name]['fallback']
+            value = fallback() if fallback is not None else None
+        results[name] = value
+        self.report[name] = {'seconds': round(self.clock() - started, 3), 'status': status}
+        if error is not None:
+            self.report[name]['error'] = error
+
+    def run(self):
+        """Ejecuta el grafo completo y devuelve {tarea: resultado o fallback}"""
+        results = {}
+        self.report = {}
+        run_started = self.clock()
+        deadline = run_started + self.timeout if self.timeout else None
+        waiting = list(self.tasks)
+        running = {}  # future -> (tarea, inicio, vencimiento)
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.tasks)), thread_name_prefix='bootstrap')
+
+        def launch_ready():
+            for name in [n for n in waiting if all(dep in results for dep in self.tasks[n]['deps'])]:
+                waiting.remove(name)
+                task = self.tasks[name]
+                started = self.clock()
+                expiry = min(filter(None, (deadline, started + task['timeout'] if task['timeout'] else None)),
+                             default=None)
+                future = executor.submit(task['func'], *(results[dep] for dep in task['deps']))
+                running[future] = (name, started, expiry)
+
+        try:
+            launch_ready()
+            while running:
+                expiries = [expiry for _, _, expiry in running.values() if expiry is not None]
+                wait_seconds = max(0.0, min(expiries) - self.clock()) if expiries else None
+                done, _ = wait(list(running), timeout=wait_seconds, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, started, _ = running.pop(future)
+                    try:
+                        self._resolve(results, name, started, 'ok', value=future.result())
+                    except Exception as e:
+                        self._resolve(results, name, started, 'error', error=str(e))
+
+                # Vencidas: el hilo sigue hasta su propio timeout de red, pero ya no se le espera
+                now = self.clock()
+                for future, (name, started, expiry) in list(running.items()):
+                    if expiry is not None and now >= expiry:
+                        running.pop(future)
+                        self._resolve(results, name, started, 'timeout')
+                launch_ready()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.seconds = round(self.clock() - run_started, 3)
+        return results
+
+    def degraded(self):
+        """Tareas que acabaron en fallback"""
+        return [name for name, entry in self.report.items() if entry['status'] != 'ok']
+
+    def summary(self):
+        tasks = {name: self.report[name] for name in self.tasks if name in self.report}  # Orden de registro
+        return {'seconds': self.seconds, 'timeout_seconds': self.timeout, 'tasks': tasks}
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Bot Logging - Logger con niveles y salida no bloqueante
+=======================================================
+
+🧵 QueueHandler: los workers solo encolan, un único hilo escribe en stdout
+💤 Formateo perezoso: logger.debug("... %s", x) no formatea si el nivel está apagado
+🤫 Modo silencioso (QUIET_MODE=true): solo línea de progreso + resumen final
+
+Niveles: DEBUG (detalle por símbolo) < INFO < PROGRESS (progreso/resumen) < WARNING
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+PROGRESS = 25  # Entre INFO y WARNING: visible también en modo silencioso
+logging.addLevelName(PROGRESS, 'PROGRESS')
+
+ROOT_LOGGER_NAME = 'trading_bot'
+
+_listener = None
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que no formatea en el hilo emisor (lo hace el listener)"""
+
+    def prepare(self, record):
+        # Solo materializar tracebacks: el resto (msg % args) se formatea al escribir
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def setup_logging(level=None, quiet=None, stream=None):
+    """
+    Configura el logger raíz del bot (idempotente)
+    - level: nombre o número de nivel (por defecto LOG_LEVEL o INFO)
+    - quiet: modo producción, solo PROGRESS y superiores (por defecto QUIET_MODE)
+    """
+    global _listener
+
+    if quiet is None:
+        quiet = _env_flag('QUIET_MODE')
+
+    if level is None:
+        level = os.environ.get('LOG_LEVEL', 'INFO')
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    if quiet:
+        level = max(level, PROGRESS)
+
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    logger.setLevel(level)
+    logger.propagate = False
+
+    if _listener is None:
+        log_queue = queue.SimpleQueue()
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(logging.Formatter('%(message)s'))
+
+        logger.handlers = [LazyQueueHandler(log_queue)]
+        _listener = logging.handlers.QueueListener(log_queue, output)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+    return logger
+
+
+def shutdown_logging():
+    """Vacía la cola y detiene el hilo escritor"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logging.getLogger(ROOT_LOGGER_NAME).handlers = []
+
+
+def get_logger(name):
+    """Logger hijo del bot: get_logger('screener') -> trading_bot.screener"""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
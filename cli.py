@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Trading Bot CLI - Punto de entrada único con arranque rápido
+============================================================
+
+🚀 Subcomandos: screen, delta, consistency, consistency-state, rotate, report, verify, commit-msg, session, sweep, exits,
+   outcomes, daemon
+🪶 Cada subcomando importa SOLO su módulo (pandas/yfinance solo para `screen`)
+⏱️ Tiempo de arranque por subcomando vigilado por verify_startup.py
+
+Uso:
+    python cli.py screen --quiet
+    python cli.py verify all
+    python cli.py commit-msg
+    python cli.py consistency-state rebuild
+    python cli.py rotate --portfolios portfolios/
+    python cli.py sweep --grid sweep_grid.json --workers 4
+    python cli.py daemon --interval 30 --port 8765
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+# subcomando -> (módulo, función, descripción)
+COMMANDS = {
+    'screen': ('conservative_screener', 'main', 'Screening de momentum (pandas/yfinance)'),
+    'delta': ('result_delta', 'main', 'Cambios del screening vs la ejecución anterior (screening_delta.json)'),
+    'consistency': ('consistency_analyzer', 'main', 'Análisis de consistencia diaria'),
+    'consistency-state': ('consistency_state', 'main', 'Estado incremental de consistencia (rebuild | show)'),
+    'rotate': ('rotation_recommender', 'main', 'Recomendaciones de rotación de cartera'),
+    'report': ('create_weekly_report', 'main', 'Reporte y data.json del dashboard'),
+    'commit-msg': ('generate_commit_message', 'generate_commit_message', 'Mensaje de commit automático'),
+    'session': ('market_calendar', 'main', '¿Hay sesión NYSE nueva desde el último screening?'),
+    'sweep': ('parameter_sweep', 'main', 'Barrido de parámetros sobre price_cache/ (args de parameter_sweep.py)'),
+    'exits': ('exit_simulator', 'main', 'Simulación de stops/trailing/take-profit de posiciones y recomendaciones'),
+    'outcomes': ('pick_outcomes', 'main', 'Rentabilidad 5/10/21d, stop vs take-profit y MAE/MFE de las recomendaciones archivadas'),
+    'daemon': ('screening_daemon', 'main', 'Screener residente: cachés en memoria, re-screening periódico y HTTP local'),
+}
+
+# verify <target> -> (módulo, función)
+VERIFY_TARGETS = {
+    'consistency': ('verify_consistency', 'verify_consistency'),
+    'rotation': ('verify_rotation', 'verify_rotation'),
+    'dashboard': ('verify_dashboard', 'verify_dashboard'),
+    'files': ('verify_generated_files', 'verify_generated_files'),
+    'startup': ('verify_startup', 'verify_startup'),
+}
+
+# Módulos que NO deben cargarse en los subcomandos ligeros
+HEAVY_MODULES = ('pandas', 'numpy', 'yfinance', 'requests')
+LIGHT_COMMANDS = ('delta', 'consistency', 'consistency-state', 'rotate', 'report', 'verify', 'commit-msg', 'session')
+
+
+def load_command(module_name, function_name):
+    """Importa el módulo del subcomando bajo demanda y devuelve su función"""
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+
+def _exit_code(result):
+    # Las funciones main() devuelven None; las de verificación devuelven bool
+    return 1 if result is False else 0
+
+
+def run_command(args):
+    if args.command == 'verify':
+        targets = list(VERIFY_TARGETS) if args.target == 'all' else [args.target]
+        if args.target == 'all':
+            targets.remove('startup')  # Lanza subprocesos: solo bajo petición explícita
+        failed = [t for t in targets if _exit_code(load_command(*VERIFY_TARGETS[t])()) != 0]
+        if failed:
+            print(f"❌ Verificaciones fallidas: {', '.join(failed)}")
+        return 1 if failed else 0
+
+    if args.command == 'screen':
+        # bot_logging lee el entorno al configurarse dentro de main()
+        if args.quiet:
+            os.environ['QUIET_MODE'] = 'true'
+        if args.log_level:
+            os.environ['LOG_LEVEL'] = args.log_level
+
+    module_name, function_name, _ = COMMANDS[args.command]
+    if args.command == 'sweep':
+        return _exit_code(load_command(module_name, function_name)(args.sweep_args))
+    if args.command == 'consistency-state':
+        return load_command(module_name, function_name)([args.action])
+    if args.command == 'rotate':
+        rotate_args = ['--portfolios', args.portfolios] if args.portfolios else []
+        if args.output_dir:
+            rotate_args += ['--output-dir', args.output_dir]
+        return _exit_code(load_command(module_name, function_name)(rotate_args))
+    if args.command == 'daemon':
+        daemon_args = ['--interval', str(args.interval)] if args.interval else []
+        if args.port:
+            daemon_args += ['--port', str(args.port)]
+        if args.once:
+            daemon_args.append('--once')
+        return _exit_code(load_command(module_name, function_name)(daemon_args))
+    return _exit_code(load_command(module_name, function_name)())
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description='Trading bot: screening diario, consistencia, rotación y reporte'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = True
+
+    for name, (_, _, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if name == 'screen':
+            subparser.add_argument('--quiet', action='store_true',
+                                   help='Solo progreso y resumen final (QUIET_MODE)')
+            subparser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'PROGRESS', 'WARNING', 'ERROR'],
+                                   help='Nivel de logs (LOG_LEVEL)')
+        if name == 'consistency-state':
+            subparser.add_argument('action', nargs='?', default='show', choices=['rebuild', 'show'],
+                                   help='rebuild: reconstruye desde weekly_screening_results_*.json')
+        if name == 'rotate':
+            subparser.add_argument('--portfolios', help='Directorio con varias carteras *.json (modo batch)')
+            subparser.add_argument('--output-dir', help='Destino de las recomendaciones en modo batch')
+        if name == 'daemon':
+            subparser.add_argument('--interval', type=float, help='Minutos entre screenings (DAEMON_INTERVAL_MINUTES)')
+            subparser.add_argument('--port', type=int, help='Puerto HTTP local (DAEMON_PORT)')
+            subparser.add_argument('--once', action='store_true', help='Un screening y salir')
+
+    verify_parser = subparsers.add_parser('verify', help='Verificaciones de los JSON generados')
+    verify_parser.add_argument('target', nargs='?', default='all',
+                               choices=list(VERIFY_TARGETS) + ['all'],
+                               help='Qué verificar (por defecto: all, sin startup)')
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    # `sweep` reenvía el resto de argumentos a parameter_sweep.py
+    args, extra_args = parser.parse_known_args(argv)
+    if extra_args and args.command != 'sweep':
+        parser.error(f"argumentos no reconocidos: {' '.join(extra_args)}")
+    args.sweep_args = extra_args
+    return run_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,10 +8,8 @@ Conservative Stock Screener with MA50 Stop Loss Bonus - OPTIMIZED VERSION
 🎯 OBJETIVO: 3x más rápido, mismo resultado local vs GitHub Actions
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import requests
 import time
 from datetime import datetime, timedelta
 import json
@@ -20,91 +18,78 @@ from typing import Dict, List, Optional, Any
 import math
 import glob
 import random
-from requests.adapters import HTTPAdapter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from run_metrics import RunMetrics
+from symbol_utils import normalize_symbol, quick_filter_symbol
+from price_cache import PRICE_CACHE_DIR, PriceCache
+from data_providers import create_data_provider
+from http_session import create_requests_session
+from market_calendar import force_run, has_new_session, latest_completed_session
+from symbol_quarantine import SymbolQuarantine
+from sector_strength import SectorMap, aggregate_sectors
+from memory_budget import (MEMORY_CHUNK_SYMBOLS, MemoryTracker, ResultSpill, memory_budget_mb,
+                           write_json_streaming)
+from work_queue import AdaptiveConcurrency, chunk, run_work_queue
+from screening_scheduler import PRIORITY_FILE, TIERS, PassHistory, ScreeningScheduler, budget_seconds_from_env
+from indicator_state import IndicatorStateStore
+from benchmarks import PRIMARY_BENCHMARK, BenchmarkSet
+from bootstrap import Bootstrap
+from screening_core import (DEFAULT_BENCHMARK, compute_fundamental_score,
+                            compute_period_returns, compute_weekly_atr, passes_param_filters,
+                            relative_strength_percentiles, score_components)
+from bot_logging import PROGRESS, get_logger, setup_logging, shutdown_logging
 
-# Importación compatible de Retry
-try:
-    from urllib3.util.retry import Retry
-    RETRY_AVAILABLE = True
-except ImportError:
-    RETRY_AVAILABLE = False
+logger = get_logger('screener')
 
-def quick_filter_symbol(symbol):
-    """Filtro rápido para descartar símbolos obvios sin requests pesados"""
-    if not symbol or len(symbol) > 6:
-        return False
-    
-    # Skip símbolos problemáticos conocidos
-    problem_patterns = ['^', '.PK', '.OB', 'WARR', 'TEST']
-    for pattern in problem_patterns:
-        if pattern in symbol:
-            return False
-    
-    # Skip penny stocks típicos por patrones de nombre
-    if len(symbol) >= 4 and symbol.endswith(('Q', 'E', 'F')):
-        return False
-        
-    return True
+# 🧵 Concurrencia del screener: inicial y rango del ajuste automático (el máximo dimensiona el pool Yahoo)
+SCREENER_WORKERS = int(os.environ.get('SCREENER_WORKERS', '5'))
+SCREENER_MIN_WORKERS = int(os.environ.get('SCREENER_MIN_WORKERS', '1'))
+SCREENER_MAX_WORKERS = max(SCREENER_WORKERS, int(os.environ.get('SCREENER_MAX_WORKERS', '8')))
+# 🧺 Símbolos por elemento de la cola compartida (1 = reparto por símbolo)
+SCREENER_BATCH_SIZE = max(1, int(os.environ.get('SCREENER_BATCH_SIZE', '1')))
+# 🕸️ Espera máxima por exchange en el arranque (2 intentos de 15 s + pausas); vencida: lista vacía
+EXCHANGE_TIMEOUT = 45
+
+def is_rate_limit_error(error):
+    """Detecta errores de rate limiting (429) lanzados por yfinance/requests"""
+    text = f"{type(error).__name__} {error}"
+    return 'RateLimit' in text or 'Too Many Requests' in text or '429' in text
+
+def is_network_error(error):
+    """Timeouts y cortes de conexión (requests, curl_cffi, socket): fallo de red, no del símbolo"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ('timeout', 'timed out', 'connect', 'ssl', 'reset by peer',
+                                             'name resolution', 'temporarily unavailable'))
+
+def request_error_outcome(error):
+    """Resultado de un request fallido para métricas y cuarentena: http_429, network o exception"""
+    if is_rate_limit_error(error):
+        return 'http_429'
+    return 'network' if is_network_error(error) else 'exception'
 
 class RobustDataFetcher:
     """Clase optimizada para obtener datos con balance velocidad/robustez"""
     
-    def __init__(self):
+    def __init__(self, metrics=None, cache=None, market_session=None, quarantine=None, provider=None,
+                 pool_size=SCREENER_MAX_WORKERS):
         self.session = self._create_robust_session()
         self.request_count = 0
         self.last_request_time = 0
+        self.metrics = metrics if metrics is not None else RunMetrics()
+        self.cache = cache  # 💾 PriceCache opcional (write-through)
+        self.market_session = market_session  # 📅 Última sesión NYSE completada
+        self.quarantine = quarantine  # 🪦 SymbolQuarantine opcional (símbolos muertos)
+        # 🔀 Yahoo (sesión compartida con pool = concurrencia) o dataset local
+        self.provider = provider if provider is not None else create_data_provider(pool_size, self.metrics)
+        # 🔥 Modo daemon: cachés en memoria entre ejecuciones (screening_daemon.ResidentCaches)
+        self.resident = None
         
     def _create_robust_session(self):
-        """Crea sesión HTTP robusta - COMPATIBILIDAD MÁXIMA"""
-        session = requests.Session()
-        
-        # Solo usar retry automático si está disponible
-        if RETRY_AVAILABLE:
-            try:
-                try:
-                    # Intentar con parámetros nuevos (urllib3 >= 1.26)
-                    retry_strategy = Retry(
-                        total=2,  # Reducido para velocidad
-                        status_forcelist=[429, 500, 502, 503, 504],
-                        allowed_methods=["HEAD", "GET", "OPTIONS"],
-                        backoff_factor=0.5  # Más rápido
-                    )
-                except TypeError:
-                    try:
-                        # Fallback para urllib3 < 1.26
-                        retry_strategy = Retry(
-                            total=2,
-                            status_forcelist=[429, 500, 502, 503, 504],
-                            method_whitelist=["HEAD", "GET", "OPTIONS"],
-                            backoff_factor=0.5
-                        )
-                    except:
-                        # Fallback mínimo
-                        retry_strategy = Retry(
-                            total=2,
-                            status_forcelist=[429, 500, 502, 503, 504],
-                            backoff_factor=0.5
-                        )
-                
-                adapter = HTTPAdapter(max_retries=retry_strategy)
-                session.mount("http://", adapter)
-                session.mount("https://", adapter)
-                
-            except Exception:
-                pass  # Continuar sin retry automático
-        
-        # Headers optimizados
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
-        
-        return session
+        """Crea sesión HTTP robusta (retry + keep-alive) para la API de NASDAQ"""
+        return create_requests_session()
     
     def _smart_delay(self):
         """Delay optimizado - 3x más rápido que versión anterior"""
@@ -113,97 +98,184 @@ class RobustDataFetcher:
         
         # Rate limiting: 3 requests por segundo (vs 1 anterior)
         time_since_last = current_time - self.last_request_time
+        waited = 0.0
         if time_since_last < 0.33:  # 0.33s = ~3 req/sec
             sleep_time = 0.33 - time_since_last + random.uniform(0.02, 0.08)
             time.sleep(sleep_time)
+            waited += sleep_time
         
         # Solo delay largo cada 100 requests
         if self.request_count % 100 == 0:
-            time.sleep(random.uniform(0.5, 1.0))
+            long_pause = random.uniform(0.5, 1.0)
+            time.sleep(long_pause)
+            waited += long_pause
         
+        self.metrics.add_rate_limit_wait(waited)
         self.last_request_time = time.time()
     
     def robust_yfinance_history(self, symbol, period="6mo", max_retries=2):
         """Obtiene datos históricos - OPTIMIZADO para velocidad"""
+        if self.resident is None:
+            return self._fetch_history(symbol, period, max_retries)
+        
+        # 🔥 Residente en memoria para la misma sesión: ni disco ni red
+        key = (symbol, period, self.market_session)
+        hist = self.resident.history.get(key)
+        if hist is not None:
+            self.metrics.count('history', 'memory_hits')
+            return hist
+        hist = self._fetch_history(symbol, period, max_retries)
+        if len(hist) > 50:
+            self.resident.history.put(key, hist)
+        return hist
+    
+    def _fetch_history(self, symbol, period, max_retries):
+        # 📅 Si la caché ya cubre la última sesión completada no hay nada nuevo que descargar
+        if self.cache is not None and self.market_session is not None:
+            cached = self.cache.load_covering_history(symbol, self.market_session, period)
+            if cached is not None and len(cached) > 50:
+                self.metrics.count('history', 'cache_hits')
+                return cached
+        
+        failure_type = 'empty'
+        max_retries = max_retries if self.provider.remote else 1  # En disco reintentar no cambia nada
         for attempt in range(max_retries):
+            if attempt > 0:
+                self.metrics.count('history', 'retries')
+            start = time.perf_counter()
             try:
-                self._smart_delay()
+                if self.provider.remote:
+                    self._smart_delay()
                 
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period, timeout=15)  # Timeout reducido
+                start = time.perf_counter()
+                hist = self.provider.history(symbol, period)
                 
                 if len(hist) > 50:
+                    self.metrics.observe_request('history', time.perf_counter() - start, 'ok')
+                    if self.cache is not None:
+                        self.cache.store_history(symbol, hist, complete_through=self.market_session)
+                    if self.quarantine is not None:
+                        self.quarantine.record_success(symbol)
                     return hist
                 
+                self.metrics.observe_request('history', time.perf_counter() - start, 'empty')
+                failure_type = 'short_history' if len(hist) > 0 else 'empty'
                 if attempt < max_retries - 1:
                     time.sleep(0.5 + random.uniform(0.1, 0.3))
                 
-            except Exception:
+            except Exception as e:
+                outcome = request_error_outcome(e)
+                self.metrics.observe_request('history', time.perf_counter() - start, outcome)
+                failure_type = outcome
                 if attempt == max_retries - 1:
-                    return pd.DataFrame()
+                    break
                 else:
                     time.sleep(0.5 + random.uniform(0.1, 0.5))
         
+        self.metrics.count('history', 'gave_up')
+        if self.quarantine is not None:
+            self.quarantine.record_failure(symbol, failure_type, attempts=max_retries)
         return pd.DataFrame()
     
     def robust_yfinance_info(self, symbol, max_retries=2):
         """Obtiene info fundamental - OPTIMIZADO"""
+        if self.resident is None:
+            return self._fetch_info(symbol, max_retries)
+        
+        # 🔥 ticker.info cambia poco: residente hasta su TTL
+        info = self.resident.info.get(symbol)
+        if info is not None:
+            self.metrics.count('info', 'memory_hits')
+            return info
+        info = self._fetch_info(symbol, max_retries)
+        if info:
+            self.resident.info.put(symbol, info)
+        return info
+    
+    def _fetch_info(self, symbol, max_retries):
+        max_retries = max_retries if self.provider.remote else 1
         for attempt in range(max_retries):
+            if attempt > 0:
+                self.metrics.count('info', 'retries')
+            start = time.perf_counter()
             try:
-                self._smart_delay()
+                if self.provider.remote:
+                    self._smart_delay()
                 
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
+                start = time.perf_counter()
+                info = self.provider.info(symbol)
                 
                 if info and isinstance(info, dict) and len(info) > 3:
+                    self.metrics.observe_request('info', time.perf_counter() - start, 'ok')
+                    if self.cache is not None:
+                        self.cache.store_info(symbol, info)
                     return info
                 
+                self.metrics.observe_request('info', time.perf_counter() - start, 'empty')
                 if attempt < max_retries - 1:
                     time.sleep(0.5 + random.uniform(0.1, 0.3))
                 
-            except Exception:
+            except Exception as e:
+                outcome = request_error_outcome(e)
+                self.metrics.observe_request('info', time.perf_counter() - start, outcome)
                 if attempt == max_retries - 1:
+                    self.metrics.count('info', 'gave_up')
                     return {}
                 else:
                     time.sleep(0.5 + random.uniform(0.1, 0.5))
         
+        self.metrics.count('info', 'gave_up')
         return {}
     
-    def robust_api_request(self, url, headers=None, params=None, max_retries=2):
+    def robust_api_request(self, url, headers=None, params=None, max_retries=2, endpoint='nasdaq_api'):
         """Request HTTP optimizado"""
         for attempt in range(max_retries):
+            if attempt > 0:
+                self.metrics.count(endpoint, 'retries')
+            start = time.perf_counter()
             try:
                 self._smart_delay()
                 
+                start = time.perf_counter()
                 response = self.session.get(
                     url, 
                     headers=headers, 
                     params=params, 
                     timeout=15
                 )
+                elapsed = time.perf_counter() - start
                 
                 if response.status_code == 200:
+                    self.metrics.observe_request(endpoint, elapsed, 'ok')
                     return response
                 elif response.status_code == 429:
+                    self.metrics.observe_request(endpoint, elapsed, 'http_429')
                     time.sleep(1.0 + random.uniform(0.5, 1.5))
                 else:
+                    self.metrics.observe_request(endpoint, elapsed, 'http_error')
                     if attempt < max_retries - 1:
                         time.sleep(0.5 + random.uniform(0.2, 0.8))
                 
-            except Exception:
+            except Exception as e:
+                outcome = request_error_outcome(e)
+                self.metrics.observe_request(endpoint, time.perf_counter() - start, outcome)
                 if attempt == max_retries - 1:
+                    self.metrics.count(endpoint, 'gave_up')
                     return None
                 else:
                     time.sleep(0.5 + random.uniform(0.2, 1.0))
         
+        self.metrics.count(endpoint, 'gave_up')
         return None
 
 class MomentumResponsiveScreener:
     def __init__(self):
         self.stock_symbols = []
         self.spy_benchmark = None
+        self.benchmarks = None
         self.max_allowed_risk = 10.0  # 🛡️ SAGRADO: Máximo 10% de riesgo
         self.rr_weight = 12.0  # Peso R/R en score final
+        self.rr_bonus_weight = 0.8  # Peso efectivo del RR bonus en el score final
         
         # PARÁMETROS PARA MOMENTUM AGRESIVO
         self.momentum_20d_weight = 0.7   # 70% peso al momentum 20d
@@ -214,34 +286,150 @@ class MomentumResponsiveScreener:
         self.min_outperf_20d = 5.0       # Era 2% - más agresivo
         self.min_outperf_60d = 0.0       # Era 5% - solo evitar losers obvios
         
+        # 📊 FUERZA RELATIVA vs UNIVERSO: percentil mínimo antes de pedir fundamentales (0 = sin filtro)
+        self.min_rs_percentile = float(os.environ.get('MIN_RS_PERCENTILE', '0'))
+        
         # 🌟 NUEVO: BONUS ESPECIAL PARA REBOTE MA50
         self.ma50_stop_bonus = 22  # 22 puntos extra por rebote MA50
         
-        # 🔧 Data fetcher optimizado
-        self.data_fetcher = RobustDataFetcher()
+        # ⏱️ Telemetría de la ejecución (run_metrics.json)
+        self.metrics = RunMetrics()
         
-        print(f"🚀 Screener inicializado - BONUS MA50: +{self.ma50_stop_bonus} pts")
-        print(f"⚡ Optimizaciones: Paralelización (5 threads) + Rate limiting (3 req/sec)")
-        print(f"🌟 MA50 Bonus: Se aplica cuando MA50 es el stop loss óptimo seleccionado")
-    
-    def get_nyse_nasdaq_symbols(self):
-        """Obtiene símbolos de NYSE y NASDAQ - OPTIMIZADO"""
-        all_symbols = []
+        # 🧠 Memoria: RSS por etapa siempre; tramos + volcado a disco + tracemalloc con MEMORY_BUDGET_MB
+        budget_mb = memory_budget_mb()
+        self.memory = MemoryTracker(budget_mb, trace=budget_mb > 0 or
+                                    os.environ.get('MEMORY_TRACE', 'false').lower() == 'true')
+        self.result_spill = None
         
-        try:
-            nyse_symbols = self.get_exchange_symbols('NYSE')
-            nasdaq_symbols = self.get_exchange_symbols('NASDAQ')
-            
-            all_symbols = list(set(nyse_symbols + nasdaq_symbols))
-            print(f"✓ NYSE: {len(nyse_symbols)} | NASDAQ: {len(nasdaq_symbols)} | Total: {len(all_symbols)} símbolos")
-            
+        # 🔀 Origen de datos: Yahoo en vivo o dataset local congelado (DATA_SOURCE_DIR)
+        self.data_provider = create_data_provider(SCREENER_MAX_WORKERS, self.metrics)
+        offline = not self.data_provider.remote
+        
+        # 📅 Última sesión NYSE completada (los datos cacheados que la cubren no se descargan)
+        self.market_session = self.data_provider.last_session() or latest_completed_session()
+        
+        # 🪦 Cuarentena de símbolos sin datos (delistados, warrants, OTC...)
+        self.quarantine = SymbolQuarantine()
+        
+        # 🔁 Indicadores incrementales por símbolo (una barra nueva = actualización O(1))
+        # Con dataset local no se persisten: price_cache/indicator_state es del screening en vivo
+        self.indicator_states = IndicatorStateStore(cache_dir=None if offline else PRICE_CACHE_DIR,
+                                                    metrics=self.metrics)
+        
+        # 🗂️ Sectores desde tabla persistente (se refresca cada 30 días con el universo de NASDAQ)
+        # Con dataset local se completa en memoria con su universo, sin guardar sector_map.json
+        self.sector_map = SectorMap()
+        self.refresh_sectors = offline or self.sector_map.needs_refresh()
+        self.sector_stats = []
+        
+        # ⏳ Orden por prioridad + presupuesto de tiempo (se crea al empezar el screening)
+        self.priority_history_path = None if offline else PRIORITY_FILE
+        self.scheduler = None
+        self.concurrency = None
+        
+        # 🔧 Data fetcher optimizado (con caché local para barridos offline)
+        # Con dataset local no se escribe en price_cache/ ni en la cuarentena: el dataset manda
+        self.data_fetcher = RobustDataFetcher(metrics=self.metrics, cache=None if offline else PriceCache(),
+                                              market_session=self.market_session,
+                                              quarantine=None if offline else self.quarantine,
+                                              provider=self.data_provider)
+        
+        logger.info(f"🚀 Screener inicializado - BONUS MA50: +{self.ma50_stop_bonus} pts")
+        logger.info(f"⚡ Optimizaciones: Paralelización ({SCREENER_WORKERS} threads, auto "
+                    f"{SCREENER_MIN_WORKERS}-{SCREENER_MAX_WORKERS}) + Rate limiting (3 req/sec)")
+        logger.info(f"🌟 MA50 Bonus: Se aplica cuando MA50 es el stop loss óptimo seleccionado")
+        logger.info(f"📅 Última sesión NYSE completada: {self.market_session.isoformat()}")
+        if offline:
+            logger.info(f"💽 Datos locales: {self.data_provider.root} (sin red ni rate limiting)")
+        if self.memory.enabled:
+            logger.info(f"🧠 Modo memoria acotada: {budget_mb:.0f} MB | tramos de {MEMORY_CHUNK_SYMBOLS} símbolos")
+    
+    def cached_universe(self):
+        """Universo sin pedirlo a NASDAQ: dataset local o copia residente (None si hay que descargarlo)"""
+        # 💽 Dataset local: el universo viene en el propio dataset
+        rows = self.data_fetcher.provider.universe_rows()
+        if rows is not None:
+            if self.refresh_sectors:
+                self.sector_map.refresh_from_rows(rows)
+            all_symbols = [row['symbol'] for row in rows]
+            logger.info(f"✓ Universo local: {len(all_symbols)} símbolos")
             return all_symbols
-            
-        except Exception as e:
-            print(f"⚠️ Error obteniendo símbolos: {e}")
-            backup_symbols = self.get_backup_symbols()
-            print(f"🔄 Usando lista de respaldo: {len(backup_symbols)} símbolos")
-            return backup_symbols
+        
+        resident = self.data_fetcher.resident
+        symbols = resident.universe.get('symbols') if resident is not None else None
+        if symbols is not None:
+            logger.info(f"🔥 Universo residente en memoria: {len(symbols)} símbolos")
+            return list(symbols)
+        return None
+    
+    def merge_universe(self, nyse_symbols, nasdaq_symbols):
+        """NYSE + NASDAQ sin duplicados (la copia residente solo guarda universos completos)"""
+        all_symbols = list(set(nyse_symbols + nasdaq_symbols))
+        logger.info(f"✓ NYSE: {len(nyse_symbols)} | NASDAQ: {len(nasdaq_symbols)} | Total: {len(all_symbols)} símbolos")
+        resident = self.data_fetcher.resident
+        if resident is not None and len(all_symbols) >= 100:  # La lista de respaldo no se fija en memoria
+            resident.universe.put('symbols', all_symbols)
+        return all_symbols
+    
+    def bootstrap(self):
+        """
+        🕸️ Arranque concurrente: prioridades (cartera, consistencia, historial), NYSE, NASDAQ y
+        benchmarks a la vez; el scoring empieza en cuanto están el universo y los benchmarks
+        """
+        budget_seconds = budget_seconds_from_env()
+        boot = Bootstrap()
+        boot.add('scheduler', lambda: ScreeningScheduler.from_files(budget_seconds, self.priority_history_path),
+                 fallback=lambda: ScreeningScheduler(budget_seconds, history=PassHistory(None)))
+        
+        cached = self.cached_universe()
+        if cached is not None:
+            boot.add('universe', lambda: cached)
+        else:
+            boot.add('nyse', lambda: self.get_exchange_symbols('NYSE'), timeout=EXCHANGE_TIMEOUT, fallback=list)
+            boot.add('nasdaq', lambda: self.get_exchange_symbols('NASDAQ'), timeout=EXCHANGE_TIMEOUT, fallback=list)
+            boot.add('universe', self.merge_universe, deps=('nyse', 'nasdaq'), fallback=self.get_backup_symbols)
+        
+        boot.add('benchmarks', self.load_benchmarks, fallback=lambda: BenchmarkSet({}))
+        results = boot.run()
+        
+        summary = boot.summary()
+        self.metrics.set_extra('bootstrap', summary)
+        tasks = " | ".join(f"{name} {entry['seconds']:.1f}s" + ("" if entry['status'] == 'ok' else f" ({entry['status']})")
+                           for name, entry in summary['tasks'].items())
+        logger.info(f"🕸️ Arranque en {boot.seconds:.1f}s: {tasks}")
+        if boot.degraded():
+            logger.warning(f"🛟 Arranque con fallback en: {', '.join(boot.degraded())}")
+        return results
+    
+    def begin_run(self):
+        """
+        🔁 Estado por ejecución para reutilizar el screener (modo daemon): métricas, sesión NYSE,
+        cuarentena y memoria nuevas; sesiones HTTP, proveedor y cachés residentes se conservan
+        """
+        self.metrics = RunMetrics()
+        self.data_fetcher.metrics = self.metrics
+        self.indicator_states.metrics = self.metrics
+        self.data_provider.metrics = self.metrics
+        http = getattr(self.data_provider, '_http', None)
+        if http is not None:
+            http.metrics = self.metrics
+        
+        self.market_session = self.data_provider.last_session() or latest_completed_session()
+        self.data_fetcher.market_session = self.market_session
+        
+        offline = not self.data_provider.remote
+        self.quarantine = SymbolQuarantine()
+        self.data_fetcher.quarantine = None if offline else self.quarantine
+        
+        budget_mb = memory_budget_mb()
+        self.memory = MemoryTracker(budget_mb, trace=budget_mb > 0 or
+                                    os.environ.get('MEMORY_TRACE', 'false').lower() == 'true')
+        self.refresh_sectors = offline or self.sector_map.needs_refresh()
+        self.sector_stats = []
+        self.spy_benchmark = None
+        self.benchmarks = None
+        self.scheduler = None
+        self.concurrency = None
     
     def get_exchange_symbols(self, exchange):
         """Obtiene símbolos de un exchange específico - OPTIMIZADO"""
@@ -264,7 +452,10 @@ class MomentumResponsiveScreener:
             if response and response.status_code == 200:
                 data = response.json()
                 if 'data' in data and 'table' in data['data']:
-                    symbols = [row['symbol'] for row in data['data']['table']['rows']]
+                    rows = data['data']['table']['rows']
+                    if self.refresh_sectors:
+                        self.sector_map.refresh_from_rows(rows)
+                    symbols = [row['symbol'] for row in rows]
                     return symbols
             
             return []
@@ -287,73 +478,28 @@ class MomentumResponsiveScreener:
             'UBER', 'SHOP', 'SQ', 'ROKU', 'ZM', 'DOCU', 'CRWD'
         ]
     
-    def calculate_spy_benchmark(self):
-        """Calcula rendimientos de SPY - OPTIMIZADO"""
+    def load_benchmarks(self):
+        """SPY, QQQ y ETFs sectoriales en un lote (sin tocar el estado: es tarea del arranque)"""
         try:
-            spy_data = self.data_fetcher.robust_yfinance_history("SPY", period="6mo")
-            
-            if len(spy_data) < 100:
-                return {
-                    'return_20d': 2.0,
-                    'return_60d': 5.0,
-                    'return_90d': 8.0
-                }
-            
-            spy_current = spy_data['Close'].iloc[-1]
-            spy_20d_ago = spy_data['Close'].iloc[-21] if len(spy_data) >= 21 else spy_current
-            spy_60d_ago = spy_data['Close'].iloc[-61] if len(spy_data) >= 61 else spy_current
-            spy_90d_ago = spy_data['Close'].iloc[-91] if len(spy_data) >= 91 else spy_current
-            
-            spy_return_20d = ((spy_current - spy_20d_ago) / spy_20d_ago) * 100
-            spy_return_60d = ((spy_current - spy_60d_ago) / spy_60d_ago) * 100
-            spy_return_90d = ((spy_current - spy_90d_ago) / spy_90d_ago) * 100
-            
-            benchmark = {
-                'return_20d': float(spy_return_20d),
-                'return_60d': float(spy_return_60d),
-                'return_90d': float(spy_return_90d)
-            }
-            
-            print(f"✅ SPY Benchmark: 20d={spy_return_20d:.1f}% | 60d={spy_return_60d:.1f}% | 90d={spy_return_90d:.1f}%")
-            return benchmark
-            
+            return BenchmarkSet.load(self.data_fetcher.robust_yfinance_history)
         except Exception:
-            return {
-                'return_20d': 2.0,
-                'return_60d': 5.0,
-                'return_90d': 8.0
-            }
+            return BenchmarkSet({})
+    
+    def calculate_spy_benchmark(self, benchmarks=None):
+        """Fija los benchmarks (los carga si no se pasan) y devuelve los rendimientos de SPY"""
+        self.benchmarks = benchmarks if benchmarks is not None else self.load_benchmarks()
+        
+        if PRIMARY_BENCHMARK not in self.benchmarks:
+            return dict(DEFAULT_BENCHMARK)
+        
+        benchmark = self.benchmarks.primary()
+        logger.info(f"✅ SPY Benchmark: 20d={benchmark['return_20d']:.1f}% | 60d={benchmark['return_60d']:.1f}% | 90d={benchmark['return_90d']:.1f}%")
+        logger.info(f"📦 Benchmarks cargados: {len(self.benchmarks)} ({', '.join(self.benchmarks.symbols)})")
+        return benchmark
     
     def calculate_weekly_atr(self, hist):
         """Calcula Weekly ATR (Average True Range)"""
-        try:
-            if len(hist) < 14:
-                return 0
-            
-            # Datos semanales (viernes)
-            weekly_data = hist.resample('W-FRI').agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last',
-                'Volume': 'sum'
-            }).dropna()
-            
-            if len(weekly_data) < 7:
-                return 0
-            
-            # True Range semanal
-            weekly_data['prev_close'] = weekly_data['Close'].shift(1)
-            weekly_data['tr1'] = weekly_data['High'] - weekly_data['Low']
-            weekly_data['tr2'] = abs(weekly_data['High'] - weekly_data['prev_close'])
-            weekly_data['tr3'] = abs(weekly_data['Low'] - weekly_data['prev_close'])
-            weekly_data['true_range'] = weekly_data[['tr1', 'tr2', 'tr3']].max(axis=1)
-            
-            weekly_atr = weekly_data['true_range'].tail(7).mean()
-            return weekly_atr
-            
-        except Exception:
-            return 0
+        return compute_weekly_atr(hist)
     
     def is_ma50_used_as_stop_loss(self, hist, current_price, stop_price):
         """🌟 VERIFICA SI MA50 SE USA COMO STOP LOSS PARA BONUS"""
@@ -395,110 +541,47 @@ class MomentumResponsiveScreener:
             ma50_is_stop_loss = is_ma50_the_support and is_support_the_stop and stop_matches
             
             if ma50_is_stop_loss:
-                print(f"🌟 MA50 STOP LOSS DETECTED: MA50=${ma50:.2f} | MA21=${ma21:.2f} | "
-                      f"Support=${support_level:.2f} | ATR_Stop=${atr_stop:.2f} | "
-                      f"Final_Stop=${calculated_stop:.2f}")
+                logger.debug("🌟 MA50 STOP LOSS DETECTED: MA50=$%.2f | MA21=$%.2f | "
+                             "Support=$%.2f | ATR_Stop=$%.2f | Final_Stop=$%.2f",
+                             ma50, ma21, support_level, atr_stop, calculated_stop)
             
             return bool(ma50_is_stop_loss)  # Asegurar bool nativo
             
         except Exception as e:
-            print(f"⚠️ Error verificando MA50 como stop loss: {e}")
+            logger.debug("⚠️ Error verificando MA50 como stop loss: %s", e)
             return False
     
     def get_fundamental_data(self, symbol):
         """Obtiene datos fundamentales - OPTIMIZADO"""
-        fundamental_data = {
-            'fundamental_score': 0,
-            'earnings_growth': None,
-            'revenue_growth': None,
-            'roe': None
-        }
-        
         try:
             ticker_info = self.data_fetcher.robust_yfinance_info(symbol)
-            
-            if not ticker_info:
-                return fundamental_data
-            
-            # Earnings growth
-            earnings_growth = ticker_info.get('earningsQuarterlyGrowth')
-            if earnings_growth is not None and earnings_growth > 0:
-                fundamental_data['earnings_growth'] = earnings_growth
-                if earnings_growth > 0.50:
-                    fundamental_data['fundamental_score'] += 25
-                elif earnings_growth > 0.25:
-                    fundamental_data['fundamental_score'] += 20
-                elif earnings_growth > 0.15:
-                    fundamental_data['fundamental_score'] += 15
-                else:
-                    fundamental_data['fundamental_score'] += 10
-            
-            # Revenue growth
-            revenue_growth = ticker_info.get('revenueQuarterlyGrowth')
-            if revenue_growth is not None:
-                fundamental_data['revenue_growth'] = revenue_growth
-                if revenue_growth > 0.25:
-                    fundamental_data['fundamental_score'] += 20
-                elif revenue_growth > 0.10:
-                    fundamental_data['fundamental_score'] += 15
-                elif revenue_growth > 0:
-                    fundamental_data['fundamental_score'] += 10
-            
-            # ROE
-            roe = ticker_info.get('returnOnEquity')
-            if roe is not None:
-                fundamental_data['roe'] = roe
-                if roe > 0.20:
-                    fundamental_data['fundamental_score'] += 15
-                elif roe > 0.15:
-                    fundamental_data['fundamental_score'] += 10
-                elif roe > 0.10:
-                    fundamental_data['fundamental_score'] += 5
-            
-            return fundamental_data
+            return compute_fundamental_score(ticker_info)
             
         except Exception:
-            return fundamental_data
+            return compute_fundamental_score(None)
+    
+    def scoring_params(self):
+        """Parámetros de scoring actuales (los que barre parameter_sweep.py)"""
+        return {
+            'max_allowed_risk': self.max_allowed_risk,
+            'momentum_20d_weight': self.momentum_20d_weight,
+            'momentum_60d_weight': self.momentum_60d_weight,
+            'min_outperf_20d': self.min_outperf_20d,
+            'min_outperf_60d': self.min_outperf_60d,
+            'ma50_stop_bonus': self.ma50_stop_bonus,
+            'rr_bonus_weight': self.rr_bonus_weight
+        }
     
     def normalize_symbol(self, symbol):
         """Convierte símbolos de formato NASDAQ a formato Yahoo Finance"""
-        if not symbol or not isinstance(symbol, str):
-            return symbol
-        
-        symbol = symbol.strip().upper()
-        
-        if symbol.startswith('^'):
-            return symbol
-        
-        if symbol.endswith('Q') and len(symbol) > 1:
-            return symbol
-        
-        # Preferred stocks
-        if '^' in symbol:
-            parts = symbol.split('^')
-            if len(parts) == 2:
-                base, suffix = parts
-                if suffix.isalpha() and len(suffix) <= 2:
-                    return f"{base}-P{suffix}"
-        
-        if 'p' in symbol and len(symbol) > 3:
-            p_index = symbol.rfind('p')
-            if p_index > 0 and p_index < len(symbol) - 1:
-                base = symbol[:p_index]
-                suffix = symbol[p_index + 1:]
-                if len(suffix) <= 2 and suffix.isalnum():
-                    return f"{base}-P{suffix}"
-        
-        # Class shares con punto
-        if '.' in symbol:
-            parts = symbol.split('.')
-            if len(parts) == 2 and len(parts[1]) <= 2:
-                return f"{parts[0]}-{parts[1]}"
-        
-        return symbol
+        return normalize_symbol(symbol)
     
-    def evaluate_stock_momentum_responsive(self, symbol):
-        """🌟 EVALUACIÓN COMPLETA CON BONUS MA50 - OPTIMIZADA"""
+    def evaluate_technical(self, symbol):
+        """
+        📈 FASE 1: histórico + indicadores de un símbolo (sin fundamentales)
+        Devuelve None sin histórico suficiente; si no, sus rendimientos (para el ranking
+        de fuerza relativa) e `indicators` = None si no pasa los filtros técnicos
+        """
         try:
             normalized_symbol = self.normalize_symbol(symbol)
             if not normalized_symbol:
@@ -507,77 +590,66 @@ class MomentumResponsiveScreener:
             # USAR FETCHER OPTIMIZADO
             hist = self.data_fetcher.robust_yfinance_history(normalized_symbol, period="6mo")
             
-            if len(hist) < 100:
-                return None
-            
-            current_price = hist['Close'].iloc[-1]
-            
-            # Filtros básicos
-            if current_price < 5.0 or current_price > 1000.0:
+            returns = compute_period_returns(hist)
+            if returns is None:
                 return None
             
-            volume_avg_30d = hist['Volume'].tail(30).mean()
-            if volume_avg_30d < 1_000_000:
-                return None
+            close = hist['Close']
+            technical = {
+                'symbol': normalized_symbol,
+                'return_20d': returns['return_20d'],
+                'return_60d': returns['return_60d'],
+                'above_ma50': bool(close.iloc[-1] > close.tail(50).mean()),
+                'indicators': None
+            }
             
             # Calcular outperformance vs SPY
             if not self.spy_benchmark:
-                return None
-            
-            # Returns de la acción
-            price_20d = hist['Close'].iloc[-21] if len(hist) >= 21 else current_price
-            price_60d = hist['Close'].iloc[-61] if len(hist) >= 61 else current_price
-            price_90d = hist['Close'].iloc[-91] if len(hist) >= 91 else current_price
+                return technical
             
-            return_20d = ((current_price - price_20d) / price_20d) * 100
-            return_60d = ((current_price - price_60d) / price_60d) * 100
-            return_90d = ((current_price - price_90d) / price_90d) * 100
+            # Indicadores + filtros fijos (precio, volumen, tendencia): estado incremental por símbolo
+            indicators = self.indicator_states.indicators(normalized_symbol, hist)
+            if indicators is None:
+                return technical
             
-            # Outperformance vs SPY
-            outperformance_20d = return_20d - self.spy_benchmark['return_20d']
-            outperformance_60d = return_60d - self.spy_benchmark['return_60d']
-            outperformance_90d = return_90d - self.spy_benchmark['return_90d']
+            outperformance_20d = indicators['return_20d'] - self.spy_benchmark['return_20d']
+            outperformance_60d = indicators['return_60d'] - self.spy_benchmark['return_60d']
             
-            # Filtros de outperformance
-            if outperformance_20d < self.min_outperf_20d:
-                return None
-            if outperformance_60d < self.min_outperf_60d:
-                return None
-            
-            # TENDENCIA
-            ma21 = hist['Close'].rolling(window=21).mean().iloc[-1]
-            ma50 = hist['Close'].rolling(window=50).mean().iloc[-1]
-            ma200 = hist['Close'].rolling(window=200).mean().iloc[-1] if len(hist) >= 200 else ma50
-            
-            if not (current_price > ma21 > ma50):
-                return None
-            
-            # ATR para stop loss y take profit
-            hist['tr1'] = hist['High'] - hist['Low']
-            hist['tr2'] = abs(hist['High'] - hist['Close'].shift(1))
-            hist['tr3'] = abs(hist['Low'] - hist['Close'].shift(1))
-            hist['true_range'] = hist[['tr1', 'tr2', 'tr3']].max(axis=1)
-            atr = hist['true_range'].tail(14).mean()
+            # Filtros de outperformance y riesgo máximo
+            if not passes_param_filters(outperformance_20d, outperformance_60d, indicators['risk_pct'],
+                                        self.scoring_params()):
+                return technical
             
-            weekly_atr = self.calculate_weekly_atr(hist)
+            technical['indicators'] = indicators
+            return technical
             
-            # STOP LOSS inteligente
-            support_level = min(ma21, ma50, current_price * 0.92)
-            atr_stop = current_price - (atr * 2)
-            stop_price = max(support_level, atr_stop)
-            risk_pct = ((current_price - stop_price) / current_price) * 100
+        except Exception:
+            return None
+    
+    def complete_candidate(self, technical, rs_percentile=None, sector_context=None):
+        """🌟 FASE 3: fundamentales, score final con BONUS MA50 y de sector, y ficha del candidato"""
+        try:
+            sector_context = sector_context or {}
+            normalized_symbol = technical['symbol']
+            indicators = technical['indicators']
             
-            if risk_pct > self.max_allowed_risk:
-                return None
+            outperformance_20d = indicators['return_20d'] - self.spy_benchmark['return_20d']
+            outperformance_60d = indicators['return_60d'] - self.spy_benchmark['return_60d']
+            outperformance_90d = indicators['return_90d'] - self.spy_benchmark['return_90d']
             
-            # 🌟 VERIFICAR SI MA50 SE USA COMO STOP LOSS PARA BONUS
-            is_ma50_stop_loss = self.is_ma50_used_as_stop_loss(hist, current_price, stop_price)
-            ma50_bonus = self.ma50_stop_bonus if is_ma50_stop_loss else 0
+            current_price = indicators['current_price']
+            stop_price = indicators['stop_price']
+            ma50 = indicators['ma50']
+            is_ma50_stop_loss = indicators['is_ma50_stop_loss']
             
             # Log específico para MA50 bonus
             if is_ma50_stop_loss:
-                print(f"🌟 {normalized_symbol}: MA50 COMO STOP LOSS (+{ma50_bonus} pts) | "
-                      f"Stop: ${stop_price:.2f} | MA50: ${ma50:.2f}")
+                logger.debug("🌟 MA50 STOP LOSS DETECTED: MA50=$%.2f | MA21=$%.2f | "
+                             "Support=$%.2f | ATR_Stop=$%.2f | Final_Stop=$%.2f",
+                             ma50, indicators['ma21'], indicators['support_level'],
+                             indicators['atr_stop'], stop_price)
+                logger.info("🌟 %s: MA50 COMO STOP LOSS (+%d pts) | Stop: $%.2f | MA50: $%.2f",
+                            normalized_symbol, self.ma50_stop_bonus, stop_price, ma50)
             
             # FUNDAMENTAL DATA
             fundamental_data = self.get_fundamental_data(normalized_symbol)
@@ -587,88 +659,35 @@ class MomentumResponsiveScreener:
             if earnings_growth is None or earnings_growth <= 0:
                 return None
             
-            # MOMENTUM SCORE
-            momentum_score = (
-                outperformance_20d * self.momentum_20d_weight +
-                outperformance_60d * self.momentum_60d_weight
+            # SCORE TÉCNICO Y FINAL
+            rr_bonus = indicators['rr_bonus']
+            technical_score, final_score, ma50_bonus = score_components(
+                outperformance_20d, outperformance_60d, is_ma50_stop_loss,
+                fundamental_data.get('fundamental_score', 0),
+                indicators['volatility_bonus'] + indicators['volume_score'] + indicators['risk_bonus'],
+                rr_bonus, self.scoring_params()
             )
-            
-            # VOLUME SURGE
-            volume_recent = hist['Volume'].tail(5).mean()
-            volume_surge_val = (volume_recent / volume_avg_30d - 1) * 100
-            
-            volume_score = 0
-            if volume_surge_val > 50:
-                volume_score = 15
-            elif volume_surge_val > 25:
-                volume_score = 10
-            elif volume_surge_val > 10:
-                volume_score = 5
-            
-            # VOLATILITY ANALYSIS
-            returns_20d = hist['Close'].pct_change().tail(20)
-            volatility_20d = returns_20d.std() * (252 ** 0.5) * 100
-            
-            volatility_bonus = 0
-            volatility_rank = "MEDIUM"
-            if volatility_20d < 20:
-                volatility_bonus = 8
-                volatility_rank = "LOW"
-            elif volatility_20d < 30:
-                volatility_bonus = 5
-                volatility_rank = "MEDIUM"
-            elif volatility_20d > 50:
-                volatility_bonus = -5
-                volatility_rank = "HIGH"
-            
-            # RISK BONUS
-            risk_bonus = 0
-            if risk_pct < 5:
-                risk_bonus = 10
-            elif risk_pct < 7:
-                risk_bonus = 5
-            
-            # SCORE TÉCNICO FINAL
-            technical_score = max(0, 
-                momentum_score * 1.2 +
-                ma50_bonus +
-                fundamental_data.get('fundamental_score', 0) * 0.8 +
-                volatility_bonus +
-                volume_score +
-                risk_bonus
-            )
-            
-            # TAKE PROFIT
-            take_profit_multiplier = 3.0 if weekly_atr > 0 else 3.5
-            atr_for_tp = weekly_atr if weekly_atr > 0 else atr
-            take_profit_price = current_price + (atr_for_tp * take_profit_multiplier)
-            upside_pct = ((take_profit_price - current_price) / current_price) * 100
-            
-            # RISK/REWARD RATIO
-            risk_reward_ratio = upside_pct / max(risk_pct, 0.1)
-            
-            # RR BONUS
-            rr_bonus = 0
-            if risk_reward_ratio > 4.0:
-                rr_bonus = 25
-            elif risk_reward_ratio > 3.0:
-                rr_bonus = 20
-            elif risk_reward_ratio > 2.5:
-                rr_bonus = 15
-            elif risk_reward_ratio > 2.0:
-                rr_bonus = 10
-            
-            # SCORE FINAL
-            final_score = technical_score + (rr_bonus * 0.8)
+            sector_bonus = sector_context.get('sector_bonus', 0)
+            final_score = final_score + sector_bonus
             
             # INFORMACIÓN COMPLETA
             ticker_info = self.data_fetcher.robust_yfinance_info(normalized_symbol)
+            self.sector_map.learn(normalized_symbol, ticker_info)
             company_info = {
                 'name': str(ticker_info.get('longName', 'N/A')) if ticker_info else 'N/A',
                 'sector': str(ticker_info.get('sector', 'N/A')) if ticker_info else 'N/A',
                 'market_cap': ticker_info.get('marketCap', 'N/A') if ticker_info else 'N/A'
             }
             
+            # OUTPERFORMANCE VS ETF DEL SECTOR (rendimientos ya precalculados: 0 requests)
+            sector = str(sector_context.get('sector', self.sector_map.sector_of(normalized_symbol)))
+            sector_etf, sector_outperformance = None, None
+            if self.benchmarks is not None:
+                sector_etf = (self.benchmarks.sector_benchmark(sector)
+                              or self.benchmarks.sector_benchmark(company_info['sector']))
+                if sector_etf:
+                    sector_outperformance = self.benchmarks.outperformance(indicators, sector_etf)
+            
             result = {
                 'symbol': str(normalized_symbol),
                 'score': round(float(final_score), 1),
@@ -678,18 +697,27 @@ class MomentumResponsiveScreener:
                 'is_ma50_stop_loss': bool(is_ma50_stop_loss),  # Convertir explícitamente a bool nativo
                 'current_price': round(float(current_price), 2),
                 'stop_loss': round(float(stop_price), 2),
-                'take_profit': round(float(take_profit_price), 2),
-                'risk_pct': round(float(risk_pct), 2),
-                'upside_pct': round(float(upside_pct), 2),
-                'risk_reward_ratio': round(float(risk_reward_ratio), 2),
+                'take_profit': round(float(indicators['take_profit_price']), 2),
+                'risk_pct': round(float(indicators['risk_pct']), 2),
+                'upside_pct': round(float(indicators['upside_pct']), 2),
+                'risk_reward_ratio': round(float(indicators['risk_reward_ratio']), 2),
                 'outperformance_20d': round(float(outperformance_20d), 2),
                 'outperformance_60d': round(float(outperformance_60d), 2),
                 'outperformance_90d': round(float(outperformance_90d), 2),
-                'volume_surge': round(float(volume_surge_val), 1),
+                'rs_percentile': round(float(rs_percentile), 1) if rs_percentile is not None else None,
+                'sector': sector,
+                'sector_bonus': int(sector_bonus),
+                'sector_benchmark': sector_etf,
+                'sector_outperformance_20d': round(sector_outperformance['return_20d'], 2) if sector_outperformance else None,
+                'sector_outperformance_60d': round(sector_outperformance['return_60d'], 2) if sector_outperformance else None,
+                'sector_outperformance_90d': round(sector_outperformance['return_90d'], 2) if sector_outperformance else None,
+                'sector_relative_momentum': sector_context.get('sector_relative_momentum'),
+                'sector_breadth_ma50': sector_context.get('sector_breadth_ma50'),
+                'volume_surge': round(float(indicators['volume_surge']), 1),
                 'fundamental_score': int(fundamental_data.get('fundamental_score', 0)),
-                'atr': round(float(atr), 2),
-                'weekly_atr': round(float(weekly_atr), 2),
-                'volatility_rank': str(volatility_rank),
+                'atr': round(float(indicators['atr']), 2),
+                'weekly_atr': round(float(indicators['weekly_atr']), 2),
+                'volatility_rank': str(indicators['volatility_rank']),
                 'company_info': company_info
             }
             
@@ -698,128 +726,348 @@ class MomentumResponsiveScreener:
         except Exception:
             return None
     
+    def evaluate_stock_momentum_responsive(self, symbol):
+        """🌟 EVALUACIÓN COMPLETA CON BONUS MA50 de un símbolo suelto (sin ranking de universo)"""
+        technical = self.evaluate_technical(symbol)
+        if not technical or technical['indicators'] is None:
+            return None
+        return self.complete_candidate(technical)
+    
+    def rank_relative_strength(self, technicals):
+        """
+        📊 FASE 2: percentil de fuerza relativa de cada símbolo frente a TODO el universo evaluado
+        Devuelve {símbolo: percentil}
+        """
+        if not technicals:
+            return {}
+        percentiles = relative_strength_percentiles(
+            [t['return_20d'] for t in technicals],
+            [t['return_60d'] for t in technicals],
+            self.scoring_params()
+        )
+        return {t['symbol']: float(p) for t, p in zip(technicals, percentiles)}
+    
+    def rank_sectors(self, technicals):
+        """
+        🗂️ FASE 2: fuerza por sector sobre todo el universo evaluado
+        Guarda self.sector_stats y devuelve {símbolo: contexto de su sector}
+        """
+        if not technicals or not self.spy_benchmark:
+            self.sector_stats = []
+            return {}
+        
+        sectors = [self.sector_map.sector_of(t['symbol']) for t in technicals]
+        self.sector_stats, relative_momentum = aggregate_sectors(
+            sectors,
+            [t['return_20d'] - self.spy_benchmark['return_20d'] for t in technicals],
+            [t['return_60d'] - self.spy_benchmark['return_60d'] for t in technicals],
+            [t['above_ma50'] for t in technicals],
+            self.scoring_params()
+        )
+        
+        by_sector = {stats['sector']: stats for stats in self.sector_stats}
+        contexts = {}
+        for technical, sector, relative in zip(technicals, sectors, relative_momentum):
+            stats = by_sector.get(sector)
+            if stats is None:
+                continue
+            contexts[technical['symbol']] = {
+                'sector': sector,
+                'sector_bonus': stats['bonus'],
+                'sector_relative_momentum': round(float(relative), 2),
+                'sector_breadth_ma50': stats['breadth_ma50']
+            }
+        return contexts
+    
     def process_symbol_batch(self, symbols_batch):
-        """Procesa un lote de símbolos"""
+        """Procesa un lote de símbolos (fase técnica); agotado el tiempo de escaneo, los omite"""
         results = []
         for symbol in symbols_batch:
+            if self.scheduler and self.scheduler.scan_expired():
+                self.scheduler.skip(symbol, 'scan')
+                continue
             try:
-                result = self.evaluate_stock_momentum_responsive(symbol)
-                if result:
-                    results.append(result)
+                technical = self.evaluate_technical(symbol)
+                if technical:
+                    results.append(technical)
             except Exception:
                 continue
         return results
     
+    def complete_candidate_scheduled(self, technical, rs_percentile=None, sector_context=None):
+        """complete_candidate salvo que se haya agotado el presupuesto (queda en coverage)"""
+        if self.scheduler and self.scheduler.expired():
+            self.scheduler.skip(technical['symbol'], 'fundamentals')
+            return None
+        return self.complete_candidate(technical, rs_percentile, sector_context)
+    
+    def complete_candidates(self, technicals, rs_percentiles, sector_contexts):
+        """Fundamentales + score final de los candidatos técnicos (en paralelo, por prioridad)"""
+        if self.scheduler:
+            # Cartera y consistencia primero; luego mayor fuerza relativa (empates: por símbolo)
+            technicals = sorted(technicals, key=lambda t: (TIERS.index(self.scheduler.tier_of(t['symbol'])),
+                                                           -rs_percentiles.get(t['symbol'], 0), t['symbol']))
+        results = []
+        with ThreadPoolExecutor(max_workers=SCREENER_WORKERS) as executor:
+            futures = [
+                executor.submit(self.complete_candidate_scheduled, technical,
+                                rs_percentiles.get(technical['symbol']),
+                                sector_contexts.get(technical['symbol']))
+                for technical in technicals
+            ]
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                    if result:
+                        if self.result_spill is not None:
+                            # Modo memoria acotada: a disco ya limpio, en memoria solo el resumen
+                            result = self.result_spill.append(self.clean_data_for_json(result))
+                        results.append(result)
+                except Exception:
+                    continue
+        return results
+    
     def screen_all_stocks_momentum_responsive(self):
         """Screening OPTIMIZADO con paralelización"""
-        print(f"=== CONSERVATIVE SCREENER OPTIMIZADO ===")
-        print(f"🌟 Bonus MA50: +{self.ma50_stop_bonus} puntos")
-        print(f"🚀 Paralelización: 5 threads habilitados")
-        print(f"🎯 MA50 Bonus: Solo cuando MA50 es el stop loss seleccionado por el algoritmo")
+        logger.info(f"=== CONSERVATIVE SCREENER OPTIMIZADO ===")
+        logger.info(f"🌟 Bonus MA50: +{self.ma50_stop_bonus} puntos")
+        logger.info(f"🚀 Paralelización: cola compartida, {SCREENER_WORKERS} threads "
+                    f"(auto {SCREENER_MIN_WORKERS}-{SCREENER_MAX_WORKERS})")
+        logger.info(f"🎯 MA50 Bonus: Solo cuando MA50 es el stop loss seleccionado por el algoritmo")
+        
+        # ARRANQUE: universo, benchmarks y prioridades en paralelo
+        # (el presupuesto de tiempo cuenta desde aquí: el scheduler se crea al empezar el arranque)
+        with self.metrics.stage('bootstrap'):
+            boot = self.bootstrap()
+        self.memory.checkpoint('bootstrap')
         
-        # Obtener símbolos
-        self.stock_symbols = self.get_nyse_nasdaq_symbols()
+        self.scheduler = boot['scheduler']
+        if self.scheduler.budget_seconds:
+            logger.info(f"⏳ Presupuesto: {self.scheduler.budget_seconds/60:.0f} min "
+                        f"| Cartera: {len(self.scheduler.holdings)} | Consistencia: {len(self.scheduler.consistency)}")
         
-        if len(self.stock_symbols) < 100:
+        # Dataset local: su universo manda aunque sea pequeño (la lista de respaldo no está en él)
+        self.stock_symbols = boot['universe']
+        if self.data_provider.remote and len(self.stock_symbols) < 100:
             self.stock_symbols = self.get_backup_symbols()
         
         # FILTRO RÁPIDO: Sin requests HTTP
-        print(f"🔍 Aplicando filtro rápido a {len(self.stock_symbols)} símbolos...")
+        logger.info(f"🔍 Aplicando filtro rápido a {len(self.stock_symbols)} símbolos...")
         filtered_symbols = [s for s in self.stock_symbols if quick_filter_symbol(s)]
-        print(f"✅ Filtro rápido: {len(filtered_symbols)} símbolos ({len(filtered_symbols)/len(self.stock_symbols)*100:.1f}%)")
+        logger.info(f"✅ Filtro rápido: {len(filtered_symbols)} símbolos ({len(filtered_symbols)/len(self.stock_symbols)*100:.1f}%)")
+        
+        # CUARENTENA: símbolos que fallaron recientemente no consumen requests (solo en vivo)
+        # Cartera y consistencia se evalúan siempre: un fallo puntual no las saca del screening
+        quarantined = []
+        if self.data_provider.remote:
+            filtered_symbols, quarantined = self.quarantine.partition(
+                filtered_symbols, exempt=self.scheduler.priority_symbols())
+        if quarantined:
+            logger.info(f"🪦 Cuarentena: {len(quarantined)} símbolos omitidos "
+                        f"(~{self.quarantine.run_stats['requests_saved']} requests ahorrados)")
+        if self.quarantine.run_stats['exempted']:
+            logger.info(f"💼 Cuarentena: {self.quarantine.run_stats['exempted']} símbolos de cartera/consistencia "
+                        f"evaluados igualmente")
         
-        # Calcular benchmark SPY
-        self.spy_benchmark = self.calculate_spy_benchmark()
+        # Benchmark SPY (ya cargado en el arranque)
+        self.spy_benchmark = self.calculate_spy_benchmark(boot['benchmarks'])
         
-        # PARALELIZACIÓN
-        batch_size = 20
-        batches = [filtered_symbols[i:i + batch_size] for i in range(0, len(filtered_symbols), batch_size)]
+        # PRIORIDAD: cartera -> consistencia -> resto por probabilidad de aprobado
+        filtered_symbols = self.scheduler.order(filtered_symbols)
         
-        print(f"🔄 Procesando {len(batches)} lotes de {batch_size} símbolos...")
-        print("=" * 60)
+        # COLA COMPARTIDA: elementos de SCREENER_BATCH_SIZE símbolos, concurrencia AIMD
+        batch_size = SCREENER_BATCH_SIZE
+        batches = chunk(filtered_symbols, batch_size)
+        self.concurrency = AdaptiveConcurrency(
+            SCREENER_WORKERS, SCREENER_MIN_WORKERS, SCREENER_MAX_WORKERS,
+            rate_limit_probe=lambda: self.metrics.event_count('history', 'http_429'))
         
-        all_results = []
+        logger.info(f"🔄 Procesando {len(batches)} elementos de {batch_size} símbolo(s) en cola compartida...")
+        logger.info("=" * 60)
+        
+        technicals = []
         start_time = time.time()
+        progress_every = max(1, 200 // batch_size)
+        completed = 0
         
-        # Procesar con ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_batch = {
-                executor.submit(self.process_symbol_batch, batch): i 
-                for i, batch in enumerate(batches)
-            }
-            
-            for future in as_completed(future_to_batch):
-                batch_idx = future_to_batch[future]
+        def on_batch_done(batch_idx, batch_results):
+            nonlocal completed
+            technicals.extend(batch_results or [])
+            completed += 1
+            
+            # Progress cada ~200 símbolos con información detallada
+            if completed % progress_every == 0:
+                elapsed = time.time() - start_time
+                processed = min(completed * batch_size, len(filtered_symbols))
+                total = len(filtered_symbols)
+                remaining = len(batches) - completed
+                eta_minutes = (remaining * elapsed / completed) / 60 if completed > 0 else 0
                 
-                try:
-                    batch_results = future.result()
-                    all_results.extend(batch_results)
-                    
-                    # Progress cada 10 lotes con información detallada
-                    if (batch_idx + 1) % 10 == 0:
-                        elapsed = time.time() - start_time
-                        processed = (batch_idx + 1) * batch_size
-                        total = len(filtered_symbols)
-                        remaining_batches = len(batches) - (batch_idx + 1)
-                        eta_minutes = (remaining_batches * elapsed / (batch_idx + 1)) / 60 if (batch_idx + 1) > 0 else 0
-                        
-                        ma50_count = sum(1 for r in all_results if r.get('is_ma50_stop_loss', False))
-                        avg_score = sum(r.get('score', 0) for r in all_results) / len(all_results) if all_results else 0
-                        
-                        print(f"📊 Lote {batch_idx+1}/{len(batches)} | "
-                              f"Procesados: {processed}/{total} ({processed/total*100:.1f}%) | "
-                              f"Candidatos: {len(all_results)} | "
-                              f"🌟 MA50 Stop Loss: {ma50_count} | "
-                              f"Score Promedio: {avg_score:.1f} | "
-                              f"ETA: {eta_minutes:.1f}min")
-                        
-                        # Log de ejemplo de último candidato con MA50 como stop loss
-                        recent_ma50 = [r for r in all_results if r.get('is_ma50_stop_loss', False)]
-                        if recent_ma50:
-                            last_ma50 = recent_ma50[-1]
-                            print(f"     🌟 Último MA50 Stop: {last_ma50.get('symbol', 'N/A')} (Score: {last_ma50.get('score', 0):.1f})")
-                        
-                except Exception:
-                    continue
+                passing = [t for t in technicals if t['indicators'] is not None]
+                ma50_count = sum(1 for t in passing if t['indicators']['is_ma50_stop_loss'])
+                
+                logger.log(PROGRESS,
+                           "📊 Elemento %d/%d | Procesados: %d/%d (%.1f%%) | Candidatos técnicos: %d | "
+                           "🌟 MA50 Stop Loss: %d | Hilos: %d | ETA: %.1fmin",
+                           completed, len(batches), processed, total, processed / total * 100,
+                           len(passing), ma50_count, self.concurrency.limit, eta_minutes)
+        
+        # FASE 1: históricos + indicadores de todo el universo (cola compartida por símbolo)
+        # Modo memoria acotada: por tramos, liberando los históricos de cada tramo antes del siguiente
+        # Etapas en tiempo real (no suma por hilo): comparables con el resto de la telemetría
+        chunks = chunk(batches, max(1, MEMORY_CHUNK_SYMBOLS // batch_size)) if self.memory.enabled else [batches]
+        with self.metrics.stage('technical_scan'):
+            for chunk_items in chunks:
+                run_work_queue(chunk_items, self.process_symbol_batch, self.concurrency, on_batch_done)
+                if self.memory.enabled:
+                    self.memory.release()
+                    if self.memory.over_budget():
+                        logger.warning(f"🧠 RSS por encima del presupuesto ({self.memory.budget_mb:.0f} MB) "
+                                       f"tras {completed} elementos")
+        self.memory.checkpoint('technical_scan')
+        concurrency = self.concurrency.summary()
+        logger.info(f"🧵 Concurrencia: inicial {concurrency['initial']} -> final {concurrency['final']} "
+                    f"(pico {concurrency['peak']}, media {concurrency['average']}, "
+                    f"+{concurrency['increases']}/-{concurrency['decreases']} ajustes)")
+        
+        self.scheduler.record_outcomes(technicals)
+        if self.scheduler.skipped_scan:
+            logger.warning(f"⏳ Presupuesto agotado en la fase técnica: {len(self.scheduler.skipped_scan)} "
+                           f"símbolos sin evaluar (ver coverage)")
+        
+        # FASE 2: ranking de fuerza relativa sobre todo el universo con histórico
+        with self.metrics.stage('relative_strength'):
+            rs_percentiles = self.rank_relative_strength(technicals)
+            candidates = [t for t in technicals if t['indicators'] is not None]
+            technical_candidates = len(candidates)
+            if self.min_rs_percentile > 0:
+                candidates = [t for t in candidates
+                              if rs_percentiles.get(t['symbol'], 0) >= self.min_rs_percentile]
+        logger.info(f"📊 Fuerza relativa: {len(rs_percentiles)} símbolos rankeados | "
+                    f"{technical_candidates} candidatos técnicos -> {len(candidates)} "
+                    f"con RS >= {self.min_rs_percentile:.0f}")
+        
+        # FASE 2b: fuerza por sector (mediana, breadth, momentum relativo)
+        with self.metrics.stage('sector_strength'):
+            sector_contexts = self.rank_sectors(technicals)
+        if self.sector_stats:
+            leaders = ", ".join(f"{s['sector']} ({s['median_outperformance_20d']:+.1f}%, "
+                                f"breadth {s['breadth_ma50']:.0f}%)" for s in self.sector_stats[:3])
+            logger.info(f"🗂️ Sectores: {len(self.sector_stats)} | Líderes: {leaders}")
+        
+        self.memory.checkpoint('ranking')
+        
+        # FASE 3: fundamentales solo para los supervivientes
+        if self.memory.enabled:
+            self.result_spill = ResultSpill()
+        with self.metrics.stage('fundamentals'):
+            all_results = self.complete_candidates(candidates, rs_percentiles, sector_contexts)
+        self.memory.checkpoint('fundamentals')
+        if self.scheduler.skipped_fundamentals:
+            logger.warning(f"⏳ Presupuesto agotado en fundamentales: "
+                           f"{len(self.scheduler.skipped_fundamentals)} candidatos sin completar")
         
         elapsed = time.time() - start_time
+        self.metrics.add_stage_time('evaluation', elapsed)
+        self.metrics.set_extra('relative_strength', {
+            'ranked_symbols': len(rs_percentiles),
+            'technical_candidates': technical_candidates,
+            'min_rs_percentile': self.min_rs_percentile,
+            'fundamentals_requested': len(candidates)
+        })
         
-        # Ordenar resultados
-        all_results.sort(key=lambda x: x['score'], reverse=True)
+        # Ordenar resultados (empates por símbolo: el orden de llegada de los hilos no cuenta)
+        all_results.sort(key=lambda x: (-x['score'], x['symbol']))
         
         ma50_bonus_count = sum(1 for r in all_results if r.get('is_ma50_stop_loss', False))
         
-        print(f"\n🎯 SCREENING OPTIMIZADO COMPLETADO:")
-        print(f"⏱️ Tiempo: {elapsed/60:.1f} minutos")
-        print(f"🔍 Símbolos: {len(filtered_symbols)}")
-        print(f"✅ Candidatos: {len(all_results)}")
-        print(f"🌟 MA50 como Stop Loss: {ma50_bonus_count}")
-        print(f"📈 Velocidad: {len(filtered_symbols)/(elapsed/60):.0f} símbolos/min")
+        logger.log(PROGRESS, f"\n🎯 SCREENING OPTIMIZADO COMPLETADO:")
+        logger.log(PROGRESS, f"⏱️ Tiempo: {elapsed/60:.1f} minutos")
+        logger.log(PROGRESS, f"🔍 Símbolos: {len(filtered_symbols)}")
+        logger.log(PROGRESS, f"✅ Candidatos: {len(all_results)}")
+        logger.log(PROGRESS, f"🌟 MA50 como Stop Loss: {ma50_bonus_count}")
+        logger.log(PROGRESS, f"📈 Velocidad: {len(filtered_symbols)/(elapsed/60):.0f} símbolos/min")
         
         # Mostrar específicamente las acciones con MA50 como stop loss
         if ma50_bonus_count > 0:
             ma50_stocks = [r for r in all_results if r.get('is_ma50_stop_loss', False)]
-            print(f"\n🌟 ACCIONES CON MA50 COMO STOP LOSS (+{self.ma50_stop_bonus} pts):")
+            logger.log(PROGRESS, f"\n🌟 ACCIONES CON MA50 COMO STOP LOSS (+{self.ma50_stop_bonus} pts):")
             for i, stock in enumerate(ma50_stocks[:10], 1):  # Top 10 con MA50 stop loss
                 price = stock.get('current_price', 0)
                 stop = stock.get('stop_loss', 0)
                 score = stock.get('score', 0)
                 technical_score = stock.get('technical_score', 0)
-                print(f"  {i:2d}. {stock.get('symbol', 'N/A'):6s} | "
-                      f"Score: {score:5.1f} (Base: {technical_score-self.ma50_stop_bonus:.1f} + MA50: +{self.ma50_stop_bonus}) | "
-                      f"Price: ${price:.2f} | Stop: ${stop:.2f}")
+                logger.log(PROGRESS, f"  {i:2d}. {stock.get('symbol', 'N/A'):6s} | "
+                           f"Score: {score:5.1f} (Base: {technical_score-self.ma50_stop_bonus:.1f} + MA50: +{self.ma50_stop_bonus}) | "
+                           f"Price: ${price:.2f} | Stop: ${stop:.2f}")
         else:
-            print(f"\n⚠️ NINGUNA ACCIÓN USA MA50 COMO STOP LOSS")
-            print(f"   Esto significa que para todas las acciones analizadas:")
-            print(f"   - MA21, precio*0.92, o ATR stop fueron mejores opciones")
-            print(f"   - MA50 no fue el nivel de soporte óptimo")
-            print(f"   - Es normal en mercados con tendencias fuertes")
+            logger.log(PROGRESS, f"\n⚠️ NINGUNA ACCIÓN USA MA50 COMO STOP LOSS")
+            logger.info(f"   Esto significa que para todas las acciones analizadas:")
+            logger.info(f"   - MA21, precio*0.92, o ATR stop fueron mejores opciones")
+            logger.info(f"   - MA50 no fue el nivel de soporte óptimo")
+            logger.info(f"   - Es normal en mercados con tendencias fuertes")
         
         # Guardar resultados
-        self.save_results_optimized(all_results, elapsed, len(filtered_symbols), ma50_bonus_count)
+        with self.metrics.stage('serialization'):
+            self.save_results_optimized(all_results, elapsed, len(filtered_symbols), ma50_bonus_count)
+        if self.result_spill is not None:
+            self.result_spill.close()
+            self.result_spill = None
+        self.memory.checkpoint('serialization')
+        
+        if self.data_provider.remote:  # El dataset local no toca el estado compartido del repo
+            self.save_quarantine()
+            if self.sector_map.save():
+                logger.info(f"🗂️ Tabla de sectores actualizada: {len(self.sector_map.symbols)} símbolos")
+        self.save_run_metrics(len(filtered_symbols), len(all_results), len(batches), batch_size)
+        self.memory.stop()
         
         return all_results
     
+    def save_quarantine(self):
+        """🪦 Persiste el registro de cuarentena (symbol_quarantine.json)"""
+        self.quarantine.save()
+        summary = self.quarantine.summary()
+        logger.info(f"🪦 Cuarentena: {summary['active']} activos | +{summary['new_quarantined']} nuevos | "
+                    f"{summary['released']} liberados | Requests ahorrados: {summary['requests_saved']} "
+                    f"(total histórico: {summary['requests_saved_total']})")
+    
+    def save_run_metrics(self, symbols_processed, candidates, batches, batch_size):
+        """⏱️ Guarda telemetría de la ejecución en run_metrics.json"""
+        try:
+            self.metrics.set_extra('symbols_processed', int(symbols_processed))
+            self.metrics.set_extra('candidates', int(candidates))
+            self.metrics.set_extra('batches', int(batches))
+            self.metrics.set_extra('batch_size', int(batch_size))
+            if self.concurrency:
+                self.metrics.set_extra('concurrency', self.concurrency.summary())
+            self.metrics.set_extra('memory', self.memory.summary())
+            self.metrics.set_extra('market_session', self.market_session.isoformat())
+            self.metrics.set_extra('quarantine', self.quarantine.summary())
+            if self.scheduler:
+                # Sin las listas de símbolos: el detalle está en weekly_screening_results.json
+                self.metrics.set_extra('coverage', {key: value for key, value in self.scheduler.coverage().items()
+                                                    if not isinstance(value, list)})
+            http_pool = self.data_provider.connection_stats()
+            if http_pool:
+                self.metrics.set_extra('http_pool', http_pool)
+            data = self.metrics.save()
+            
+            latest = data['latest']
+            stages = ", ".join(f"{name}={stage['seconds']:.1f}s" for name, stage in latest['stages'].items())
+            logger.info(f"⏱️ Telemetría: {stages} | Espera rate limiter: {latest['rate_limiter_wait_seconds']:.1f}s")
+            if http_pool:
+                logger.info(f"🔌 Pool Yahoo ({http_pool['backend']}, {http_pool['pool_size']} conexiones): "
+                            f"{http_pool['http_requests']} requests | {http_pool['new_connections']} conexiones nuevas | "
+                            f"reutilización {http_pool['reuse_ratio']*100:.1f}%")
+            memory = self.memory.summary()
+            if memory['peak_rss_mb'] is not None:
+                logger.info(f"🧠 RSS pico: {memory['peak_rss_mb']:.0f} MB"
+                            + (f" (presupuesto {memory['budget_mb']:.0f} MB)" if memory['budget_mb'] else ""))
+            logger.info(f"💾 Métricas guardadas: run_metrics.json ({len(data['history'])} ejecuciones en historial)")
+        except Exception as e:
+            logger.warning(f"⚠️ Error guardando métricas de ejecución: {e}")
+    
     def clean_data_for_json(self, data):
         """Convierte tipos numpy a tipos nativos de Python para JSON"""
         if isinstance(data, dict):
@@ -849,17 +1097,20 @@ class MomentumResponsiveScreener:
     def save_results_optimized(self, results, elapsed_time, symbols_processed, ma50_count):
         """Guarda resultados con limpieza de tipos numpy"""
         top_15 = results[:15]
+        spilled = self.result_spill is not None
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        coverage = self.scheduler.coverage() if self.scheduler else None
         filename = f"momentum_responsive_results_{timestamp}.json"
         
-        # Limpiar datos antes de serialización
-        clean_results = self.clean_data_for_json(results)
+        # Limpiar datos antes de serialización (volcados a disco: ya limpios, se leen de uno en uno)
+        clean_results = None if spilled else self.clean_data_for_json(results)
         clean_spy_benchmark = self.clean_data_for_json(self.spy_benchmark)
         
         # Archivo con timestamp
         result_data = {
             'timestamp': datetime.now().isoformat(),
+            'market_session': self.market_session.isoformat(),
             'execution_time_minutes': float(elapsed_time / 60),
             'symbols_processed': int(symbols_processed),
             'symbols_successful': int(len(results)),
@@ -867,15 +1118,20 @@ class MomentumResponsiveScreener:
             'optimization_enabled': True,
             'parallel_processing': True,
             'spy_benchmark': clean_spy_benchmark,
+            'coverage': coverage,
             'results': clean_results
         }
         
         try:
-            with open(filename, 'w') as f:
-                json.dump(result_data, f, indent=2)
+            if spilled:
+                result_data.pop('results')
+                write_json_streaming(filename, result_data, 'results', self.result_spill.iter_results(results))
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(result_data, f, indent=2)
         except TypeError as e:
-            print(f"❌ Error serialización archivo timestamp: {e}")
-            print("🔍 Intentando identificar tipos problemáticos...")
+            logger.error(f"❌ Error serialización archivo timestamp: {e}")
+            logger.warning("🔍 Intentando identificar tipos problemáticos...")
             # Guardar solo metadatos si falla
             safe_data = {
                 'timestamp': datetime.now().isoformat(),
@@ -884,16 +1140,17 @@ class MomentumResponsiveScreener:
                 'symbols_successful': int(len(results)),
                 'ma50_bonus_detections': int(ma50_count),
                 'error': 'Serialization failed',
-                'results_count': len(clean_results)
+                'results_count': len(results)
             }
             with open(filename, 'w') as f:
                 json.dump(safe_data, f, indent=2)
         
         # Archivo principal - también limpiado
-        clean_top_15 = self.clean_data_for_json(top_15)
+        clean_top_15 = self.result_spill.load(top_15) if spilled else self.clean_data_for_json(top_15)
         
         screening_data = {
             'analysis_date': datetime.now().isoformat(),
+            'market_session': self.market_session.isoformat(),
             'execution_time_minutes': float(elapsed_time / 60),
             'symbols_analyzed': int(symbols_processed),
             'results_count': int(len(results)),
@@ -907,10 +1164,13 @@ class MomentumResponsiveScreener:
             },
             'top_symbols': [str(r['symbol']) for r in top_15],  # Asegurar string
             'detailed_results': clean_top_15,
+            'sector_strength': self.clean_data_for_json(self.sector_stats),
+            'coverage': coverage,
             'benchmark_context': {
                 'spy_20d': float(clean_spy_benchmark.get('return_20d', 0)) if clean_spy_benchmark else 0.0,
                 'spy_60d': float(clean_spy_benchmark.get('return_60d', 0)) if clean_spy_benchmark else 0.0,
-                'spy_90d': float(clean_spy_benchmark.get('return_90d', 0)) if clean_spy_benchmark else 0.0
+                'spy_90d': float(clean_spy_benchmark.get('return_90d', 0)) if clean_spy_benchmark else 0.0,
+                'benchmarks': self.benchmarks.context() if self.benchmarks is not None else {}
             }
         }
         
@@ -918,21 +1178,23 @@ class MomentumResponsiveScreener:
             with open('weekly_screening_results.json', 'w') as f:
                 json.dump(screening_data, f, indent=2)
         except TypeError as e:
-            print(f"❌ Error serialización archivo principal: {e}")
-            print("🔍 Datos problemáticos identificados, usando fallback...")
+            logger.error(f"❌ Error serialización archivo principal: {e}")
+            logger.warning("🔍 Datos problemáticos identificados, usando fallback...")
             # Crear versión mínima que funcione
             fallback_data = {
                 'analysis_date': datetime.now().isoformat(),
+                'market_session': self.market_session.isoformat(),
                 'symbols_analyzed': int(symbols_processed),
                 'results_count': int(len(results)),
                 'ma50_bonus_count': int(ma50_count),
                 'error': 'Full serialization failed - using fallback',
+                'coverage': coverage,
                 'top_symbols': [str(r.get('symbol', 'N/A')) for r in results[:15]]
             }
             with open('weekly_screening_results.json', 'w') as f:
                 json.dump(fallback_data, f, indent=2)
         
-        print(f"💾 Archivos guardados: {filename} + weekly_screening_results.json")
+        logger.info(f"💾 Archivos guardados: {filename} + weekly_screening_results.json")
 
 def test_ma50_detection():
     """Función de test para verificar MA50 como stop loss"""
@@ -981,18 +1243,27 @@ def test_ma50_detection():
 
 def main():
     """Función principal optimizada"""
+    setup_logging()
     try:
-        print("🚀 Conservative Screener - Versión Optimizada")
-        print("⚡ Paralelización + Rate limiting (3 req/sec)")
+        logger.info("🚀 Conservative Screener - Versión Optimizada")
+        logger.info("⚡ Paralelización + Rate limiting (3 req/sec)")
         
         # Test opcional del MA50 (comentar para producción)
         # test_ma50_detection()
         
+        # ⏭️ Sin sesión nueva desde el último screening: se conservan los resultados (FORCE_RUN=true para repetir)
+        # (con DATA_SOURCE_DIR el dataset está congelado: siempre se ejecuta)
+        new_session, _, previous_session = has_new_session()
+        if not new_session and not force_run() and not os.environ.get('DATA_SOURCE_DIR'):
+            logger.log(PROGRESS, "⏭️ Sin sesión NYSE nueva desde %s: se conservan los resultados anteriores",
+                       previous_session.isoformat())
+            return
+        
         screener = MomentumResponsiveScreener()
         results = screener.screen_all_stocks_momentum_responsive()
         
         if results:
-            print(f"\n🏆 TOP 10 CANDIDATOS:")
+            logger.log(PROGRESS, f"\n🏆 TOP 10 CANDIDATOS:")
             for i, stock in enumerate(results[:10], 1):
                 ma50_indicator = " 🌟" if stock.get('is_ma50_stop_loss', False) else ""
                 ma50_bonus_val = stock.get('ma50_bonus', 0)
@@ -1001,31 +1272,31 @@ def main():
                     base_score = stock['score'] - ma50_bonus_val
                     score_breakdown = f"Score: {stock['score']:5.1f} (Base: {base_score:.1f} + MA50: +{ma50_bonus_val})"
                 
-                print(f"{i:2d}. {stock['symbol']:6s} | "
-                      f"{score_breakdown} | "
-                      f"R/R: {stock['risk_reward_ratio']:4.1f} | "
-                      f"Risk: {stock['risk_pct']:4.1f}%{ma50_indicator}")
+                logger.log(PROGRESS, f"{i:2d}. {stock['symbol']:6s} | "
+                           f"{score_breakdown} | "
+                           f"R/R: {stock['risk_reward_ratio']:4.1f} | "
+                           f"Risk: {stock['risk_pct']:4.1f}%{ma50_indicator}")
             
             # Estadísticas adicionales del MA50 bonus
             ma50_count = sum(1 for r in results if r.get('is_ma50_stop_loss', False))
             if ma50_count > 0:
-                print(f"\n🌟 RESUMEN MA50 STOP LOSS BONUS:")
-                print(f"   - Total usando MA50 como stop: {ma50_count}")
-                print(f"   - Valor del bonus: +{results[0].get('ma50_bonus', 22)} pts cada uno")
-                print(f"   - Porcentaje: {ma50_count/len(results)*100:.1f}% de candidatos")
-                print(f"   - Concepto: Bonus por usar MA50 como nivel de stop loss óptimo")
+                logger.log(PROGRESS, f"\n🌟 RESUMEN MA50 STOP LOSS BONUS:")
+                logger.log(PROGRESS, f"   - Total usando MA50 como stop: {ma50_count}")
+                logger.log(PROGRESS, f"   - Valor del bonus: +{results[0].get('ma50_bonus', 22)} pts cada uno")
+                logger.log(PROGRESS, f"   - Porcentaje: {ma50_count/len(results)*100:.1f}% de candidatos")
+                logger.info(f"   - Concepto: Bonus por usar MA50 como nivel de stop loss óptimo")
             else:
-                print(f"\n⚠️ Ninguna acción usa MA50 como stop loss en esta ejecución")
-                print(f"   (MA21, precio*0.92, o ATR stop fueron mejores opciones)")
+                logger.log(PROGRESS, f"\n⚠️ Ninguna acción usa MA50 como stop loss en esta ejecución")
+                logger.info(f"   (MA21, precio*0.92, o ATR stop fueron mejores opciones)")
         else:
-            print("⚠️ Sin resultados - verificar conectividad")
+            logger.log(PROGRESS, "⚠️ Sin resultados - verificar conectividad")
         
-        print("✅ Screening optimizado completado")
+        logger.log(PROGRESS, "✅ Screening optimizado completado")
         
     except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error: %s", e)
+    finally:
+        shutdown_logging()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,94 +6,23 @@ Para trading mensual con monitorización diaria
 
 🔄 ADAPTADO: De análisis semanal a análisis de últimos 7 días
 🎯 FILOSOFÍA: Daily monitoring, monthly trading
+⚡ INCREMENTAL: la ventana vive en consistency_state.py (solo se aplica el screening de hoy)
 """
 
 import json
 import os
-import glob
+import time
 from datetime import datetime, timedelta
-from collections import defaultdict, Counter
 from typing import Dict, List, Set, Any, Optional
 
+from consistency_state import ConsistencyState
+
 class DailyConsistencyAnalyzer:
-    def __init__(self):
-        self.historical_data = []
+    def __init__(self, state=None):
+        self.state = state
+        self.state_update = None
         self.current_day_data = None
         
-    def load_historical_screenings(self, days_back=6):
-        """
-        🆕 Carga los últimos N días de screening (6 días históricos + hoy = 7 días)
-        Adaptado para ejecución diaria vs semanal
-        """
-        print(f"📚 Cargando historial de {days_back + 1} días para análisis diario...")
-        
-        # Buscar archivos de screening históricos diarios
-        all_screening_files = []
-        
-        # 1. Archivos históricos con fecha (patrón diario)
-        historical_files = glob.glob("weekly_screening_results_*.json")
-        all_screening_files.extend(historical_files)
-        
-        # 2. Archivo actual (si existe)
-        if os.path.exists("weekly_screening_results.json"):
-            all_screening_files.append("weekly_screening_results.json")
-        
-        # Ordenar archivos por fecha de modificación (más recientes primero)
-        all_screening_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-        
-        # Tomar solo los últimos days_back archivos históricos
-        historical_files_selected = all_screening_files[1:days_back+1] if len(all_screening_files) > 1 else []
-        
-        # Cargar archivos históricos
-        for i, file_path in enumerate(historical_files_selected):
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                
-                # Extraer date del archivo o usar fecha de modificación
-                if 'analysis_date' in data:
-                    file_date = data['analysis_date'][:10]
-                else:
-                    mod_time = os.path.getmtime(file_path)
-                    file_date = datetime.fromtimestamp(mod_time).strftime('%Y-%m-%d')
-                
-                historical_entry = {
-                    'day': i + 1,  # Día 1 = más reciente histórico
-                    'date': file_date,
-                    'file_path': file_path,
-                    'symbols': data.get('top_symbols', []),
-                    'detailed_results': data.get('detailed_results', [])
-                }
-                
-                self.historical_data.append(historical_entry)
-                print(f"   ✓ Día -{i+1}: {file_path} ({len(historical_entry['symbols'])} símbolos)")
-                
-            except Exception as e:
-                print(f"   ❌ Error cargando {file_path}: {e}")
-                # Crear entrada placeholder para mantener cronología
-                self.historical_data.append({
-                    'day': i + 1,
-                    'date': 'N/A',
-                    'file_path': file_path,
-                    'symbols': [],
-                    'detailed_results': [],
-                    'error': str(e)
-                })
-        
-        # Rellenar días faltantes si no hay suficientes archivos históricos
-        while len(self.historical_data) < days_back:
-            missing_day = len(self.historical_data) + 1
-            self.historical_data.append({
-                'day': missing_day,
-                'date': 'N/A - Sin datos',
-                'file_path': 'N/A - Sin datos',
-                'symbols': [],
-                'detailed_results': []
-            })
-        
-        print(f"✅ Historial diario cargado: {len(self.historical_data)} días")
-        return len(self.historical_data) > 0
-    
     def load_current_day_screening(self):
         """Carga el screening del día actual"""
         try:
@@ -107,35 +36,30 @@ class DailyConsistencyAnalyzer:
             print(f"❌ Error cargando screening actual: {e}")
             return False
     
+    def update_state(self):
+        """Aplica el screening de hoy al estado incremental (o lo reconstruye si hace falta)"""
+        start = time.perf_counter()
+        if self.state is None:
+            self.state = ConsistencyState()
+        mode = self.state.update(self.current_day_data)
+        self.state.save()
+        self.state_update = dict(self.state.last_update, mode=mode,
+                                 symbols_in_window=len(self.state.symbols),
+                                 elapsed_ms=round((time.perf_counter() - start) * 1000, 1))
+        print(f"⚡ Estado de consistencia ({mode}): +{self.state.last_update['applied']} símbolos hoy, "
+              f"{self.state.last_update['expired']} caducados, {len(self.state.snapshots)} días en ventana")
+        return self.state_update
+    
     def analyze_symbol_consistency_daily(self):
         """
         Analiza consistencia de símbolos en los últimos 7 días
         🆕 ADAPTADO: De semanas a días para ejecución diaria
+        ⚡ Apariciones leídas de los bitmaps del estado (sin recorrer los días)
         """
         print("📊 Analizando consistencia diaria (últimos 7 días)...")
         
-        # Diccionarios para tracking por símbolo
-        symbol_appearances = defaultdict(list)
-        symbol_frequency = Counter()
-        
-        # Incluir día actual (día 7)
-        current_symbols = self.current_day_data.get('top_symbols', []) if self.current_day_data else []
-        
-        # Procesar historial (días 1-6) + día actual (día 7)
-        all_days_data = self.historical_data + [{
-            'day': 7,  # Día actual
-            'date': datetime.now().isoformat()[:10],
-            'symbols': current_symbols,
-            'detailed_results': self.current_day_data.get('detailed_results', []) if self.current_day_data else []
-        }]
-        
-        for day_data in all_days_data:
-            day_num = day_data['day']
-            symbols = day_data['symbols']
-            
-            for symbol in symbols:
-                symbol_appearances[symbol].append(day_num)
-                symbol_frequency[symbol] += 1
+        # Día 7 = hoy; días 1-6 = screenings anteriores (1 = el más reciente)
+        symbol_appearances = {symbol: self.state.days_appeared(symbol) for symbol in sorted(self.state.symbols)}
         
         # Categorizar símbolos por consistencia diaria
         consistency_analysis = {
@@ -146,8 +70,8 @@ class DailyConsistencyAnalyzer:
             'disappeared_stocks': []       # Estaban pero ya no están hoy
         }
         
-        for symbol, frequency in symbol_frequency.items():
-            days_appeared = symbol_appearances[symbol]
+        for symbol, days_appeared in symbol_appearances.items():
+            frequency = len(days_appeared)
             
             # Verificar si apareció hoy (día 7)
             appeared_today = 7 in days_appeared
@@ -158,7 +82,9 @@ class DailyConsistencyAnalyzer:
                 'days_appeared': days_appeared,
                 'appeared_today': appeared_today,
                 'consistency_score': self.calculate_daily_consistency_score(days_appeared),
-                'trend': self.analyze_daily_trend(days_appeared)
+                'trend': self.analyze_daily_trend(days_appeared),
+                'streak': self.state.streak(symbol),
+                'decayed_score': self.state.decayed_score(symbol)
             }
             
             # Obtener detalles del día actual si está disponible
@@ -265,11 +191,8 @@ class DailyConsistencyAnalyzer:
         # Símbolos de hoy
         current_symbols = set(self.current_day_data.get('top_symbols', []) if self.current_day_data else [])
         
-        # Símbolos de ayer (si existe)
-        yesterday_symbols = set()
-        if len(self.historical_data) > 0:
-            last_day_data = self.historical_data[0]  # Más reciente histórico
-            yesterday_symbols = set(last_day_data['symbols'])
+        # Símbolos del screening anterior (si existe)
+        yesterday_symbols = set(self.state.previous_symbols())
         
         # Nuevos símbolos (aparecen hoy por primera vez)
         trend_changes['newly_emerged_today'] = list(current_symbols - yesterday_symbols)
@@ -321,7 +244,7 @@ class DailyConsistencyAnalyzer:
         if not self.load_current_day_screening():
             return None
         
-        self.load_historical_screenings(6)  # 6 días históricos + hoy = 7 días
+        self.update_state()  # 6 días históricos + hoy = 7 días
         
         # Archivar archivo anterior si existe
         if os.path.exists('consistency_analysis.json'):
@@ -348,9 +271,10 @@ class DailyConsistencyAnalyzer:
             'execution_frequency': 'daily',
             'trading_philosophy': 'monthly_trades_daily_monitoring',
             'data_sources': {
-                'historical_files': [h['file_path'] for h in self.historical_data],
+                'historical_files': self.state.historical_sources(),
                 'current_day_file': 'weekly_screening_results.json'
             },
+            'consistency_state': self.state_update,
             'consistency_analysis': consistency_analysis,
             'trend_changes': trend_changes,
             'summary_stats': {
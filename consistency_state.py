@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Consistency State - Estado incremental de la ventana de consistencia diaria
+===========================================================================
+
+🧮 Por símbolo: bitmap de apariciones (bit 0 = hoy, bit N = hace N screenings), racha actual
+   y score con decaimiento exponencial
+⚡ Cada día se aplica solo el snapshot de hoy y se caduca el más antiguo: trabajo proporcional a
+   los símbolos que cambian, no a la longitud de la ventana
+🗓️ Snapshots identificados por fecha: el mismo día no se cuenta dos veces
+🔁 Si falta un día (o no hay estado) se reconstruye desde weekly_screening_results_*.json
+💾 price_cache/consistency_state.json (viaja con la caché del workflow)
+
+Uso:
+    python consistency_state.py rebuild     # Reconstruye el estado desde el historial
+    python consistency_state.py show        # Resumen del estado actual
+"""
+
+import glob
+import json
+import os
+import re
+import sys
+
+# Mismo directorio que price_cache.PRICE_CACHE_DIR sin importar pandas (subcomando ligero)
+PRICE_CACHE_DIR = os.environ.get('PRICE_CACHE_DIR', 'price_cache')
+STATE_FILE = os.path.join(PRICE_CACHE_DIR, 'consistency_state.json')
+STATE_VERSION = 1
+CURRENT_FILE = 'weekly_screening_results.json'
+HISTORY_PATTERN = 'weekly_screening_results_*.json'
+HISTORY_DATE = re.compile(r'weekly_screening_results_(\d{4})(\d{2})(\d{2})\.json$')
+
+WINDOW_DAYS = 7         # 6 días históricos + hoy
+DECAY_FACTOR = 0.75     # Peso de una aparición de hace N screenings: 0.75^N
+MISSING_SOURCE = 'N/A - Sin datos'
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def snapshot_date(data):
+    """Fecha (YYYY-MM-DD) de un resultado de screening"""
+    return (data.get('analysis_date') or '')[:10] or None
+
+
+def history_dates(pattern=HISTORY_PATTERN):
+    """{fecha: archivo} de los históricos diarios, solo por nombre (sin leerlos)"""
+    dates = {}
+    for path in glob.glob(pattern):
+        match = HISTORY_DATE.search(os.path.basename(path))
+        if match:
+            dates['-'.join(match.groups())] = path
+    return dates
+
+
+class ConsistencyState:
+    """Ventana móvil de apariciones en el top del screening (bitmaps por símbolo)"""
+
+    def __init__(self, path=STATE_FILE, window=WINDOW_DAYS):
+        self.path = path
+        self.window = window
+        self.mask = (1 << window) - 1
+        self.reset()
+        data = _load_json(path) if path else None
+        if data and data.get('version') == STATE_VERSION and data.get('window') == window:
+            self.run = data.get('run', 0)
+            self.snapshots = data.get('snapshots', [])
+            self.symbols = data.get('symbols', {})
+            self.loaded = True
+
+    def reset(self):
+        self.run = 0
+        self.snapshots = []     # Más antiguo primero; el último es el de hoy
+        self.symbols = {}       # símbolo -> {'bits', 'run', 'streak', 'decayed'} a fecha de su 'run'
+        self.loaded = False
+        self.last_update = {'applied': 0, 'expired': 0}
+
+    @property
+    def last_date(self):
+        return self.snapshots[-1]['date'] if self.snapshots else None
+
+    def _bits(self, entry):
+        """Bitmap desplazado hasta el screening actual (el estado solo se toca al aparecer)"""
+        return (entry['bits'] << (self.run - entry['run'])) & self.mask
+
+    def apply_snapshot(self, date, symbols, source=CURRENT_FILE):
+        """Añade el top de un día y caduca el que sale de la ventana. False si ya estaba aplicado"""
+        if self.snapshots and self.snapshots[-1]['date'] == date:
+            return False
+
+        self.run += 1
+        applied = 0
+        for symbol in dict.fromkeys(symbols):
+            entry = self.symbols.get(symbol)
+            if entry is None:
+                self.symbols[symbol] = {'bits': 1, 'run': self.run, 'streak': 1, 'decayed': 1.0}
+            else:
+                gap = self.run - entry['run']
+                entry['bits'] = self._bits(entry) | 1
+                entry['streak'] = entry['streak'] + 1 if gap == 1 else 1
+                entry['decayed'] = round(entry['decayed'] * DECAY_FACTOR ** gap + 1.0, 6)
+                entry['run'] = self.run
+            applied += 1
+        self.snapshots.append({'run': self.run, 'date': date, 'source': source, 'symbols': list(symbols)})
+
+        # Solo los símbolos del día que sale pueden quedarse sin apariciones en la ventana
+        expired = 0
+        while len(self.snapshots) > self.window:
+            for symbol in self.snapshots.pop(0)['symbols']:
+                entry = self.symbols.get(symbol)
+                if entry is not None and self._bits(entry) == 0:
+                    del self.symbols[symbol]
+                    expired += 1
+        self.last_update = {'applied': applied, 'expired': expired}
+        return True
+
+    def days_appeared(self, symbol):
+        """Días con el numerado del análisis: 1 = screening más reciente anterior ... 6, hoy = 7"""
+        entry = self.symbols.get(symbol)
+        if entry is None:
+            return []
+        bits = self._bits(entry)
+        days = [age for age in range(1, self.window) if bits >> age & 1]
+        return days + [self.window] if bits & 1 else days
+
+    def frequency(self, symbol):
+        entry = self.symbols.get(symbol)
+        return bin(self._bits(entry)).count('1') if entry else 0
+
+    def streak(self, symbol):
+        """Screenings consecutivos hasta hoy (0 si no aparece hoy)"""
+        entry = self.symbols.get(symbol)
+        return entry['streak'] if entry and entry['run'] == self.run else 0
+
+    def decayed_score(self, symbol):
+        entry = self.symbols.get(symbol)
+        return round(entry['decayed'] * DECAY_FACTOR ** (self.run - entry['run']), 3) if entry else 0.0
+
+    def previous_symbols(self):
+        """Top del screening anterior al de hoy"""
+        return self.snapshots[-2]['symbols'] if len(self.snapshots) > 1 else []
+
+    def historical_sources(self):
+        """Archivos de los días anteriores (más reciente primero), con huecos rellenados"""
+        sources = [snapshot['source'] for snapshot in reversed(self.snapshots[:-1])]
+        return sources + [MISSING_SOURCE] * (self.window - 1 - len(sources))
+
+    def in_sync_with(self, history, today):
+        """El estado cubre el último histórico anterior a hoy (si no, se saltó algún día)"""
+        previous = [date for date in history if date < today]
+        if not previous:
+            return True
+        latest = max(previous)
+        return any(snapshot['date'] == latest for snapshot in self.snapshots)
+
+    def rebuild(self, current_file=CURRENT_FILE, pattern=HISTORY_PATTERN):
+        """Reconstruye desde todos los históricos por fecha (el archivo actual manda en su día)"""
+        self.reset()
+        days = history_dates(pattern)
+        current = _load_json(current_file) if current_file else None
+        current_date = snapshot_date(current) if current else None
+        if current_date:
+            days[current_date] = current_file
+
+        for date in sorted(days):
+            data = current if days[date] == current_file else _load_json(days[date])
+            if data is None:
+                continue
+            self.apply_snapshot(date, data.get('top_symbols', []), days[date])
+        return self
+
+    def update(self, current_data, current_file=CURRENT_FILE, pattern=HISTORY_PATTERN):
+        """Aplica el screening de hoy; reconstruye si no hay estado o falta un día. Devuelve el modo"""
+        today = snapshot_date(current_data)
+        symbols = current_data.get('top_symbols', [])
+        if self.last_date == today:
+            if self.snapshots[-1]['symbols'] == symbols:
+                return 'unchanged'
+            needs_rebuild = True  # Screening de hoy repetido con otro top: no se puede deshacer el anterior
+        else:
+            needs_rebuild = (not self.loaded or not self.snapshots or today is None or today < self.last_date
+                             or not self.in_sync_with(history_dates(pattern), today))
+        if needs_rebuild:
+            self.rebuild(current_file, pattern)
+            return 'rebuilt'
+        self.apply_snapshot(today, symbols, current_file)
+        return 'incremental'
+
+    def save(self):
+        if not self.path:
+            return False
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': STATE_VERSION, 'window': self.window, 'run': self.run,
+                           'snapshots': self.snapshots, 'symbols': dict(sorted(self.symbols.items()))}, f)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError:
+            return False
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else 'show'
+    if command not in ('rebuild', 'show'):
+        print("Uso: python consistency_state.py [rebuild|show]")
+        return 1
+
+    state = ConsistencyState()
+    if command == 'rebuild':
+        state.rebuild()
+        if not state.save():
+            print(f"❌ No se pudo guardar {state.path}")
+            return 1
+        print(f"🔁 Estado reconstruido desde {len(state.snapshots)} días en ventana (screening #{state.run})")
+    elif not state.loaded:
+        print(f"⚠️ Sin estado en {state.path} (python consistency_state.py rebuild)")
+        return 1
+
+    print(f"🗓️ Ventana: {', '.join(s['date'] for s in state.snapshots) or 'vacía'}")
+    print(f"📊 Símbolos en ventana: {len(state.symbols)}")
+    for symbol in sorted(state.symbols, key=state.decayed_score, reverse=True)[:10]:
+        print(f"   {symbol:6} - {state.frequency(symbol)}/{state.window} días - racha {state.streak(symbol)} "
+              f"- decaído {state.decayed_score(symbol):.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
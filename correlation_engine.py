@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Correlation Engine - Covarianza móvil de 60 sesiones para la rotación
+=====================================================================
+
+🧮 Ring buffer de rendimientos diarios (símbolos x 60) + sumas + matriz de productos cruzados
+➕ Cada sesión nueva es una actualización de rango 1 (O(N²)), sin recalcular pares uno a uno
+🆕 Símbolos nuevos (candidatos/posiciones) se añaden como bloque contra la ventana actual
+🔁 Recalculo exacto desde el ring cada CORRELATION_RECOMPUTE_SESSIONS sesiones (deriva numérica)
+📉 correlation_adjustments: penaliza candidatos correlacionados con las posiciones en cartera
+💾 Estado en price_cache/correlation_state.npz; precios desde price_panel/ (memoria mapeada)
+"""
+
+import os
+
+import numpy as np
+
+from price_cache import PRICE_CACHE_DIR, PriceCache
+from price_panel import PRICE_PANEL_DIR, load_or_build_price_panel
+
+CORRELATION_WINDOW = 60
+CORRELATION_RECOMPUTE_SESSIONS = 20
+CORRELATION_STATE_FILE = os.path.join(PRICE_CACHE_DIR, 'correlation_state.npz')
+
+# Penalización: 0 hasta CORRELATION_FLOOR, lineal hasta CORRELATION_MAX_PENALTY con correlación 1
+CORRELATION_FLOOR = 0.5
+CORRELATION_MAX_PENALTY = 0.40
+MIN_OBSERVATIONS = 20
+
+
+class RollingCovariance:
+    """Covarianza muestral de una ventana móvil de rendimientos, actualizada por sesión"""
+
+    def __init__(self, window=CORRELATION_WINDOW):
+        self.window = window
+        self.symbols = []
+        self.index = {}
+        self.returns = np.zeros((0, window))       # símbolos x ventana (ring)
+        self.ring_dates = np.full(window, '', dtype='U10')
+        self.head = 0                               # Próxima columna a escribir
+        self.count = 0                              # Sesiones en la ventana
+        self.sums = np.zeros(0)
+        self.cross = np.zeros((0, 0))
+        self.sessions_since_recompute = 0
+
+    @property
+    def last_date(self):
+        return self.ring_dates[(self.head - 1) % self.window] if self.count else None
+
+    def ring_positions(self):
+        """Columnas ocupadas del ring, de la sesión más antigua a la más reciente"""
+        return [(self.head - self.count + i) % self.window for i in range(self.count)]
+
+    def push(self, day, returns):
+        """Añade los rendimientos de una sesión (NaN = sin cotización -> 0)"""
+        returns = np.nan_to_num(np.asarray(returns, dtype=float))
+        if self.count == self.window:
+            old = self.returns[:, self.head]
+            self.sums -= old
+            self.cross -= np.outer(old, old)
+        else:
+            self.count += 1
+
+        self.returns[:, self.head] = returns
+        self.ring_dates[self.head] = day
+        self.head = (self.head + 1) % self.window
+        self.sums += returns
+        self.cross += np.outer(returns, returns)
+
+        self.sessions_since_recompute += 1
+        if self.sessions_since_recompute >= CORRELATION_RECOMPUTE_SESSIONS:
+            self.recompute()
+
+    def recompute(self):
+        """Sumas exactas desde el ring (las columnas vacías son ceros)"""
+        self.sums = self.returns.sum(axis=1)
+        self.cross = self.returns @ self.returns.T
+        self.sessions_since_recompute = 0
+
+    def add_symbols(self, symbols, ring_returns):
+        """
+        Añade símbolos con sus rendimientos alineados al ring (len(symbols) x window)
+        Coste O(k·N·W): solo los productos cruzados del bloque nuevo
+        """
+        if not symbols:
+            return
+        block = np.nan_to_num(np.asarray(ring_returns, dtype=float).reshape(len(symbols), self.window))
+        cross_existing = block @ self.returns.T
+        cross_block = block @ block.T
+
+        self.cross = np.block([[self.cross, cross_existing.T], [cross_existing, cross_block]])
+        self.sums = np.concatenate([self.sums, block.sum(axis=1)])
+        self.returns = np.vstack([self.returns, block])
+        for symbol in symbols:
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+    def drop_symbols(self, symbols):
+        rows = [self.index[s] for s in symbols if s in self.index]
+        if not rows:
+            return
+        keep = np.setdiff1d(np.arange(len(self.symbols)), rows)
+        self.returns = self.returns[keep]
+        self.sums = self.sums[keep]
+        self.cross = self.cross[np.ix_(keep, keep)]
+        self.symbols = [self.symbols[i] for i in keep]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def correlation(self, rows_symbols, cols_symbols):
+        """Submatriz de correlación (filas x columnas); NaN si falta el símbolo o hay pocos datos"""
+        result = np.full((len(rows_symbols), len(cols_symbols)), np.nan)
+        if self.count < MIN_OBSERVATIONS:
+            return result
+        row_ids = [self.index.get(s, -1) for s in rows_symbols]
+        col_ids = [self.index.get(s, -1) for s in cols_symbols]
+        rows_ok = np.array([i >= 0 for i in row_ids])
+        cols_ok = np.array([i >= 0 for i in col_ids])
+        if not rows_ok.any() or not cols_ok.any():
+            return result
+
+        n = self.count
+        r = np.array(row_ids)[rows_ok]
+        c = np.array(col_ids)[cols_ok]
+        covariance = (self.cross[np.ix_(r, c)] - np.outer(self.sums[r], self.sums[c]) / n) / (n - 1)
+        variance = (np.diag(self.cross) - self.sums ** 2 / n) / (n - 1)
+        denominator = np.sqrt(np.outer(variance[r], variance[c]))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[np.ix_(rows_ok, cols_ok)] = np.where(denominator > 0, covariance / denominator, np.nan)
+        return result
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, window=self.window, symbols=np.array(self.symbols, dtype=str),
+                 returns=self.returns, ring_dates=self.ring_dates, head=self.head, count=self.count,
+                 sums=self.sums, cross=self.cross, sessions_since_recompute=self.sessions_since_recompute)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, window=CORRELATION_WINDOW):
+        try:
+            with np.load(path) as data:
+                if int(data['window']) != window:
+                    return None
+                state = cls(window)
+                state.symbols = [str(s) for s in data['symbols']]
+                state.index = {symbol: i for i, symbol in enumerate(state.symbols)}
+                state.returns = data['returns'].reshape(len(state.symbols), window)
+                state.ring_dates = data['ring_dates']
+                state.head = int(data['head'])
+                state.count = int(data['count'])
+                state.sums = data['sums']
+                state.cross = data['cross'].reshape(len(state.symbols), len(state.symbols))
+                state.sessions_since_recompute = int(data['sessions_since_recompute'])
+                return state
+        except Exception:
+            return None
+
+
+class CorrelationEngine:
+    """Mantiene la covarianza móvil de candidatos + posiciones al día con el panel de precios"""
+
+    def __init__(self, state_path=CORRELATION_STATE_FILE, panel=None, window=CORRELATION_WINDOW):
+        self.state_path = state_path
+        self.window = window
+        self.panel = panel
+        self.state = None
+        self.stats = {'sessions_pushed': 0, 'symbols_added': 0, 'symbols_dropped': 0, 'rebuilt': False}
+
+    def _panel(self):
+        if self.panel is None:
+            self.panel = load_or_build_price_panel(PriceCache(), PRICE_PANEL_DIR)
+        return self.panel
+
+    def _panel_returns(self, symbols, positions):
+        """Rendimientos diarios (símbolos x sesiones) en las posiciones del calendario del panel"""
+        panel = self._panel()
+        rows = [panel.symbol_index[s] for s in symbols]
+        positions = np.asarray(positions, dtype=int)
+        close = panel.fields['close']
+        current = close[np.ix_(rows, positions)].astype(float)
+        previous = close[np.ix_(rows, np.maximum(positions - 1, 0))].astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = current / previous - 1
+        returns[:, positions == 0] = np.nan
+        return returns
+
+    def sync(self, symbols):
+        """Deja el estado con exactamente `symbols` (los que tengan precios) y hasta la última sesión"""
+        panel = self._panel()
+        symbols = list(dict.fromkeys(s for s in symbols if s in panel))
+        panel_dates = np.datetime_as_string(panel.dates, unit='D')
+        last_position = len(panel_dates) - 1
+
+        state = self.state or RollingCovariance.load(self.state_path, self.window)
+        if state is not None and state.count:
+            matches = np.nonzero(panel_dates == state.last_date)[0]
+            start = int(matches[0]) + 1 if len(matches) else None
+            if start is None or last_position - start + 1 >= self.window:
+                state = None  # Hueco mayor que la ventana: se reconstruye
+        else:
+            state = None
+
+        if state is None:
+            state = RollingCovariance(self.window)
+            start = max(1, last_position - self.window + 1)
+            self.stats['rebuilt'] = True
+
+        # 1) Fuera los símbolos que ya no interesan
+        wanted = set(symbols)
+        dropped = [s for s in state.symbols if s not in wanted]
+        state.drop_symbols(dropped)
+        self.stats['symbols_dropped'] += len(dropped)
+
+        # 2) Sesiones nuevas para los símbolos ya seguidos (actualización de rango 1)
+        new_positions = list(range(start, last_position + 1))
+        if new_positions:
+            pushed = self._panel_returns(state.symbols, new_positions) if state.symbols else \
+                np.zeros((0, len(new_positions)))
+            for j, position in enumerate(new_positions):
+                state.push(panel_dates[position], pushed[:, j])
+            self.stats['sessions_pushed'] += len(new_positions)
+
+        # 3) Símbolos nuevos con su ventana alineada al ring
+        added = [s for s in symbols if s not in state.index]
+        if added:
+            ring_returns = np.zeros((len(added), self.window))
+            ring_positions = state.ring_positions()
+            if ring_positions:
+                date_index = {d: i for i, d in enumerate(panel_dates)}
+                panel_positions = [date_index[state.ring_dates[p]] for p in ring_positions]
+                ring_returns[:, ring_positions] = self._panel_returns(added, panel_positions)
+            state.add_symbols(added, ring_returns)
+            self.stats['symbols_added'] += len(added)
+
+        self.state = state
+        return state
+
+    def save(self):
+        if self.state is not None:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            self.state.save(self.state_path)
+
+
+def correlation_multiplier(max_correlation):
+    """Multiplicador de score (1 = sin penalización) según la mayor correlación con la cartera"""
+    if max_correlation is None or np.isnan(max_correlation) or max_correlation <= CORRELATION_FLOOR:
+        return 1.0
+    excess = (min(max_correlation, 1.0) - CORRELATION_FLOOR) / (1 - CORRELATION_FLOOR)
+    return 1.0 - CORRELATION_MAX_PENALTY * excess
+
+
+def correlation_adjustments(candidates, holdings, engine=None):
+    """
+    {candidato: {max_correlation, correlated_with, score_multiplier, position_size_multiplier}}
+    frente a las posiciones en cartera (vacío si no hay posiciones o datos de precios)
+    """
+    candidates = list(dict.fromkeys(candidates))
+    holdings = list(dict.fromkeys(holdings))
+    if not candidates or not holdings:
+        return {}, {}
+
+    engine = engine or CorrelationEngine()
+    state = engine.sync(candidates + holdings)
+    engine.save()
+
+    matrix = state.correlation(candidates, holdings)
+    adjustments = {}
+    for i, symbol in enumerate(candidates):
+        row = matrix[i]
+        if np.all(np.isnan(row)):
+            continue
+        j = int(np.nanargmax(row))
+        max_correlation = float(row[j])
+        multiplier = correlation_multiplier(max_correlation)
+        adjustments[symbol] = {
+            'max_correlation': round(max_correlation, 3),
+            'correlated_with': holdings[j],
+            'score_multiplier': round(multiplier, 3),
+            # Misma escala para el tamaño: posiciones muy correlacionadas entran más pequeñas
+            'position_size_multiplier': round(multiplier, 3)
+        }
+    return adjustments, dict(engine.stats, tracked_symbols=len(state.symbols), window_sessions=state.count)
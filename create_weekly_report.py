@@ -10,26 +10,42 @@ import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
+from result_delta import format_delta_summary, load_delta
+from run_metrics import load_run_metrics
+from screening_stats import compute_screening_stats, load_screening_stats, momentum_category
 
 class AggressiveMomentumReportGenerator:
     def __init__(self):
         self.screening_data = None
+        self.screening_stats = None  # Agregados de detailed_results (screening_stats.py)
         self.consistency_data = None
         self.rotation_data = None
+        self.run_metrics = None
+        self.delta = None  # Cambios vs la ejecución anterior (result_delta.py)
+        self.pick_outcomes = None  # Resultados de las recomendaciones archivadas (pick_outcomes.py)
         self.report_date = datetime.now()
         
     def load_all_data(self):
         """Carga todos los datos necesarios incluyendo nuevos formatos agresivos"""
         success_count = 0
         
-        # Cargar screening results
-        try:
-            with open('weekly_screening_results.json', 'r') as f:
-                self.screening_data = json.load(f)
-                print("✓ Datos de screening diario cargados")
+        # Cargar screening results (del daemon si SCREENER_DAEMON_URL está definido; si no, del archivo)
+        if os.environ.get('SCREENER_DAEMON_URL'):
+            from screening_daemon import fetch_latest  # http.server solo cuando hay daemon
+            self.screening_data = fetch_latest('weekly_screening_results.json')
+            if self.screening_data:
+                self.screening_stats = compute_screening_stats(self.screening_data)
+                print("✓ Datos de screening diario cargados desde el daemon")
                 success_count += 1
-        except Exception as e:
-            print(f"⚠️ Error cargando screening: {e}")
+        if not self.screening_data:
+            try:
+                with open('weekly_screening_results.json', 'r') as f:
+                    self.screening_data = json.load(f)
+                    self.screening_stats = load_screening_stats(screening=self.screening_data)
+                    print("✓ Datos de screening diario cargados")
+                    success_count += 1
+            except Exception as e:
+                print(f"⚠️ Error cargando screening: {e}")
         
         # Cargar consistency analysis (ahora diario)
         try:
@@ -49,6 +65,25 @@ class AggressiveMomentumReportGenerator:
         except Exception as e:
             print(f"⚠️ Error cargando rotación: {e}")
         
+        # Delta del screening (opcional): solo si corresponde al screening cargado
+        if self.screening_data:
+            self.delta = load_delta(self.screening_data)
+            if self.delta:
+                print("✓ Delta vs screening anterior cargado")
+        
+        # Telemetría de ejecución (opcional, no cuenta para el mínimo)
+        self.run_metrics = load_run_metrics()
+        if self.run_metrics:
+            print("✓ Telemetría de ejecución cargada")
+        
+        # Resultados de recomendaciones archivadas (opcional, lo genera `python cli.py outcomes`)
+        try:
+            with open(os.path.join('historical_data', 'pick_outcomes.json'), 'r') as f:
+                self.pick_outcomes = json.load(f)
+                print("✓ Resultados de recomendaciones archivadas cargados")
+        except Exception:
+            self.pick_outcomes = None
+        
         return success_count >= 2
     
     def create_aggressive_markdown_report(self):
@@ -87,6 +122,10 @@ class AggressiveMomentumReportGenerator:
             if self.screening_data:
                 self.write_momentum_picks_with_categories(f)
             
+            # Cambios vs el screening anterior
+            if self.delta and not self.delta.get('baseline'):
+                self.write_delta_section(f)
+            
             # Análisis de momentum responsivo
             if self.screening_data:
                 self.write_momentum_responsive_analysis(f)
@@ -129,16 +168,12 @@ class AggressiveMomentumReportGenerator:
             f.write("*No hay datos de screening disponibles*\n\n")
             return
         
-        detailed_results = self.screening_data.get('detailed_results', [])
-        total_analyzed = len(detailed_results)
+        stats = self.screening_stats
+        total_analyzed = stats['total']
         
         # Estadísticas MA50 bonus
-        ma50_bonus_count = 0
-        ma50_bonus_stocks = []
-        for stock in detailed_results:
-            if stock.get('optimizations', {}).get('ma50_bonus_applied', False):
-                ma50_bonus_count += 1
-                ma50_bonus_stocks.append(stock['symbol'])
+        ma50_bonus_count = stats['ma50_count']
+        ma50_bonus_stocks = [stock['symbol'] for stock in stats['ma50_stocks']]
         
         f.write(f"**📊 Análisis diario:** {total_analyzed:,} acciones procesadas\n")
         f.write(f"**🌟 MA50 bonus aplicado:** {ma50_bonus_count} acciones ({ma50_bonus_count/max(total_analyzed,1)*100:.1f}%)\n")
@@ -250,13 +285,8 @@ class AggressiveMomentumReportGenerator:
             mom_20d = stock.get('outperformance_20d', 0)
             
             # Categorizar momentum
-            if score > 200 or mom_20d > 25:
-                category = "EXCEPTIONAL"
-            elif score > 150 or mom_20d > 15:
-                category = "STRONG"
-            elif score > 100:
-                category = "MODERATE"
-            else:
+            category = momentum_category(score, mom_20d)
+            if category == "MODERATE" and score <= 100:
                 category = "EMERGING"
             
             f.write(f"| {i+1} | {symbol} | {score:.1f} | {ma50_indicator} | {risk:.1f}% | {rr:.1f} | {upside:.1f}% | {mom_20d:+.1f}% | {category} |\n")
@@ -264,50 +294,75 @@ class AggressiveMomentumReportGenerator:
         f.write("\n")
         
         # Estadísticas por categoría
-        exceptional = [s for s in detailed_results if s.get('score', 0) > 200 or s.get('outperformance_20d', 0) > 25]
-        strong = [s for s in detailed_results if 150 <= s.get('score', 0) <= 200 or 15 <= s.get('outperformance_20d', 0) <= 25]
+        exceptional_count = len(self.screening_stats['momentum_categories']['EXCEPTIONAL'])
+        strong_count = self.screening_stats['strong_band_count']
         
         f.write(f"### 📊 **Distribución por Categorías:**\n")
-        f.write(f"- **🔥 Exceptional:** {len(exceptional)} acciones\n")
-        f.write(f"- **💪 Strong:** {len(strong)} acciones\n")
-        f.write(f"- **📈 Total top-tier:** {len(exceptional) + len(strong)} acciones\n\n")
+        f.write(f"- **🔥 Exceptional:** {exceptional_count} acciones\n")
+        f.write(f"- **💪 Strong:** {strong_count} acciones\n")
+        f.write(f"- **📈 Total top-tier:** {exceptional_count + strong_count} acciones\n\n")
         
         f.write("---\n\n")
     
+    def write_delta_section(self, f):
+        """Cambios del top respecto al screening anterior (screening_delta.json)"""
+        f.write("## 🔀 **CAMBIOS VS SCREENING ANTERIOR**\n\n")
+        f.write(f"**Anterior:** {(self.delta.get('previous_analysis_date') or 'N/A')[:10]} · "
+                f"**Resumen:** {format_delta_summary(self.delta)} · "
+                f"**Sin cambios:** {self.delta['summary']['unchanged']}\n\n")
+        
+        changes = self.delta.get('changes', {})
+        if not changes:
+            f.write("*Top sin cambios relevantes*\n\n---\n\n")
+            return
+        
+        f.write("| Símbolo | Cambio | Rank | Score | Stop | Categoría |\n")
+        f.write("|---------|--------|------|-------|------|-----------|\n")
+        
+        def pair(values, fmt="{}"):
+            return " → ".join("—" if v is None else fmt.format(v) for v in values)
+        
+        for symbol, entry in sorted(changes.items(), key=lambda item: item[1]['rank'][1] or 99):
+            f.write(f"| {symbol} | {', '.join(entry['changes'])} | {pair(entry['rank'])} | "
+                    f"{pair(entry['score'], '{:.1f}')} | {pair(entry['stop_loss'], '${:.2f}')} | "
+                    f"{pair(entry['category'])} |\n")
+        
+        f.write("\n---\n\n")
+    
     def write_momentum_responsive_analysis(self, f):
         """Análisis de screening con enfoque en optimizaciones"""
         f.write("## 📊 **ANÁLISIS MOMENTUM DIARIO - OPTIMIZATION STACK**\n\n")
         
-        detailed_results = self.screening_data.get('detailed_results', [])
+        stats = self.screening_stats
+        total = stats['total']
         methodology = self.screening_data.get('methodology', {})
         
-        f.write(f"**Acciones analizadas:** {len(detailed_results)}\n")
+        f.write(f"**Acciones analizadas:** {total}\n")
         f.write(f"**Filosofía:** {methodology.get('philosophy', 'Daily monitoring, monthly trading')}\n")
         f.write(f"**Metodología:** {methodology.get('scoring', 'Momentum responsivo con MA50 bonus')}\n\n")
         
-        if detailed_results:
+        if total:
             # Estadísticas MA50 bonus
-            ma50_count = len([r for r in detailed_results if r.get('optimizations', {}).get('ma50_bonus_applied', False)])
-            weekly_atr_count = len([r for r in detailed_results if r.get('weekly_atr', 0) > 0])
-            positive_earnings = len([r for r in detailed_results 
-                                   if r.get('fundamental_data', {}).get('quarterly_earnings_positive', False)])
+            ma50_count = stats['ma50_count']
+            weekly_atr_count = stats['weekly_atr_count']
+            positive_earnings = stats['positive_earnings_count']
             
             f.write(f"### 🌟 **MA50 Bonus System Stats:**\n")
-            f.write(f"- **MA50 bonus aplicado:** {ma50_count}/{len(detailed_results)} acciones ({ma50_count/len(detailed_results)*100:.1f}%)\n")
+            f.write(f"- **MA50 bonus aplicado:** {ma50_count}/{total} acciones ({ma50_count/total*100:.1f}%)\n")
             f.write(f"- **Bonus promedio:** +22 puntos base por rebote\n")
             f.write(f"- **Multiplicador adicional:** 20% en score final\n")
             f.write(f"- **Señal técnica:** Rebote alcista en soporte MA50\n\n")
             
             f.write(f"### 🔧 **Optimization Stack Stats:**\n")
-            f.write(f"- **Weekly ATR disponible:** {weekly_atr_count}/{len(detailed_results)} acciones ({weekly_atr_count/len(detailed_results)*100:.1f}%)\n")
-            f.write(f"- **Earnings positivos:** {positive_earnings}/{len(detailed_results)} acciones ({positive_earnings/len(detailed_results)*100:.1f}%)\n")
+            f.write(f"- **Weekly ATR disponible:** {weekly_atr_count}/{total} acciones ({weekly_atr_count/total*100:.1f}%)\n")
+            f.write(f"- **Earnings positivos:** {positive_earnings}/{total} acciones ({positive_earnings/total*100:.1f}%)\n")
             f.write(f"- **Risk management:** 100% de acciones ≤10% riesgo (filtro sagrado)\n\n")
             
             # Métricas promedio
-            avg_score = sum(r.get('score', 0) for r in detailed_results) / len(detailed_results)
-            avg_momentum_20d = sum(r.get('outperformance_20d', 0) for r in detailed_results) / len(detailed_results)
-            avg_rr = sum(r.get('risk_reward_ratio', 0) for r in detailed_results) / len(detailed_results)
-            avg_upside = sum(r.get('upside_pct', 0) for r in detailed_results) / len(detailed_results)
+            avg_score = stats['avg_score']
+            avg_momentum_20d = stats['avg_outperformance_20d']
+            avg_rr = stats['avg_risk_reward']
+            avg_upside = stats['avg_upside']
             
             f.write(f"### 📈 **Métricas Promedio:**\n")
             f.write(f"- **Score promedio:** {avg_score:.1f} (con bonuses aplicados)\n")
@@ -434,28 +489,25 @@ class AggressiveMomentumReportGenerator:
             f.write("*No hay datos disponibles para análisis ATR*\n\n")
             return
         
-        detailed_results = self.screening_data.get('detailed_results', [])
-        if not detailed_results:
+        stats = self.screening_stats
+        if not stats['total']:
             f.write("*No hay resultados detallados para análisis ATR*\n\n")
             return
         
-        # Calcular estadísticas ATR
-        weekly_atrs = [r.get('weekly_atr', 0) for r in detailed_results if r.get('weekly_atr', 0) > 0]
-        daily_atrs = [r.get('atr', 0) for r in detailed_results if r.get('atr', 0) > 0]
-        
-        if not weekly_atrs or not daily_atrs:
+        # Estadísticas ATR
+        if not stats['weekly_atr_count'] or not stats['daily_atr_count']:
             f.write("*Datos ATR insuficientes para análisis comparativo*\n\n")
             return
         
-        avg_weekly = sum(weekly_atrs) / len(weekly_atrs)
-        avg_daily = sum(daily_atrs) / len(daily_atrs)
+        avg_weekly = stats['avg_weekly_atr']
+        avg_daily = stats['avg_daily_atr']
         avg_ratio = avg_weekly / avg_daily if avg_daily > 0 else 0
         
         f.write(f"### 📈 **Estadísticas ATR del Portfolio:**\n")
         f.write(f"- **Weekly ATR promedio:** {avg_weekly:.2f}\n")
         f.write(f"- **Daily ATR promedio:** {avg_daily:.2f}\n")
         f.write(f"- **Ratio Weekly/Daily:** {avg_ratio:.1f}x\n")
-        f.write(f"- **Acciones con Weekly ATR:** {len(weekly_atrs)}/{len(detailed_results)}\n\n")
+        f.write(f"- **Acciones con Weekly ATR:** {stats['weekly_atr_count']}/{stats['total']}\n\n")
         
         f.write(f"### 🎯 **Impacto en Take Profit Targets:**\n")
         f.write(f"- **Alineación temporal:** Weekly ATR mejor para holds de 1 mes\n")
@@ -473,29 +525,16 @@ class AggressiveMomentumReportGenerator:
             f.write("*No hay datos disponibles para análisis MA50*\n\n")
             return
         
-        detailed_results = self.screening_data.get('detailed_results', [])
-        
         # Estadísticas MA50
-        ma50_stocks = []
-        total_ma50_bonus = 0
-        
-        for stock in detailed_results:
-            optimizations = stock.get('optimizations', {})
-            if optimizations.get('ma50_bonus_applied', False):
-                ma50_stocks.append({
-                    'symbol': stock['symbol'],
-                    'bonus_value': optimizations.get('ma50_bonus_value', 0),
-                    'final_score': stock.get('score', 0),
-                    'risk_pct': stock.get('risk_pct', 0),
-                    'upside_pct': stock.get('upside_pct', 0)
-                })
-                total_ma50_bonus += optimizations.get('ma50_bonus_value', 0)
+        stats = self.screening_stats
+        ma50_stocks = stats['ma50_stocks']
+        total_ma50_bonus = stats['ma50_bonus_total']
         
         f.write(f"### 📊 **MA50 Bonus Impact Today:**\n")
-        f.write(f"- **Stocks with MA50 bonus:** {len(ma50_stocks)}/{len(detailed_results)} ({len(ma50_stocks)/max(len(detailed_results),1)*100:.1f}%)\n")
+        f.write(f"- **Stocks with MA50 bonus:** {len(ma50_stocks)}/{stats['total']} ({len(ma50_stocks)/max(stats['total'],1)*100:.1f}%)\n")
         
         if ma50_stocks:
-            avg_bonus = total_ma50_bonus / len(ma50_stocks)
+            avg_bonus = stats['avg_ma50_bonus']
             f.write(f"- **Average bonus value:** +{avg_bonus:.1f} points\n")
             f.write(f"- **Total bonus points awarded:** {total_ma50_bonus} points\n")
             f.write(f"- **Technical significance:** Bullish rebounds at MA50 support\n\n")
@@ -561,16 +600,16 @@ class AggressiveMomentumReportGenerator:
         f.write(f"- **SPY 90-day return:** {benchmark_context.get('spy_90d', 0):+.2f}%\n\n")
         
         # Análisis de outperformance
-        detailed_results = self.screening_data.get('detailed_results', [])
-        if detailed_results:
-            outperformers_20d = len([r for r in detailed_results if r.get('outperformance_20d', 0) > 5])
-            outperformers_60d = len([r for r in detailed_results if r.get('outperformance_60d', 0) > 0])
+        total = self.screening_stats['total']
+        if total:
+            outperformers_20d = self.screening_stats['outperformers_20d']
+            outperformers_60d = self.screening_stats['outperformers_60d']
             
             f.write(f"### 🏆 **Outperformance Analysis:**\n")
-            f.write(f"- **20-day outperformers (+5%):** {outperformers_20d}/{len(detailed_results)} "
-                   f"({outperformers_20d/len(detailed_results)*100:.1f}%)\n")
-            f.write(f"- **60-day outperformers (positive):** {outperformers_60d}/{len(detailed_results)} "
-                   f"({outperformers_60d/len(detailed_results)*100:.1f}%)\n\n")
+            f.write(f"- **20-day outperformers (+5%):** {outperformers_20d}/{total} "
+                   f"({outperformers_20d/total*100:.1f}%)\n")
+            f.write(f"- **60-day outperformers (positive):** {outperformers_60d}/{total} "
+                   f"({outperformers_60d/total*100:.1f}%)\n\n")
         
         f.write("### 🎯 **Market Alignment for Monthly Trading:**\n")
         f.write("- **Daily screening:** Capture momentum shifts early\n")
@@ -615,6 +654,7 @@ class AggressiveMomentumReportGenerator:
                 "emerging_momentum": []
             },
             "ma50_bonus_highlights": [],
+            "sector_strength": [],
             "rotation_recommendations": {},
             "market_context": {},
             "optimization_metrics": {
@@ -629,75 +669,71 @@ class AggressiveMomentumReportGenerator:
         # Datos de screening con enfoque en MA50 bonus
         if self.screening_data:
             detailed_results = self.screening_data.get('detailed_results', [])
-            dashboard_data["summary"]["total_analyzed"] = len(detailed_results)
-            
-            # MA50 bonus highlights
-            ma50_stocks = []
-            ma50_count = 0
-            total_ma50_bonus = 0
+            stats = self.screening_stats
+            dashboard_data["summary"]["total_analyzed"] = stats['total']
             
-            for stock in detailed_results[:15]:
-                optimizations = stock.get('optimizations', {})
-                if optimizations.get('ma50_bonus_applied', False):
-                    ma50_count += 1
-                    bonus_value = optimizations.get('ma50_bonus_value', 0)
-                    total_ma50_bonus += bonus_value
-                    
-                    ma50_stocks.append({
-                        "symbol": stock['symbol'],
-                        "score": stock.get('score', 0),
-                        "bonus_value": bonus_value,
-                        "risk_pct": stock.get('risk_pct', 0),
-                        "upside_pct": stock.get('upside_pct', 0)
-                    })
-            
-            dashboard_data["ma50_bonus_highlights"] = ma50_stocks
+            # MA50 bonus sobre todos los candidatos (agregados de una sola pasada)
+            ma50_count = stats['ma50_count']
+            dashboard_data["ma50_bonus_highlights"] = [
+                {
+                    "symbol": stock['symbol'],
+                    "score": stock['final_score'],
+                    "bonus_value": stock['bonus_value'],
+                    "risk_pct": stock['risk_pct'],
+                    "upside_pct": stock['upside_pct']
+                }
+                for stock in stats['ma50_stocks'][:15]
+            ]
             dashboard_data["summary"]["ma50_bonus_applied"] = ma50_count
-            dashboard_data["optimization_metrics"]["avg_ma50_bonus"] = total_ma50_bonus / max(ma50_count, 1)
-            dashboard_data["optimization_metrics"]["ma50_bonus_percentage"] = (ma50_count / max(len(detailed_results), 1)) * 100
+            dashboard_data["optimization_metrics"]["avg_ma50_bonus"] = stats['avg_ma50_bonus']
+            dashboard_data["optimization_metrics"]["ma50_bonus_percentage"] = (ma50_count / max(stats['total'], 1)) * 100
             
             # Clasificar por momentum con MA50 tracking
-            exceptional = []
-            strong = []
-            emerging = []
+            categories = stats['momentum_categories']
+            exceptional = categories['EXCEPTIONAL']
+            strong = categories['STRONG']
+            emerging = categories['MODERATE']
             
-            for stock in detailed_results:
+            # Top picks con información MA50
+            for stock in detailed_results[:10]:
                 score = stock.get('score', 0)
-                momentum_20d = stock.get('outperformance_20d', 0)
                 ma50_bonus = stock.get('optimizations', {}).get('ma50_bonus_applied', False)
                 
-                if score > 200 or momentum_20d > 25:
-                    momentum_category = 'EXCEPTIONAL'
-                    exceptional.append(stock['symbol'])
-                elif score > 150 or momentum_20d > 15:
-                    momentum_category = 'STRONG'
-                    strong.append(stock['symbol'])
-                else:
-                    momentum_category = 'MODERATE'
-                    emerging.append(stock['symbol'])
-                
-                # Añadir a top picks con información MA50
-                if len(dashboard_data["top_picks"]) < 10:
-                    pick = {
-                        "symbol": stock['symbol'],
-                        "score": score,
-                        "momentum_category": momentum_category,
-                        "risk_pct": stock.get('risk_pct', 0),
-                        "upside_pct": stock.get('upside_pct', 0),
-                        "ma50_bonus": ma50_bonus,
-                        "ma50_bonus_value": stock.get('optimizations', {}).get('ma50_bonus_value', 0),
-                        "monthly_trading_suitable": stock.get('risk_pct', 0) <= 10.0,
-                        "optimization_features": stock.get('optimizations', {}),
-                        "target_hold": "~1 month with daily monitoring",
-                        "rotation_urgency": "HIGH" if ma50_bonus else "MEDIUM"
-                    }
-                    dashboard_data["top_picks"].append(pick)
+                pick = {
+                    "symbol": stock['symbol'],
+                    "score": score,
+                    "momentum_category": momentum_category(score, stock.get('outperformance_20d', 0)),
+                    "risk_pct": stock.get('risk_pct', 0),
+                    "upside_pct": stock.get('upside_pct', 0),
+                    "ma50_bonus": ma50_bonus,
+                    "ma50_bonus_value": stock.get('optimizations', {}).get('ma50_bonus_value', 0),
+                    "sector": stock.get('sector', 'Unknown'),
+                    "sector_bonus": stock.get('sector_bonus', 0),
+                    "monthly_trading_suitable": stock.get('risk_pct', 0) <= 10.0,
+                    "optimization_features": stock.get('optimizations', {}),
+                    "target_hold": "~1 month with daily monitoring",
+                    "rotation_urgency": "HIGH" if ma50_bonus else "MEDIUM"
+                }
+                dashboard_data["top_picks"].append(pick)
             
             dashboard_data["summary"]["exceptional_momentum"] = len(exceptional)
             dashboard_data["summary"]["strong_momentum"] = len(strong)
             dashboard_data["momentum_analysis"]["exceptional_momentum"] = exceptional[:10]
             dashboard_data["momentum_analysis"]["strong_momentum"] = strong[:10]
             dashboard_data["momentum_analysis"]["emerging_momentum"] = emerging[:10]
+            
+            # Fuerza por sector (universo completo evaluado por el screener)
+            dashboard_data["sector_strength"] = self.screening_data.get('sector_strength', [])
+        
+        # Cambios vs el screening anterior (delta ya calculado tras el screening)
+        if self.delta:
+            dashboard_data["delta"] = {
+                "baseline": self.delta.get('baseline', False),
+                "previous_analysis_date": self.delta.get('previous_analysis_date'),
+                "summary": self.delta.get('summary', {}),
+                "changes": [dict(entry, symbol=symbol) for symbol, entry in
+                            sorted(self.delta.get('changes', {}).items(), key=lambda item: item[1]['rank'][1] or 99)]
+            }
         
         # Datos de rotación con criterios estrictos
         if self.rotation_data:
@@ -722,6 +758,29 @@ class AggressiveMomentumReportGenerator:
                 "spy_90d": benchmark.get('spy_90d', 0)
             }
         
+        # Telemetría: historial de tiempos por etapa para graficar en el dashboard
+        if self.run_metrics:
+            latest = self.run_metrics.get('latest', {})
+            dashboard_data["execution_time_minutes"] = latest.get('total_seconds', 0) / 60
+            dashboard_data["run_metrics"] = {
+                "latest": {
+                    "total_seconds": latest.get('total_seconds', 0),
+                    "stages": {name: stage.get('seconds', 0) for name, stage in latest.get('stages', {}).items()},
+                    "rate_limiter_wait_seconds": latest.get('rate_limiter_wait_seconds', 0),
+                    "requests": {endpoint: data.get('events', {}) for endpoint, data in latest.get('requests', {}).items()}
+                },
+                "history": self.run_metrics.get('history', [])
+            }
+        
+        # Qué tal salieron las recomendaciones archivadas (sin el detalle por recomendación)
+        if self.pick_outcomes:
+            dashboard_data["pick_outcomes"] = {
+                "panel_last_date": self.pick_outcomes.get('panel_last_date'),
+                "summary": self.pick_outcomes.get('summary', {}),
+                "by_source": self.pick_outcomes.get('by_source', {}),
+                "by_date": self.pick_outcomes.get('by_date', [])[-20:]
+            }
+        
         # Crear directorio docs si no existe
         os.makedirs('docs', exist_ok=True)
         
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Data Providers - Origen de datos intercambiable para RobustDataFetcher
+======================================================================
+
+🌐 YahooProvider: yfinance en vivo sobre una sesión HTTP compartida (http_session.py)
+💽 LocalDirectoryProvider: dataset congelado en disco (Parquet o CSV), sin red ni esperas
+🔀 DATA_SOURCE_DIR=<dir> activa el proveedor local: el mismo screener corre offline
+🧊 `python data_providers.py freeze <dir>` congela price_cache/ + sector_map.json en un dataset
+
+Estructura del dataset local:
+    <dir>/history/<SYMBOL>.parquet | .csv   # OHLCV (índice = fecha de sesión)
+    <dir>/info/<SYMBOL>.json                # Snapshot de ticker.info
+    <dir>/universe.csv                      # symbol,sector,industry (opcional)
+    <dir>/meta.json                         # last_session del dataset (opcional)
+
+Uso:
+    python data_providers.py freeze frozen_data/
+    DATA_SOURCE_DIR=frozen_data/ FORCE_RUN=true python conservative_screener.py
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+from datetime import date, datetime
+
+import pandas as pd
+import yfinance as yf
+
+from http_session import YahooSession
+from price_cache import PRICE_CACHE_DIR, PriceCache, safe_name, session_dates, trim_to_period
+from sector_strength import SECTOR_MAP_FILE, SectorMap
+
+HISTORY_FORMATS = ('parquet', 'csv')
+UNIVERSE_FILE = 'universe.csv'
+META_FILE = 'meta.json'
+
+
+class YahooProvider:
+    """Yahoo Finance vía yfinance (proveedor por defecto)"""
+
+    name = 'yahoo'
+    remote = True  # Sujeto a rate limiting; sus datos se cachean en price_cache/
+
+    def __init__(self, pool_size=5, metrics=None):
+        self.pool_size = pool_size
+        self.metrics = metrics
+        self._http = None
+        self._shared_session = True
+        self._lock = threading.Lock()
+
+    def http_session(self):
+        """Sesión compartida (creada al primer uso: las ejecuciones 100% caché no la abren)"""
+        if self._http is None:
+            with self._lock:
+                if self._http is None:
+                    self._http = YahooSession(self.pool_size, self.metrics)
+        return self._http
+
+    def _ticker(self, symbol):
+        if self._shared_session:
+            try:
+                return yf.Ticker(symbol, session=self.http_session().session)
+            except Exception:
+                # yfinance que no acepta la sesión (p.ej. exige curl_cffi): vuelve a la suya propia
+                self._shared_session = False
+        return yf.Ticker(symbol)
+
+    def history(self, symbol, period):
+        return self._ticker(symbol).history(period=period, timeout=15)
+
+    def info(self, symbol):
+        return self._ticker(symbol).info
+
+    def connection_stats(self):
+        """Reutilización de conexiones de la sesión compartida (None si no se abrió)"""
+        if self._http is None or not self._shared_session:
+            return None
+        return self._http.stats()
+
+    def universe_rows(self):
+        """None: el universo se descarga del screener de NASDAQ"""
+        return None
+
+    def last_session(self):
+        """None: la última sesión la decide el calendario NYSE"""
+        return None
+
+
+class LocalDirectoryProvider:
+    """Dataset congelado en disco: lecturas a velocidad de disco y resultados reproducibles"""
+
+    name = 'local'
+    remote = False
+
+    def __init__(self, root):
+        self.root = root
+        self.history_dir = os.path.join(root, 'history')
+        self.info_dir = os.path.join(root, 'info')
+        try:
+            with open(os.path.join(root, META_FILE), 'r') as f:
+                self.meta = json.load(f)
+        except Exception:
+            self.meta = {}
+
+    def _history_file(self, symbol):
+        for extension in HISTORY_FORMATS:
+            path = os.path.join(self.history_dir, f"{safe_name(symbol)}.{extension}")
+            if os.path.exists(path):
+                return path, extension
+        return None, None
+
+    def history(self, symbol, period):
+        """OHLCV como lo devolvería yfinance (DataFrame vacío si el símbolo no está)"""
+        path, extension = self._history_file(symbol)
+        if path is None:
+            return pd.DataFrame()
+        try:
+            hist = pd.read_parquet(path) if extension == 'parquet' else _read_history_csv(path)
+        except ImportError:
+            return pd.DataFrame()  # Parquet sin motor (pyarrow/fastparquet) instalado
+        return trim_to_period(hist.sort_index(), period)
+
+    def info(self, symbol):
+        try:
+            with open(os.path.join(self.info_dir, f"{safe_name(symbol)}.json"), 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def universe_rows(self):
+        """Filas symbol/sector/industry; sin universe.csv, todos los símbolos con histórico"""
+        path = os.path.join(self.root, UNIVERSE_FILE)
+        if os.path.exists(path):
+            with open(path, 'r', newline='') as f:
+                return list(csv.DictReader(f))
+        if not os.path.isdir(self.history_dir):
+            return []
+        return [{'symbol': os.path.splitext(name)[0]} for name in sorted(os.listdir(self.history_dir))
+                if name.endswith(tuple(f".{extension}" for extension in HISTORY_FORMATS))]
+
+    def connection_stats(self):
+        return None
+
+    def last_session(self):
+        value = self.meta.get('last_session')
+        return date.fromisoformat(value) if value else None
+
+
+def _read_history_csv(path):
+    hist = pd.read_csv(path, index_col=0)
+    try:
+        index = pd.to_datetime(hist.index)
+    except (ValueError, TypeError):
+        # Offsets mezclados (cambio de horario EST/EDT): se normaliza vía UTC
+        index = pd.to_datetime(hist.index, utc=True).tz_convert('America/New_York')
+    hist.index = index
+    return hist
+
+
+def create_data_provider(pool_size=5, metrics=None):
+    """Proveedor según el entorno: DATA_SOURCE_DIR -> local, si no Yahoo (pool = concurrencia)"""
+    root = os.environ.get('DATA_SOURCE_DIR')
+    return LocalDirectoryProvider(root) if root else YahooProvider(pool_size, metrics)
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def freeze_dataset(cache, output_dir, sector_map=None, history_format=None):
+    """Exporta históricos, info y sectores cacheados a un dataset local"""
+    history_format = history_format or ('parquet' if _parquet_available() else 'csv')
+    history_dir = os.path.join(output_dir, 'history')
+    info_dir = os.path.join(output_dir, 'info')
+    os.makedirs(history_dir, exist_ok=True)
+    os.makedirs(info_dir, exist_ok=True)
+
+    symbols = cache.cached_symbols()
+    last_session = None
+    for symbol in symbols:
+        hist = cache.load_history(symbol)
+        if hist.empty:
+            continue
+        path = os.path.join(history_dir, f"{safe_name(symbol)}.{history_format}")
+        if history_format == 'parquet':
+            hist.to_parquet(path)
+        else:
+            hist.to_csv(path)
+        symbol_last = session_dates(hist)[-1]
+        last_session = max(last_session, symbol_last) if last_session else symbol_last
+
+        info = cache.load_info(symbol)
+        if info:
+            with open(os.path.join(info_dir, f"{safe_name(symbol)}.json"), 'w') as f:
+                json.dump(info, f, default=str)
+
+    sector_map = sector_map or SectorMap()
+    with open(os.path.join(output_dir, UNIVERSE_FILE), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['symbol', 'sector', 'industry'])
+        writer.writeheader()
+        for symbol in symbols:
+            sector = sector_map.sector_of(symbol) if symbol in sector_map.symbols else ''
+            writer.writerow({'symbol': symbol, 'sector': sector, 'industry': sector_map.industry_of(symbol)})
+
+    meta = {
+        'created_at': datetime.now().isoformat(),
+        'source': os.path.abspath(cache.cache_dir),
+        'symbols': len(symbols),
+        'history_format': history_format,
+        'last_session': last_session.isoformat() if last_session else None
+    }
+    with open(os.path.join(output_dir, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Datasets locales para ejecutar el screener sin red')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    freeze_parser = subparsers.add_parser('freeze', help='Congela price_cache/ en un dataset local')
+    freeze_parser.add_argument('output_dir')
+    freeze_parser.add_argument('--cache-dir', default=PRICE_CACHE_DIR, help='Directorio de price_cache')
+    freeze_parser.add_argument('--sector-map', default=SECTOR_MAP_FILE)
+    freeze_parser.add_argument('--format', choices=HISTORY_FORMATS, help='Por defecto parquet si hay pyarrow')
+    args = parser.parse_args(argv)
+
+    cache = PriceCache(args.cache_dir)
+    if not cache.cached_symbols():
+        print(f"❌ No hay históricos en {args.cache_dir}")
+        return False
+
+    meta = freeze_dataset(cache, args.output_dir, SectorMap(args.sector_map), args.format)
+    print(f"🧊 Dataset congelado en {args.output_dir}: {meta['symbols']} símbolos "
+          f"({meta['history_format']}) hasta {meta['last_session']}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Exit Simulator - Recorrido real de stops, trailing stops y take-profit
+=====================================================================
+
+🛤️ Para cada operación (posición de current_portfolio.json o recomendación histórica) recorre las
+   sesiones posteriores a la entrada con High/Low del panel: ¿se tocó el stop o el take-profit, y cuándo?
+📈 Trailing stops: máximo acumulado de Close - 3·ATR14 o de la MA50 (solo suben), nunca por debajo del stop
+🧮 Todo en arrays (operaciones x sesiones): posiciones y recomendaciones juntas en milisegundos
+⚖️ Stop y take-profit en la misma sesión: se asume el stop (orden intradía desconocido, criterio conservador)
+💾 `python exit_simulator.py` -> exit_simulation.json (detalle + tasas de acierto de las recomendaciones)
+"""
+
+import glob
+import json
+import sys
+import time
+import warnings
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from market_calendar import latest_completed_session
+from price_cache import PriceCache
+from price_panel import PRICE_PANEL_DIR, load_or_build_price_panel
+
+EXIT_SIMULATION_FILE = 'exit_simulation.json'
+PORTFOLIO_FILE = 'current_portfolio.json'
+RECOMMENDATION_FILES = 'weekly_screening_results_*.json'
+
+ATR_WINDOW = 14
+MA_WINDOW = 50
+TRAILING_ATR_MULTIPLE = 3.0
+BASIC_STOP_PCT = 0.10             # Mismo stop básico que el recomendador cuando la posición no trae uno
+RECOMMENDATION_HORIZON = 21       # Sesiones (~1 mes): horizonte de una recomendación histórica
+
+# Prioridad en la misma sesión: stop fijo > trailing ATR > take-profit
+EXIT_RULES = ('stop_loss', 'trailing_atr', 'take_profit')
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).date()
+    except ValueError:
+        return None
+
+
+def archive_session(document):
+    """
+    Sesión NYSE cuyo cierre es la entrada de un archivo: su market_session o, si no consta (rotación y
+    screenings antiguos), la última sesión cerrada en su analysis_date (el workflow corre antes de la
+    apertura: el cierre es el de la sesión anterior). analysis_date sin zona se toma en UTC (runner)
+    """
+    session = _parse_date(document.get('market_session'))
+    if session is not None:
+        return session
+    try:
+        analyzed = datetime.fromisoformat(str(document.get('analysis_date') or '').replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if analyzed.tzinfo is None:
+        analyzed = analyzed.replace(tzinfo=timezone.utc)
+    return latest_completed_session(analyzed)
+
+
+def position_trades(portfolio):
+    """Operaciones abiertas de la cartera (stop/take-profit propios o stop básico del 10%)"""
+    trades = []
+    for symbol, position in (portfolio.get('positions') or {}).items():
+        entry_price = float(position.get('entry_price') or 0)
+        entry_date = _parse_date(position.get('entry_date'))
+        if entry_price <= 0 or entry_date is None:
+            continue
+        trades.append({
+            'symbol': symbol,
+            'source': 'position',
+            'entry_date': entry_date,
+            'entry_price': entry_price,
+            'stop_loss': float(position.get('stop_loss') or entry_price * (1 - BASIC_STOP_PCT)),
+            'take_profit': float(position['take_profit']) if position.get('take_profit') else None,
+            'horizon': None
+        })
+    return trades
+
+
+def recommendation_trades(pattern=RECOMMENDATION_FILES):
+    """Recomendaciones archivadas (entrada al cierre de su sesión, horizonte de un mes)"""
+    trades = {}
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path, 'r') as f:
+                screening = json.load(f)
+        except Exception:
+            continue
+        session = archive_session(screening)
+        if session is None:
+            continue
+        for result in screening.get('detailed_results', []):
+            symbol = result.get('symbol')
+            entry_price = result.get('current_price') or 0
+            if not symbol or entry_price <= 0 or not result.get('stop_loss'):
+                continue
+            trades[(symbol, session)] = {
+                'symbol': symbol,
+                'source': 'recommendation',
+                'entry_date': session,
+                'entry_price': float(entry_price),
+                'stop_loss': float(result['stop_loss']),
+                'take_profit': float(result['take_profit']) if result.get('take_profit') else None,
+                'horizon': RECOMMENDATION_HORIZON
+            }
+    return list(trades.values())
+
+
+def forward_fill(values):
+    """Rellena NaN con el último valor válido de cada fila (sesiones sin cotización)"""
+    positions = np.where(np.isnan(values), 0, np.arange(values.shape[1]))
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    return values[np.arange(values.shape[0])[:, None], positions]
+
+
+def _rolling_mean(values, window):
+    """Media móvil por fila (NaN hasta completar la ventana)"""
+    cumulative = np.nancumsum(values, axis=1)
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        shifted = np.concatenate([np.zeros((values.shape[0], 1)), cumulative[:, :-window]], axis=1)
+        result[:, window - 1:] = (cumulative[:, window - 1:] - shifted) / window
+    return result
+
+
+def _symbol_indicators(panel, symbols):
+    """OHLC float64, ATR14 y MA50 de los símbolos implicados (símbolos x sesiones)"""
+    rows = [panel.symbol_index[s] for s in symbols]
+    close = forward_fill(panel.fields['close'][rows].astype(np.float64))
+    high = forward_fill(panel.fields['high'][rows].astype(np.float64))
+    low = forward_fill(panel.fields['low'][rows].astype(np.float64))
+    open_ = forward_fill(panel.fields['open'][rows].astype(np.float64))
+
+    previous_close = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+    return {
+        'open': open_, 'high': high, 'low': low, 'close': close,
+        'atr': _rolling_mean(true_range, ATR_WINDOW),
+        'ma50': _rolling_mean(close, MA_WINDOW)
+    }
+
+
+def first_hit(hits):
+    """Índice de la primera sesión con True por fila (-1 si nunca)"""
+    any_hit = hits.any(axis=1)
+    return np.where(any_hit, hits.argmax(axis=1), -1)
+
+
+def simulate_exits(panel, trades, atr_multiple=TRAILING_ATR_MULTIPLE):
+    """
+    Recorrido de todas las operaciones a la vez
+    Devuelve una lista alineada con `trades` (None si el símbolo no está en el panel o no hay
+    sesiones posteriores a la entrada)
+    """
+    outcomes = [None] * len(trades)
+    dates = panel.dates
+    entry_positions = np.array([np.searchsorted(dates, np.datetime64(t['entry_date'], 'D'), side='right') - 1
+                                for t in trades], dtype=int)
+    valid = [i for i, t in enumerate(trades)
+             if t['symbol'] in panel and 0 <= entry_positions[i] < len(dates) - 1]
+    if not valid:
+        return outcomes
+
+    symbols = sorted({trades[i]['symbol'] for i in valid})
+    symbol_rows = {symbol: row for row, symbol in enumerate(symbols)}
+    data = _symbol_indicators(panel, symbols)
+
+    rows = np.array([symbol_rows[trades[i]['symbol']] for i in valid])
+    entry = entry_positions[valid]
+    last = len(dates) - 1
+    horizon = np.array([trades[i]['horizon'] or last for i in valid])
+    sessions = np.minimum(last - entry, horizon)                   # Sesiones observadas tras la entrada
+    width = int(sessions.max())
+    offsets = np.arange(width)
+    observed = offsets[None, :] < sessions[:, None]
+    columns = np.minimum(entry[:, None] + 1 + offsets[None, :], last)
+
+    def path(field):
+        return np.where(observed, data[field][rows[:, None], columns], np.nan)
+
+    open_, high, low, close = path('open'), path('high'), path('low'), path('close')
+    stop = np.array([trades[i]['stop_loss'] for i in valid])
+    take_profit = np.array([trades[i]['take_profit'] or np.nan for i in valid])
+
+    # Trailing: nivel vigente en la sesión j = máximo de los candidatos hasta el cierre anterior
+    known_columns = np.minimum(entry[:, None] + offsets[None, :], last)  # Cierres entry .. entry+width-1
+    atr_candidates = data['close'][rows[:, None], known_columns] - atr_multiple * data['atr'][rows[:, None], known_columns]
+    ma50_candidates = data['ma50'][rows[:, None], known_columns]
+    trailing_atr = np.fmax(np.fmax.accumulate(atr_candidates, axis=1), stop[:, None])
+    trailing_ma50 = np.fmax(np.fmax.accumulate(ma50_candidates, axis=1), stop[:, None])
+
+    with np.errstate(invalid='ignore'):
+        first = {
+            'stop_loss': first_hit(low <= stop[:, None]),
+            'take_profit': first_hit(high >= take_profit[:, None]),
+            'trailing_atr': first_hit(low <= trailing_atr),
+            'trailing_ma50': first_hit(low <= trailing_ma50),
+        }
+
+    # Salida = primera regla disparada (empates: orden de EXIT_RULES)
+    candidates = np.stack([np.where(first[rule] >= 0, first[rule], width + 1) for rule in EXIT_RULES])
+    exit_index = candidates.min(axis=0)
+    exit_rule = candidates.argmin(axis=0)
+    exited = exit_index <= width
+    exit_levels = np.stack([stop, trailing_atr[np.arange(len(valid)), np.minimum(exit_index, width - 1)], take_profit])
+
+    # Excursión máxima favorable/adversa hasta la salida (o hasta hoy)
+    until_exit = offsets[None, :] <= np.where(exited, exit_index, width)[:, None]
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # Filas sin cotizaciones (All-NaN slice)
+        max_high = np.nanmax(np.where(until_exit, high, np.nan), axis=1)
+        min_low = np.nanmin(np.where(until_exit, low, np.nan), axis=1)
+
+    # Niveles para la próxima sesión: incluyen el último cierre observado
+    next_columns = entry + sessions
+    next_atr = np.fmax(np.fmax(trailing_atr[np.arange(len(valid)), sessions - 1],
+                               data['close'][rows, next_columns] - atr_multiple * data['atr'][rows, next_columns]), stop)
+    next_ma50 = np.fmax(np.fmax(trailing_ma50[np.arange(len(valid)), sessions - 1],
+                                data['ma50'][rows, next_columns]), stop)
+
+    def session_date(k, index):
+        return str(dates[entry[k] + 1 + index]) if index >= 0 else None
+
+    def rounded(value, digits=2):
+        return round(float(value), digits) if value is not None and np.isfinite(value) else None
+
+    for k, i in enumerate(valid):
+        trade = trades[i]
+        entry_price = trade['entry_price']
+        last_close = close[k, sessions[k] - 1]
+        outcome = {
+            'symbol': trade['symbol'],
+            'source': trade['source'],
+            'entry_date': trade['entry_date'].isoformat(),
+            'entry_price': rounded(entry_price),
+            'stop_loss': rounded(stop[k]),
+            'take_profit': rounded(take_profit[k]),
+            'sessions': int(sessions[k]),
+            'last_close': rounded(last_close),
+            'return_pct': rounded((last_close / entry_price - 1) * 100),
+            'max_favorable_pct': rounded((max_high[k] / entry_price - 1) * 100),
+            'max_adverse_pct': rounded((min_low[k] / entry_price - 1) * 100),
+            'trailing_atr_level': rounded(next_atr[k]),
+            'trailing_ma50_level': rounded(next_ma50[k]),
+        }
+        for rule, index in first.items():
+            outcome[f"{rule}_hit"] = bool(index[k] >= 0)
+            outcome[f"{rule}_date"] = session_date(k, int(index[k]))
+
+        if exited[k]:
+            rule = EXIT_RULES[exit_rule[k]]
+            day_open = open_[k, exit_index[k]]
+            level = exit_levels[exit_rule[k], k]
+            # Hueco en la apertura: se ejecuta al open si ya está más allá del nivel
+            if not np.isfinite(day_open):
+                exit_price = level
+            else:
+                exit_price = max(day_open, level) if rule == 'take_profit' else min(day_open, level)
+            outcome.update({
+                'exit_rule': rule,
+                'exit_date': session_date(k, int(exit_index[k])),
+                'exit_price': rounded(exit_price),
+                'exit_return_pct': rounded((exit_price / entry_price - 1) * 100)
+            })
+        else:
+            outcome.update({'exit_rule': 'open', 'exit_date': None, 'exit_price': None,
+                            'exit_return_pct': outcome['return_pct']})
+        outcomes[i] = outcome
+    return outcomes
+
+
+def summarize_outcomes(outcomes):
+    """Tasas de salida por regla y rentabilidad media de las operaciones evaluadas"""
+    evaluated = [o for o in outcomes if o]
+    if not evaluated:
+        return {'trades': len(outcomes), 'evaluated': 0}
+    by_rule = {rule: 0 for rule in EXIT_RULES + ('open',)}
+    for outcome in evaluated:
+        by_rule[outcome['exit_rule']] += 1
+
+    def average(key):
+        values = [o[key] for o in evaluated if o[key] is not None]
+        return round(sum(values) / len(values), 2) if values else None
+
+    return {
+        'trades': len(outcomes),
+        'evaluated': len(evaluated),
+        'exit_rules': by_rule,
+        'exit_rules_pct': {rule: round(count / len(evaluated) * 100, 1) for rule, count in by_rule.items()},
+        'avg_exit_return_pct': average('exit_return_pct'),
+        'avg_max_favorable_pct': average('max_favorable_pct'),
+        'avg_max_adverse_pct': average('max_adverse_pct'),
+        'avg_sessions': average('sessions')
+    }
+
+
+def simulate_recommendations(panel, pattern=RECOMMENDATION_FILES):
+    """Recomendaciones archivadas: no dependen de la cartera (en modo batch se simulan una vez)"""
+    outcomes = simulate_exits(panel, recommendation_trades(pattern)) if pattern else []
+    return {
+        'recommendations_summary': summarize_outcomes(outcomes),
+        'recommendations': [o for o in outcomes if o]
+    }
+
+
+def run_exit_simulation(portfolio, panel=None, recommendations_pattern=RECOMMENDATION_FILES,
+                        recommendations=None):
+    """
+    Posiciones + recomendaciones históricas en una sola simulación
+    - recommendations: resultado previo de simulate_recommendations (solo se simulan las posiciones)
+    """
+    panel = panel if panel is not None else load_or_build_price_panel(PriceCache(), PRICE_PANEL_DIR)
+    positions = position_trades(portfolio or {})
+
+    start = time.perf_counter()
+    if recommendations is None:
+        archived = recommendation_trades(recommendations_pattern) if recommendations_pattern else []
+        outcomes = simulate_exits(panel, positions + archived)
+        position_outcomes = outcomes[:len(positions)]
+        recommendation_outcomes = outcomes[len(positions):]
+        recommendations = {
+            'recommendations_summary': summarize_outcomes(recommendation_outcomes),
+            'recommendations': [o for o in recommendation_outcomes if o]
+        }
+    else:
+        position_outcomes = simulate_exits(panel, positions)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'panel_last_date': str(panel.dates[-1]),
+        'elapsed_ms': round(elapsed_ms, 2),
+        'parameters': {
+            'trailing_atr_multiple': TRAILING_ATR_MULTIPLE,
+            'atr_window': ATR_WINDOW,
+            'ma_window': MA_WINDOW,
+            'recommendation_horizon_sessions': RECOMMENDATION_HORIZON
+        },
+        'positions': {o['symbol']: o for o in position_outcomes if o},
+        'recommendations_summary': recommendations['recommendations_summary'],
+        'recommendations': recommendations['recommendations']
+    }
+
+
+def main():
+    try:
+        with open(PORTFOLIO_FILE, 'r') as f:
+            portfolio = json.load(f)
+    except Exception:
+        portfolio = {}
+
+    try:
+        simulation = run_exit_simulation(portfolio)
+    except Exception as e:
+        print(f"❌ Simulación de salidas no disponible: {e}")
+        return False
+
+    with open(EXIT_SIMULATION_FILE, 'w') as f:
+        json.dump(simulation, f, indent=2)
+
+    summary = simulation['recommendations_summary']
+    print(f"🛤️ Simulación de salidas en {simulation['elapsed_ms']:.1f} ms "
+          f"(panel hasta {simulation['panel_last_date']})")
+    for symbol, outcome in simulation['positions'].items():
+        print(f"   {symbol:6s} | {outcome['exit_rule']:13s} | P&L {outcome['exit_return_pct']:+.1f}% | "
+              f"Trailing ATR ${outcome['trailing_atr_level']} | MA50 ${outcome['trailing_ma50_level']}")
+    if summary['evaluated']:
+        rules = ", ".join(f"{rule} {pct:.0f}%" for rule, pct in summary['exit_rules_pct'].items())
+        print(f"📊 Recomendaciones históricas: {summary['evaluated']} | {rules} | "
+              f"rentabilidad media {summary['avg_exit_return_pct']:+.2f}%")
+    print(f"💾 {EXIT_SIMULATION_FILE}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -8,7 +8,10 @@ import os
 import sys
 from datetime import datetime
 
-def detect_optimizations(screening, consistency, rotation):
+from result_delta import format_delta_summary, load_delta
+from screening_stats import compute_screening_stats, load_screening_stats
+
+def detect_optimizations(screening, consistency, rotation, stats=None):
     """🆕 Detecta optimizaciones aplicadas en los datos"""
     optimizations = {
         'weekly_atr_optimization': False,
@@ -24,45 +27,25 @@ def detect_optimizations(screening, consistency, rotation):
     
     # 1. Detectar Weekly ATR Optimization
     if screening:
-        # Buscar en detailed_results
-        detailed_results = screening.get('detailed_results', [])
-        weekly_atr_count = 0
-        weekly_atr_sum = 0
-        daily_atr_sum = 0
-        positive_earnings_count = 0
-        
-        for result in detailed_results:
-            # Weekly ATR detection
-            weekly_atr = result.get('weekly_atr', 0)
-            daily_atr = result.get('atr', 0)
-            
-            if weekly_atr > 0:
-                weekly_atr_count += 1
-                weekly_atr_sum += weekly_atr
-                
-            if daily_atr > 0:
-                daily_atr_sum += daily_atr
-            
-            # Fundamental filtering detection
-            fundamental_data = result.get('fundamental_data', {})
-            if fundamental_data.get('quarterly_earnings_positive', False):
-                positive_earnings_count += 1
+        # Agregados de detailed_results (una sola pasada, compartidos con el reporte)
+        stats = stats or compute_screening_stats(screening)
+        total_results = stats['total']
         
         # Weekly ATR optimization
-        if weekly_atr_count > 0:
+        if stats['weekly_atr_count'] > 0:
             optimizations['weekly_atr_optimization'] = True
             optimizations['optimization_count'] += 1
             optimizations['optimization_features'].append('Weekly ATR')
-            optimizations['avg_weekly_atr'] = weekly_atr_sum / weekly_atr_count
+            optimizations['avg_weekly_atr'] = stats['avg_weekly_atr']
             
-            if daily_atr_sum > 0:
-                optimizations['avg_daily_atr'] = daily_atr_sum / len(detailed_results)
+            if stats['daily_atr_sum'] > 0:
+                optimizations['avg_daily_atr'] = stats['daily_atr_sum'] / total_results
                 if optimizations['avg_daily_atr'] > 0:
                     optimizations['atr_ratio'] = optimizations['avg_weekly_atr'] / optimizations['avg_daily_atr']
         
         # Fundamental strict filtering
-        if len(detailed_results) > 0:
-            earnings_percentage = (positive_earnings_count / len(detailed_results)) * 100
+        if total_results > 0:
+            earnings_percentage = stats['positive_earnings_pct']
             optimizations['positive_earnings_percentage'] = earnings_percentage
             
             if earnings_percentage >= 95:  # 95%+ tienen earnings positivos
@@ -87,16 +70,8 @@ def detect_optimizations(screening, consistency, rotation):
             optimizations['optimization_count'] += 1
             optimizations['optimization_features'].append('Min Stop Loss')
         
-        # Buscar stop methods en detailed results
-        restrictive_stop_count = 0
-        for result in detailed_results:
-            stop_analysis = result.get('stop_analysis', {})
-            stop_method = stop_analysis.get('stop_selection', '')
-            
-            if 'ma50_priority' in stop_method or 'ma21_priority' in stop_method:
-                restrictive_stop_count += 1
-        
-        if restrictive_stop_count > len(detailed_results) * 0.3:  # 30%+ usan métodos restrictivos
+        # Stop methods restrictivos en detailed results
+        if stats['restrictive_stop_count'] > total_results * 0.3:  # 30%+ usan métodos restrictivos
             optimizations['min_stop_loss_restrictive'] = True
             if 'Min Stop Loss' not in optimizations['optimization_features']:
                 optimizations['optimization_count'] += 1
@@ -158,24 +133,23 @@ def determine_analysis_label(screening, optimizations):
     else:
         return 'Standard + Historial'
 
-def generate_optimization_stats(screening, optimizations):
+def generate_optimization_stats(screening, optimizations, screening_stats=None):
     """🆕 Genera estadísticas de optimización para el commit"""
     stats = []
     
     if screening:
-        results = screening.get('detailed_results', [])
-        if results:
+        screening_stats = screening_stats or compute_screening_stats(screening)
+        if screening_stats['total']:
             # Basic stats
-            avg_rr = sum(r.get('risk_reward_ratio', 0) for r in results) / len(results)
-            high_quality = len([r for r in results if r.get('risk_reward_ratio', 0) > 2.5])
+            avg_rr = screening_stats['avg_risk_reward']
+            high_quality = screening_stats['high_quality_count']
             
             stats.append(f'R/R: {avg_rr:.1f}:1')
             stats.append(f'HQ: {high_quality}')
             
             # Optimization-specific stats
             if optimizations['weekly_atr_optimization']:
-                weekly_atr_count = len([r for r in results if r.get('weekly_atr', 0) > 0])
-                stats.append(f'WATR: {weekly_atr_count}')
+                stats.append(f'WATR: {screening_stats["weekly_atr_count"]}')
             
             if optimizations['fundamental_strict_filtering']:
                 earnings_pct = optimizations['positive_earnings_percentage']
@@ -208,8 +182,14 @@ def generate_commit_message():
         except:
             pass
         
+        # Agregados del screening (cacheados por hash si el reporte ya los calculó)
+        screening_stats = load_screening_stats(screening=screening) if screening else None
+        
+        # Cambios vs la ejecución anterior (screening_delta.json, si es de este screening)
+        delta = load_delta(screening) if screening else None
+        
         # 🆕 Detectar optimizaciones
-        optimizations = detect_optimizations(screening, consistency, rotation)
+        optimizations = detect_optimizations(screening, consistency, rotation, screening_stats)
         
         # Extraer información básica
         results = screening.get('detailed_results', []) if screening else []
@@ -225,15 +205,15 @@ def generate_commit_message():
         analysis_label = determine_analysis_label(screening, optimizations)
         
         # 🆕 Generar estadísticas incluyendo optimizaciones
-        optimization_stats = generate_optimization_stats(screening, optimizations)
+        optimization_stats = generate_optimization_stats(screening, optimizations, screening_stats)
         
         # Métricas de trading básicas
         trading_metrics = ''
         if results:
             # Technical scores (si están disponibles)
-            if 'technical_score' in results[0]:
-                avg_tech = sum(r.get('technical_score', 0) for r in results) / len(results)
-                avg_final = sum(r.get('score', 0) for r in results) / len(results)
+            if screening_stats['has_technical_score']:
+                avg_tech = screening_stats['avg_technical_score']
+                avg_final = screening_stats['avg_score']
                 trading_metrics = f' | Tech: {avg_tech:.0f} Final: {avg_final:.0f}'
             
             # Añadir stats de optimización
@@ -253,6 +233,8 @@ def generate_commit_message():
             
             # Body con información detallada
             f.write(f'Top 5: {", ".join(top_symbols) if top_symbols else "None"}\n')
+            if delta and not delta.get('baseline'):
+                f.write(f'Delta: {format_delta_summary(delta)}\n')
             f.write(f'Consistent Winners: {winners_count}\n')
             f.write(f'Action: {action}\n')
             f.write(f'Filtered: {len(results)}{trading_metrics}\n')
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+HTTP Session - Sesiones con pool de conexiones compartidas por todo el screener
+===============================================================================
+
+🔌 Una sola sesión para todo el tráfico Yahoo (yfinance): keep-alive y TLS reutilizados
+📏 Pool dimensionado a la concurrencia del screener (un hilo = una conexión viva)
+🧬 curl_cffi (impersonación de navegador, como yfinance) si está instalado; si no, requests + HTTPAdapter
+📊 Telemetría por endpoint 'yahoo_http': conexiones nuevas vs reutilizadas y handshakes TLS
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Importación compatible de Retry
+try:
+    from urllib3.util.retry import Retry
+    RETRY_AVAILABLE = True
+except ImportError:
+    RETRY_AVAILABLE = False
+
+try:
+    from curl_cffi import CurlInfo
+    from curl_cffi import requests as curl_requests
+    CURL_CFFI_AVAILABLE = True
+except ImportError:
+    CURL_CFFI_AVAILABLE = False
+
+YAHOO_ENDPOINT = 'yahoo_http'
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+
+def _retry_strategy():
+    """Retry de urllib3 compatible con versiones antiguas (None si no disponible)"""
+    if not RETRY_AVAILABLE:
+        return None
+    try:
+        # Parámetros nuevos (urllib3 >= 1.26)
+        return Retry(total=2, status_forcelist=[429, 500, 502, 503, 504],
+                     allowed_methods=["HEAD", "GET", "OPTIONS"], backoff_factor=0.5)
+    except TypeError:
+        pass
+    try:
+        # Fallback para urllib3 < 1.26
+        return Retry(total=2, status_forcelist=[429, 500, 502, 503, 504],
+                     method_whitelist=["HEAD", "GET", "OPTIONS"], backoff_factor=0.5)
+    except Exception:
+        return Retry(total=2, status_forcelist=[429, 500, 502, 503, 504], backoff_factor=0.5)
+
+
+def create_requests_session(pool_size=10, retries=True):
+    """requests.Session con keep-alive, pool de `pool_size` conexiones por host y retry opcional"""
+    session = requests.Session()
+    try:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=(_retry_strategy() if retries else None) or 0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    except Exception:
+        pass  # Continuar con el adaptador por defecto
+    session.headers.update(BROWSER_HEADERS)
+    return session
+
+
+def requests_pool_stats(session):
+    """(peticiones, conexiones abiertas) acumuladas en los pools urllib3 de la sesión"""
+    total_requests = total_connections = 0
+    for adapter in set(session.adapters.values()):
+        pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+        if pools is None:
+            continue
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            total_requests += getattr(pool, 'num_requests', 0)
+            total_connections += getattr(pool, 'num_connections', 0)
+    return total_requests, total_connections
+
+
+class YahooSession:
+    """
+    Sesión compartida para yfinance
+    - curl_cffi: un handle curl por hilo (pool por worker) con NUM_CONNECTS/APPCONNECT_TIME por respuesta
+    - requests: HTTPAdapter con pool_maxsize = pool_size; reutilización leída de los pools urllib3
+    """
+
+    def __init__(self, pool_size, metrics=None):
+        self.pool_size = pool_size
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self.http_requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.backend = 'requests'
+        self.session = None
+        if CURL_CFFI_AVAILABLE:
+            try:
+                self.session = _counting_curl_session(self)
+                self.backend = 'curl_cffi'
+            except Exception:
+                self.session = None  # curl_cffi antiguo (sin curl_infos): se usa requests
+        if self.session is None:
+            self.session = create_requests_session(pool_size, retries=False)
+
+    def record(self, new_connections, tls_seconds):
+        """Contabiliza una respuesta curl (llamado desde los hilos del screener)"""
+        with self._lock:
+            self.http_requests += 1
+            self.new_connections += new_connections
+            if tls_seconds > 0:
+                self.tls_handshakes += 1
+        if self.metrics is not None:
+            self.metrics.count(YAHOO_ENDPOINT, 'http_requests')
+            self.metrics.count(YAHOO_ENDPOINT, 'new_connections' if new_connections else 'reused_connections')
+            if tls_seconds > 0:
+                self.metrics.count(YAHOO_ENDPOINT, 'tls_handshakes')
+
+    def stats(self):
+        """Resumen de reutilización para run_metrics.json (extra 'http_pool')"""
+        if self.backend == 'requests':
+            http_requests, new_connections = requests_pool_stats(self.session)
+            tls_handshakes = None  # urllib3 no expone handshakes: cada conexión https nueva es uno
+        else:
+            with self._lock:
+                http_requests, new_connections, tls_handshakes = (
+                    self.http_requests, self.new_connections, self.tls_handshakes)
+        reused = max(http_requests - new_connections, 0)
+        return {
+            'backend': self.backend,
+            'pool_size': self.pool_size,
+            'http_requests': http_requests,
+            'new_connections': new_connections,
+            'reused_connections': reused,
+            'reuse_ratio': round(reused / http_requests, 3) if http_requests else 0.0,
+            'tls_handshakes': tls_handshakes
+        }
+
+
+def _counting_curl_session(owner):
+    """curl_cffi.Session que informa de conexiones nuevas y handshakes TLS de cada respuesta"""
+
+    class CountingCurlSession(curl_requests.Session):
+        def request(self, *args, **kwargs):
+            response = super().request(*args, **kwargs)
+            infos = getattr(response, 'infos', None) or {}
+            owner.record(int(infos.get(CurlInfo.NUM_CONNECTS, 0) or 0),
+                         float(infos.get(CurlInfo.APPCONNECT_TIME, 0) or 0))
+            return response
+
+    return CountingCurlSession(impersonate='chrome',
+                               curl_infos=[CurlInfo.NUM_CONNECTS, CurlInfo.APPCONNECT_TIME])
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Indicator State - Indicadores incrementales O(1) por barra nueva
+================================================================
+
+🔁 Sumas de ventana (MA21, MA50, volumen 5d/30d, ATR 14, volatilidad 20d) y ring buffers
+📅 Acumulador de la semana en curso (W-FRI) + True Range de las 6 semanas cerradas previas
+➕ append_bar: actualiza todos los indicadores del screener en tiempo constante
+🧮 Recomputo completo cada FULL_RECOMPUTE_BARS barras (evita deriva de las sumas)
+🔍 Si el histórico cambia hacia atrás (ajuste por dividendo/split) el estado se reconstruye
+💾 Persistido por símbolo en price_cache/indicator_state/<SYMBOL>.json
+"""
+
+import json
+import math
+import os
+import threading
+from collections import deque
+from datetime import date, timedelta
+
+import numpy as np
+
+from price_cache import PRICE_CACHE_DIR, safe_name, session_dates
+from screening_core import MIN_HISTORY_BARS, compute_indicators, derive_indicators, passes_fixed_filters
+
+STATE_VERSION = 1
+FULL_RECOMPUTE_BARS = 50  # Barras incrementales antes de recalcular desde cero
+
+CLOSE_WINDOW = 91    # Rendimiento a 90 días (incluye la barra actual)
+VOLUME_WINDOW = 30
+VOLUME_RECENT_WINDOW = 5
+ATR_WINDOW = 14
+VOLATILITY_WINDOW = 20
+WEEKLY_ATR_WEEKS = 7
+
+# Tolerancia para detectar un histórico re-ajustado
+PRICE_TOLERANCE = 1e-6
+
+
+def _week_end(day):
+    """Viernes que cierra la semana de `day` (mismo etiquetado que resample('W-FRI'))"""
+    return day + timedelta(days=(4 - day.weekday()) % 7)
+
+
+def _true_range(high, low, prev_close):
+    if prev_close is None:
+        return high - low
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class IndicatorState:
+    """Estado de ventanas de un símbolo tras su última barra"""
+
+    def __init__(self):
+        self.last_session = None
+        self.bars = 0
+        self.bars_since_recompute = 0
+
+        self.closes = deque(maxlen=CLOSE_WINDOW)
+        self.sum_close_21 = 0.0
+        self.sum_close_50 = 0.0
+
+        self.volumes = deque(maxlen=VOLUME_WINDOW)
+        self.sum_volume_30 = 0.0
+        self.sum_volume_5 = 0.0
+
+        self.true_ranges = deque(maxlen=ATR_WINDOW)
+        self.sum_true_range = 0.0
+
+        self.returns = deque(maxlen=VOLATILITY_WINDOW)
+        self.sum_returns = 0.0
+        self.sum_squared_returns = 0.0
+
+        # Semana en curso: [viernes, high, low, close]; semanas cerradas: sus True Range
+        self.week = None
+        self.prev_week_close = None
+        self.week_true_ranges = deque(maxlen=WEEKLY_ATR_WEEKS - 1)
+        self.weeks = 0
+
+    # ------------------------------------------------------------------ #
+    # Actualización incremental
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _slide(window, value, total):
+        """Añade `value` a una ventana llena o no y devuelve la suma actualizada"""
+        if len(window) == window.maxlen:
+            total -= window[0]
+        window.append(value)
+        return total + value
+
+    def append_bar(self, session, high, low, close, volume):
+        """Incorpora una barra diaria cerrada (O(1))"""
+        prev_close = self.closes[-1] if self.closes else None
+
+        # Medias móviles de cierre: el elemento que sale está a 21/50 posiciones del final
+        if len(self.closes) >= 21:
+            self.sum_close_21 -= self.closes[-21]
+        if len(self.closes) >= 50:
+            self.sum_close_50 -= self.closes[-50]
+        self.closes.append(close)
+        self.sum_close_21 += close
+        self.sum_close_50 += close
+
+        if len(self.volumes) >= VOLUME_RECENT_WINDOW:
+            self.sum_volume_5 -= self.volumes[-VOLUME_RECENT_WINDOW]
+        self.sum_volume_5 += volume
+        self.sum_volume_30 = self._slide(self.volumes, volume, self.sum_volume_30)
+
+        self.sum_true_range = self._slide(self.true_ranges, _true_range(high, low, prev_close),
+                                          self.sum_true_range)
+
+        if prev_close is not None:
+            daily_return = (close - prev_close) / prev_close
+            if len(self.returns) == self.returns.maxlen:
+                self.sum_squared_returns -= self.returns[0] ** 2
+            self.sum_squared_returns += daily_return ** 2
+            self.sum_returns = self._slide(self.returns, daily_return, self.sum_returns)
+
+        # Barra semanal (semanas que cierran en viernes)
+        week_end = _week_end(session)
+        if self.week is None or week_end != self.week[0]:
+            if self.week is not None:
+                self.week_true_ranges.append(self._current_week_true_range())
+                self.prev_week_close = self.week[3]
+            self.week = [week_end, high, low, close]
+            self.weeks += 1
+        else:
+            self.week[1] = max(self.week[1], high)
+            self.week[2] = min(self.week[2], low)
+            self.week[3] = close
+
+        self.last_session = session
+        self.bars += 1
+        self.bars_since_recompute += 1
+
+    def _current_week_true_range(self):
+        return _true_range(self.week[1], self.week[2], self.prev_week_close)
+
+    def recompute_sums(self):
+        """Recalcula todas las sumas desde los ring buffers (corrige la deriva)"""
+        closes = list(self.closes)
+        volumes = list(self.volumes)
+        self.sum_close_21 = math.fsum(closes[-21:])
+        self.sum_close_50 = math.fsum(closes[-50:])
+        self.sum_volume_30 = math.fsum(volumes)
+        self.sum_volume_5 = math.fsum(volumes[-VOLUME_RECENT_WINDOW:])
+        self.sum_true_range = math.fsum(self.true_ranges)
+        self.sum_returns = math.fsum(self.returns)
+        self.sum_squared_returns = math.fsum(r * r for r in self.returns)
+        self.bars_since_recompute = 0
+
+    # ------------------------------------------------------------------ #
+    # Lectura
+    # ------------------------------------------------------------------ #
+
+    def _period_return(self, days):
+        current = self.closes[-1]
+        past = self.closes[-(days + 1)] if len(self.closes) >= days + 1 else current
+        return ((current - past) / past) * 100
+
+    def _weekly_atr(self):
+        if self.bars < ATR_WINDOW or self.weeks < WEEKLY_ATR_WEEKS:
+            return 0
+        true_ranges = list(self.week_true_ranges) + [self._current_week_true_range()]
+        return sum(true_ranges) / len(true_ranges)
+
+    def _volatility_20d(self):
+        n = len(self.returns)
+        if n < 2:
+            return float('nan')
+        variance = (self.sum_squared_returns - self.sum_returns ** 2 / n) / (n - 1)
+        return math.sqrt(max(variance, 0.0)) * (252 ** 0.5) * 100
+
+    def indicators(self, history_bars=None):
+        """
+        Mismo resultado que compute_indicators() sobre el histórico ya incorporado
+        - history_bars: longitud del histórico que vería compute_indicators (por defecto, todas las barras)
+        """
+        history_bars = self.bars if history_bars is None else history_bars
+        if history_bars < MIN_HISTORY_BARS or not self.closes:
+            return None
+
+        current_price = self.closes[-1]
+        volume_avg_30d = self.sum_volume_30 / len(self.volumes)
+        ma21 = self.sum_close_21 / 21 if len(self.closes) >= 21 else float('nan')
+        ma50 = self.sum_close_50 / 50 if len(self.closes) >= 50 else float('nan')
+        if not passes_fixed_filters(current_price, volume_avg_30d, ma21, ma50):
+            return None
+
+        return derive_indicators(
+            current_price=current_price,
+            volume_avg_30d=volume_avg_30d,
+            volume_recent=self.sum_volume_5 / min(len(self.volumes), VOLUME_RECENT_WINDOW),
+            ma21=ma21,
+            ma50=ma50,
+            atr=self.sum_true_range / len(self.true_ranges),
+            weekly_atr=self._weekly_atr(),
+            volatility_20d=self._volatility_20d(),
+            returns={days: self._period_return(days) for days in (20, 60, 90)}
+        )
+
+    # ------------------------------------------------------------------ #
+    # Serialización
+    # ------------------------------------------------------------------ #
+
+    def to_dict(self):
+        return {
+            'version': STATE_VERSION,
+            'last_session': self.last_session.isoformat() if self.last_session else None,
+            'bars': self.bars,
+            'bars_since_recompute': self.bars_since_recompute,
+            'closes': list(self.closes),
+            'volumes': list(self.volumes),
+            'true_ranges': list(self.true_ranges),
+            'returns': list(self.returns),
+            'sums': {
+                'close_21': self.sum_close_21,
+                'close_50': self.sum_close_50,
+                'volume_30': self.sum_volume_30,
+                'volume_5': self.sum_volume_5,
+                'true_range': self.sum_true_range,
+                'returns': self.sum_returns,
+                'squared_returns': self.sum_squared_returns
+            },
+            'week': [self.week[0].isoformat()] + self.week[1:] if self.week else None,
+            'prev_week_close': self.prev_week_close,
+            'week_true_ranges': list(self.week_true_ranges),
+            'weeks': self.weeks
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data or data.get('version') != STATE_VERSION or not data.get('last_session'):
+            return None
+        state = cls()
+        state.last_session = date.fromisoformat(data['last_session'])
+        state.bars = int(data['bars'])
+        state.bars_since_recompute = int(data['bars_since_recompute'])
+        state.closes.extend(data['closes'])
+        state.volumes.extend(data['volumes'])
+        state.true_ranges.extend(data['true_ranges'])
+        state.returns.extend(data['returns'])
+        sums = data['sums']
+        state.sum_close_21 = sums['close_21']
+        state.sum_close_50 = sums['close_50']
+        state.sum_volume_30 = sums['volume_30']
+        state.sum_volume_5 = sums['volume_5']
+        state.sum_true_range = sums['true_range']
+        state.sum_returns = sums['returns']
+        state.sum_squared_returns = sums['squared_returns']
+        if data['week']:
+            state.week = [date.fromisoformat(data['week'][0])] + list(data['week'][1:])
+        state.prev_week_close = data['prev_week_close']
+        state.week_true_ranges.extend(data['week_true_ranges'])
+        state.weeks = int(data['weeks'])
+        return state
+
+    @classmethod
+    def from_history(cls, hist, sessions=None):
+        """Estado construido desde cero con todas las barras de `hist`"""
+        state = cls()
+        state.extend(hist, sessions)
+        state.recompute_sums()
+        return state
+
+    def extend(self, hist, sessions=None, start=0, end=None):
+        """Incorpora las barras hist[start:end]"""
+        sessions = session_dates(hist) if sessions is None else sessions
+        end = len(hist) if end is None else end
+        highs = hist['High'].to_numpy(dtype=float)
+        lows = hist['Low'].to_numpy(dtype=float)
+        closes = hist['Close'].to_numpy(dtype=float)
+        volumes = hist['Volume'].to_numpy(dtype=float)
+        for i in range(start, end):
+            self.append_bar(sessions[i], float(highs[i]), float(lows[i]), float(closes[i]), float(volumes[i]))
+
+
+def has_missing_values(hist, start=0):
+    """True si alguna barra a incorporar tiene OHLCV incompleto"""
+    values = hist[['High', 'Low', 'Close', 'Volume']].to_numpy(dtype=float)[start:]
+    return bool(np.isnan(values).any())
+
+
+class IndicatorStateStore:
+    """Estados por símbolo en disco: <dir>/indicator_state/<SYMBOL>.json (cache_dir=None: sin persistir)"""
+
+    def __init__(self, cache_dir=PRICE_CACHE_DIR, metrics=None):
+        self.state_dir = os.path.join(cache_dir, 'indicator_state') if cache_dir else None
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._dir_ready = False
+
+    def _count(self, event):
+        if self.metrics is not None:
+            self.metrics.count('indicator_state', event)
+
+    def state_path(self, symbol):
+        return os.path.join(self.state_dir, f"{safe_name(symbol)}.json")
+
+    def load(self, symbol):
+        if self.state_dir is None:
+            return None
+        try:
+            with open(self.state_path(symbol), 'r') as f:
+                return IndicatorState.from_dict(json.load(f))
+        except Exception:
+            return None
+
+    def store(self, symbol, state):
+        if self.state_dir is None:
+            return
+        try:
+            if not self._dir_ready:
+                with self._lock:
+                    os.makedirs(self.state_dir, exist_ok=True)
+                    self._dir_ready = True
+            path = self.state_path(symbol)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state.to_dict(), f)
+            os.replace(tmp_path, path)
+        except Exception:
+            pass
+
+    def discard(self, symbol):
+        if self.state_dir is None:
+            return
+        try:
+            os.remove(self.state_path(symbol))
+        except OSError:
+            pass
+
+    def _sync(self, symbol, hist, sessions):
+        """Estado al día con `hist`: incremental si es posible, si no reconstruido"""
+        state = self.load(symbol)
+        if state is not None:
+            position = int(np.searchsorted(sessions, state.last_session))
+            anchored = (
+                position < len(sessions) and sessions[position] == state.last_session and
+                math.isclose(float(hist['Close'].iloc[position]), state.closes[-1],
+                             rel_tol=PRICE_TOLERANCE)
+            )
+            new_bars = len(hist) - position - 1
+            if anchored and state.bars_since_recompute + new_bars <= FULL_RECOMPUTE_BARS:
+                if new_bars == 0:
+                    self._count('unchanged')
+                    return state, False
+                if not has_missing_values(hist, position + 1):
+                    state.extend(hist, sessions, start=position + 1)
+                    self._count('incremental')
+                    return state, True
+            elif anchored:
+                self._count('scheduled_recompute')
+            else:
+                self._count('history_changed')
+
+        if has_missing_values(hist):
+            return None, False
+        self._count('rebuilt')
+        return IndicatorState.from_history(hist, sessions), True
+
+    def indicators(self, symbol, hist):
+        """compute_indicators(hist) apoyado en el estado persistido del símbolo"""
+        if hist is None or len(hist) < MIN_HISTORY_BARS:
+            return None
+
+        sessions = session_dates(hist)
+        state, changed = self._sync(symbol, hist, sessions)
+        if state is None:
+            # Barras incompletas: cálculo completo con pandas, sin estado
+            self.discard(symbol)
+            self._count('fallback')
+            return compute_indicators(hist)
+
+        if changed:
+            self.store(symbol, state)
+        return state.indicators(len(hist))
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Market Calendar - Calendario NYSE y control de frescura del pipeline
+====================================================================
+
+📅 Festivos NYSE (con reglas de observación) y cierres anticipados (13:00 ET)
+🕓 latest_completed_session: última sesión cerrada (y publicada) a una hora dada
+⏭️ Si no hay sesión nueva desde el último screening, el pipeline no se repite
+🪶 Solo librería estándar: se puede ejecutar antes de instalar dependencias
+
+Uso:
+    python market_calendar.py          # Informa y escribe new_session=true|false en $GITHUB_OUTPUT
+"""
+
+import json
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+NY_TZ = ZoneInfo('America/New_York')
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+SETTLE_MINUTES = 30  # Margen para que Yahoo publique la barra diaria definitiva
+
+SCREENING_RESULTS_FILE = 'weekly_screening_results.json'
+
+# Cierres extraordinarios (duelos nacionales, huracanes...)
+SPECIAL_CLOSURES = {
+    date(2012, 10, 29): 'Hurricane Sandy',
+    date(2012, 10, 30): 'Hurricane Sandy',
+    date(2018, 12, 5): 'National Day of Mourning (G.H.W. Bush)',
+    date(2025, 1, 9): 'National Day of Mourning (J. Carter)',
+}
+
+
+def _easter(year):
+    """Domingo de Pascua (algoritmo gregoriano anónimo)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-ésimo día de la semana del mes (n=-1: el último)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """Sábado -> viernes anterior, domingo -> lunes siguiente"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year):
+    """Festivos NYSE de un año: {fecha: nombre}"""
+    holidays = {}
+
+    # Año Nuevo: si cae en sábado NO se traslada al viernes anterior (regla NYSE)
+    new_year = date(year, 1, 1)
+    if new_year.weekday() == 6:
+        holidays[new_year + timedelta(days=1)] = "New Year's Day"
+    elif new_year.weekday() < 5:
+        holidays[new_year] = "New Year's Day"
+
+    holidays[_nth_weekday(year, 1, 0, 3)] = 'Martin Luther King Jr. Day'
+    holidays[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    holidays[_easter(year) - timedelta(days=2)] = 'Good Friday'
+    holidays[_nth_weekday(year, 5, 0, -1)] = 'Memorial Day'
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = 'Juneteenth'
+    holidays[_observed(date(year, 7, 4))] = 'Independence Day'
+    holidays[_nth_weekday(year, 9, 0, 1)] = 'Labor Day'
+    holidays[_nth_weekday(year, 11, 3, 4)] = 'Thanksgiving Day'
+    holidays[_observed(date(year, 12, 25))] = 'Christmas Day'
+
+    for day, name in SPECIAL_CLOSURES.items():
+        if day.year == year:
+            holidays[day] = name
+
+    return holidays
+
+
+@lru_cache(maxsize=None)
+def early_closes(year):
+    """Sesiones con cierre a las 13:00 ET"""
+    candidates = [
+        date(year, 7, 3),                                   # Víspera de Independence Day
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),   # Día después de Thanksgiving
+        date(year, 12, 24),                                 # Nochebuena
+    ]
+    holidays = nyse_holidays(year)
+    return frozenset(day for day in candidates if day.weekday() < 5 and day not in holidays)
+
+
+def is_trading_day(day):
+    return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+
+def session_close(day):
+    """Hora de cierre (aware, ET) de una sesión"""
+    close_time = EARLY_CLOSE if day in early_closes(day.year) else REGULAR_CLOSE
+    return datetime.combine(day, close_time, tzinfo=NY_TZ)
+
+
+def previous_trading_day(day):
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def latest_completed_session(now=None):
+    """Última sesión NYSE cerrada hace al menos SETTLE_MINUTES"""
+    now = now or datetime.now(NY_TZ)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=NY_TZ)
+    now = now.astimezone(NY_TZ)
+
+    today = now.date()
+    if is_trading_day(today) and now >= session_close(today) + timedelta(minutes=SETTLE_MINUTES):
+        return today
+    return previous_trading_day(today)
+
+
+def load_results_session(path=SCREENING_RESULTS_FILE):
+    """Sesión de mercado del último screening guardado (None si no consta)"""
+    try:
+        with open(path, 'r') as f:
+            session = json.load(f).get('market_session')
+        return date.fromisoformat(session) if session else None
+    except Exception:
+        return None
+
+
+def has_new_session(path=SCREENING_RESULTS_FILE, now=None):
+    """(hay_sesion_nueva, ultima_sesion_cerrada, sesion_de_los_resultados)"""
+    latest = latest_completed_session(now)
+    previous = load_results_session(path)
+    return previous is None or latest > previous, latest, previous
+
+
+def force_run():
+    return os.environ.get('FORCE_RUN', '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def main():
+    """Comprueba si hay sesión nueva y lo publica como output del step de GitHub Actions"""
+    new_session, latest, previous = has_new_session()
+    if force_run():
+        new_session = True
+
+    print(f"📅 Última sesión NYSE completada: {latest.isoformat()}")
+    print(f"📁 Sesión del último screening: {previous.isoformat() if previous else 'desconocida'}")
+    if new_session:
+        print("✅ Hay datos nuevos: se ejecuta el pipeline completo")
+    else:
+        print("⏭️ Sin sesión nueva: se conservan los resultados anteriores")
+
+    github_output = os.environ.get('GITHUB_OUTPUT')
+    if github_output:
+        with open(github_output, 'a') as f:
+            f.write(f"new_session={'true' if new_session else 'false'}\n")
+            f.write(f"market_session={latest.isoformat()}\n")
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Memory Budget - Screening con memoria acotada y perfil de memoria por etapa
+===========================================================================
+
+🧠 MEMORY_BUDGET_MB=<MB>: universo por tramos (MEMORY_CHUNK_SYMBOLS), gc entre tramos y
+   resultados volcados a disco en cuanto se puntúan (solo un índice compacto en memoria)
+📏 RSS pico y actual por etapa (getrusage / /proc) en todas las ejecuciones
+🔬 tracemalloc (modo presupuesto o MEMORY_TRACE=true): memoria Python actual/pico y las
+   líneas que más asignaron en cada etapa
+💾 Resumen en run_metrics.json (extra 'memory')
+"""
+
+import gc
+import json
+import os
+import sys
+import threading
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MEMORY_CHUNK_SYMBOLS = int(os.environ.get('MEMORY_CHUNK_SYMBOLS', '500'))
+TRACEMALLOC_TOP = 5
+RESULT_SPILL_FILE = 'screening_results_spill.jsonl'
+
+# Campos que el resumen de consola necesita de cada resultado (el resto vive en el fichero de volcado)
+SUMMARY_FIELDS = ('symbol', 'score', 'technical_score', 'ma50_bonus', 'is_ma50_stop_loss',
+                  'risk_reward_ratio', 'risk_pct', 'current_price', 'stop_loss')
+
+
+def memory_budget_mb():
+    """Presupuesto en MB (MEMORY_BUDGET_MB; 0 o ausente = modo normal)"""
+    try:
+        return max(0.0, float(os.environ.get('MEMORY_BUDGET_MB', '0')))
+    except ValueError:
+        return 0.0
+
+
+def peak_rss_mb():
+    """RSS máximo del proceso hasta ahora (None si la plataforma no lo expone)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB, macOS en bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def current_rss_mb():
+    """RSS actual (Linux: /proc/self/statm); fuera de Linux, el pico"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return peak_rss_mb()
+
+
+class MemoryTracker:
+    """Puntos de control por etapa: RSS y, con tracemalloc, principales sitios de asignación"""
+
+    def __init__(self, budget_mb=0.0, trace=False, top=TRACEMALLOC_TOP):
+        self.budget_mb = budget_mb
+        self.top = top
+        self.trace = trace
+        self.stages = {}
+        self.over_budget_checks = 0
+        self._previous_snapshot = None
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._previous_snapshot = tracemalloc.take_snapshot()
+
+    @property
+    def enabled(self):
+        """Modo presupuesto activo (tramos + volcado de resultados)"""
+        return self.budget_mb > 0
+
+    def over_budget(self):
+        rss = current_rss_mb()
+        over = bool(self.budget_mb and rss is not None and rss > self.budget_mb)
+        if over:
+            self.over_budget_checks += 1
+        return over
+
+    def _top_allocations(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+        previous, self._previous_snapshot = self._previous_snapshot, snapshot
+        stats = snapshot.compare_to(previous, 'lineno') if previous is not None else snapshot.statistics('lineno')
+        return [
+            {
+                'site': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                'size_kb': round(stat.size / 1024, 1),
+                'growth_kb': round(getattr(stat, 'size_diff', stat.size) / 1024, 1)
+            }
+            for stat in stats[:self.top]
+        ]
+
+    def checkpoint(self, stage):
+        """Cierra una etapa: RSS actual/pico y, si hay tracemalloc, pico Python y top de líneas"""
+        entry = {'rss_mb': current_rss_mb(), 'peak_rss_mb': peak_rss_mb()}
+        if self.trace and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            entry['python_current_mb'] = round(current / (1024 * 1024), 1)
+            entry['python_peak_mb'] = round(peak / (1024 * 1024), 1)
+            entry['top_allocations'] = self._top_allocations()
+            if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+: pico por etapa
+                tracemalloc.reset_peak()
+        self.stages[stage] = entry
+        return entry
+
+    def release(self):
+        """Devuelve al sistema lo liberado entre tramos"""
+        gc.collect()
+
+    def stop(self):
+        if self.trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def summary(self):
+        return {
+            'budget_mb': self.budget_mb or None,
+            'bounded_mode': self.enabled,
+            'tracemalloc': self.trace,
+            'peak_rss_mb': peak_rss_mb(),
+            'over_budget_checks': self.over_budget_checks,
+            'stages': self.stages
+        }
+
+
+class ResultSpill:
+    """Resultados en JSONL en disco; en memoria solo (offset, resumen) por candidato"""
+
+    def __init__(self, path=RESULT_SPILL_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'w+')
+
+    def append(self, result):
+        """Vuelca un resultado ya limpio para JSON y devuelve su resumen compacto"""
+        line = json.dumps(result)
+        summary = {field: result.get(field) for field in SUMMARY_FIELDS}
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line + '\n')
+            summary['_offset'] = offset
+        return summary
+
+    def load(self, summaries):
+        """Resultados completos de los resúmenes indicados (en su orden)"""
+        with self._lock:
+            self._file.flush()
+            records = []
+            for summary in summaries:
+                self._file.seek(summary['_offset'])
+                records.append(json.loads(self._file.readline()))
+            self._file.seek(0, os.SEEK_END)
+        return records
+
+    def iter_results(self, summaries):
+        """Igual que load() pero de uno en uno (serializar sin cargar todo)"""
+        for summary in summaries:
+            yield self.load([summary])[0]
+
+    def close(self, remove=True):
+        self._file.close()
+        if remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def write_json_streaming(path, header, key, items):
+    """json.dump(header + {key: items}) escribiendo `items` de uno en uno"""
+    with open(path, 'w') as f:
+        body = json.dumps(header, indent=2)
+        f.write(body[:-2] + f',\n  "{key}": [')
+        for i, item in enumerate(items):
+            f.write((',' if i else '') + '\n    ' + json.dumps(item))
+        f.write('\n  ]\n}')
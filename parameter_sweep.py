@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep - Barrido paralelo de umbrales del screener y de la rotación
+============================================================================
+
+📦 Un único panel de precios mapeado en memoria (price_panel/, construido desde price_cache/)
+🧮 Indicadores precalculados UNA vez por símbolo y fecha (IndicatorState: O(1) por barra)
+⚡ Grid repartido en un ProcessPoolExecutor: cada worker recibe el panel una sola vez
+🔄 Cada configuración: filtros + score vectorizados -> simulación walk-forward de la rotación
+🏆 Ranking por rentabilidad simulada y throughput en grid points/segundo
+
+⚠️ Limitaciones conocidas:
+   - Fundamentales = último ticker.info cacheado (sesgo de look-ahead)
+   - Solo entran símbolos con info en caché (el screener solo la pide a los que pasan filtros)
+
+Uso:
+    python parameter_sweep.py --grid sweep_grid.json --lookback 60 --workers 4
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from price_cache import PRICE_CACHE_DIR, PriceCache
+from indicator_state import FULL_RECOMPUTE_BARS, IndicatorState, has_missing_values
+from price_panel import PRICE_PANEL_DIR, PricePanel, load_or_build_price_panel
+from screening_core import (DEFAULT_SCORING_PARAMS, MIN_HISTORY_BARS, compute_benchmark_returns,
+                            compute_fundamental_score, compute_indicators, passes_param_filters,
+                            score_components)
+
+# Valores por defecto = constantes de AggressiveRotationRecommender.__init__
+ROTATION_DEFAULTS = {
+    'min_score_difference': 30.0,
+    'stop_loss_proximity_threshold': 0.03,
+    'momentum_loss_days': 3,
+    'min_consistency_weeks': 2,
+    'min_viable_score': 50.0,
+}
+
+# Parámetros de la simulación (no existen en el bot)
+SIMULATION_DEFAULTS = {
+    'max_positions': 5,
+    'cost_bps': 10.0,          # Coste por operación (cada lado)
+    'top_n': 15,               # detailed_results que ve el recomendador
+    'consistency_window': 7,   # Ventana de consistencia (días)
+}
+
+DEFAULT_GRID = {
+    'momentum_20d_weight': [0.5, 0.7, 0.9],
+    'min_outperf_20d': [0.0, 5.0, 10.0],
+    'ma50_stop_bonus': [0, 22, 35],
+    'max_allowed_risk': [8.0, 10.0],
+    'rr_bonus_weight': [0.8, 1.2],
+    'min_score_difference': [15.0, 30.0, 45.0],
+    'stop_loss_proximity_threshold': [0.02, 0.03, 0.05],
+    'momentum_loss_days': [2, 3, 5],
+}
+
+# Constantes que existen en el código pero no afectan al resultado
+INERT_PARAMETERS = {
+    'rr_weight': "no interviene en el score; el peso efectivo del RR bonus es 'rr_bonus_weight'",
+}
+
+SWEEP_RESULTS_FILE = 'parameter_sweep_results.json'
+
+_PANEL = None  # Panel de indicadores en cada worker (initializer)
+_PRICE_PANEL = None  # Panel de precios mapeado en cada worker de precálculo
+_AS_OF_DATES = None
+
+
+def expand_grid(grid):
+    """Producto cartesiano del grid -> lista de configuraciones"""
+    known = set(DEFAULT_SCORING_PARAMS) | set(ROTATION_DEFAULTS) | set(SIMULATION_DEFAULTS)
+    for name in grid:
+        if name in INERT_PARAMETERS:
+            raise ValueError(f"Parámetro '{name}' {INERT_PARAMETERS[name]}")
+        if name not in known:
+            raise ValueError(f"Parámetro desconocido '{name}'. Válidos: {', '.join(sorted(known))}")
+
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def _init_precompute_worker(price_panel_path, as_of_dates):
+    global _PRICE_PANEL, _AS_OF_DATES
+    _PRICE_PANEL = PricePanel(price_panel_path)  # Se adjunta al mmap: sin copiar históricos
+    _AS_OF_DATES = as_of_dates
+
+
+def _precompute_symbol(symbol):
+    """Indicadores de un símbolo en cada fecha as-of (se ejecuta en el pool)"""
+    hist = _PRICE_PANEL.to_frame(symbol)
+    as_of_dates = _AS_OF_DATES
+    sessions = hist.index
+    session_days = sessions.date
+    T = len(as_of_dates)
+    # Barras incompletas: recálculo completo con pandas en cada fecha
+    state = None if has_missing_values(hist) else IndicatorState()
+
+    fields = {
+        'eligible': np.zeros(T, dtype=bool),
+        'is_ma50': np.zeros(T, dtype=bool),
+        'return_20d': np.full(T, np.nan),
+        'return_60d': np.full(T, np.nan),
+        'risk_pct': np.full(T, np.nan),
+        'fixed_bonus': np.zeros(T),
+        'rr_bonus': np.zeros(T),
+        'stop_price': np.full(T, np.nan),
+        'close': np.full(T, np.nan),
+    }
+
+    last_bars = -1
+    for t, as_of in enumerate(as_of_dates):
+        bars = int(sessions.searchsorted(as_of, side='right'))
+        if bars == 0:
+            continue
+        fields['close'][t] = hist['Close'].iloc[bars - 1]
+
+        if bars == last_bars and t > 0:
+            # Sin barra nueva (festivo/suspensión): se reutiliza la fila anterior
+            for name in ('eligible', 'is_ma50', 'return_20d', 'return_60d', 'risk_pct',
+                         'fixed_bonus', 'rr_bonus', 'stop_price'):
+                fields[name][t] = fields[name][t - 1]
+            continue
+        last_bars = bars
+
+        if state is None:
+            indicators = compute_indicators(hist.iloc[:bars])
+        else:
+            # El estado avanza solo las barras nuevas desde la fecha anterior
+            state.extend(hist, session_days, start=state.bars, end=bars)
+            if state.bars_since_recompute >= FULL_RECOMPUTE_BARS:
+                state.recompute_sums()
+            indicators = state.indicators()
+        if indicators is None:
+            continue
+
+        fields['eligible'][t] = True
+        fields['is_ma50'][t] = indicators['is_ma50_stop_loss']
+        fields['return_20d'][t] = indicators['return_20d']
+        fields['return_60d'][t] = indicators['return_60d']
+        fields['risk_pct'][t] = indicators['risk_pct']
+        fields['fixed_bonus'][t] = (indicators['volatility_bonus'] + indicators['volume_score'] +
+                                    indicators['risk_bonus'])
+        fields['rr_bonus'][t] = indicators['rr_bonus']
+        fields['stop_price'][t] = indicators['stop_price']
+
+    return fields
+
+
+def build_panel(cache, lookback=60, workers=None, price_panel_path=PRICE_PANEL_DIR):
+    """
+    Abre (o reconstruye) el panel de precios mapeado y precalcula los indicadores
+    Devuelve dict de arrays (fechas x símbolos) listo para enviar a los workers
+    """
+    price_panel = load_or_build_price_panel(cache, price_panel_path)
+    if 'SPY' not in price_panel:
+        raise ValueError("SPY no está en la caché (ejecuta el screener al menos una vez)")
+    spy = price_panel.to_frame('SPY')
+    if len(spy) < MIN_HISTORY_BARS:
+        raise ValueError("Histórico de SPY insuficiente en la caché")
+
+    symbols, fundamental_scores = [], []
+    for symbol in price_panel.symbols:
+        if symbol == 'SPY':
+            continue
+        fundamental_data = compute_fundamental_score(cache.load_info(symbol))
+        # El screener descarta beneficios no positivos: no aportan candidatos
+        if fundamental_data['earnings_growth'] is None:
+            continue
+        if np.count_nonzero(~np.isnan(price_panel.series(symbol))) < MIN_HISTORY_BARS:
+            continue
+        symbols.append(symbol)
+        fundamental_scores.append(fundamental_data['fundamental_score'])
+
+    if not symbols:
+        raise ValueError("No hay símbolos con histórico e info en la caché")
+
+    start = max(MIN_HISTORY_BARS - 1, len(spy) - lookback)
+    as_of_dates = spy.index[start:]
+
+    # Benchmark en cada fecha as-of
+    spy_returns = [compute_benchmark_returns(spy.iloc[:i + 1]) for i in range(start, len(spy))]
+    spy_20d = np.array([r['return_20d'] for r in spy_returns])
+    spy_60d = np.array([r['return_60d'] for r in spy_returns])
+
+    # Los workers se adjuntan al panel mapeado: solo viajan nombres de símbolo
+    chunksize = max(1, len(symbols) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_precompute_worker,
+                             initargs=(price_panel.path, as_of_dates)) as executor:
+        per_symbol = list(executor.map(_precompute_symbol, symbols, chunksize=chunksize))
+
+    def stack(name):
+        return np.column_stack([fields[name] for fields in per_symbol])
+
+    return {
+        'symbols': symbols,
+        'dates': [d.strftime('%Y-%m-%d') for d in as_of_dates],
+        'eligible': stack('eligible'),
+        'is_ma50': stack('is_ma50'),
+        'outperformance_20d': stack('return_20d') - spy_20d[:, None],
+        'outperformance_60d': stack('return_60d') - spy_60d[:, None],
+        'risk_pct': stack('risk_pct'),
+        'fixed_bonus': stack('fixed_bonus'),
+        'rr_bonus': stack('rr_bonus'),
+        'stop_price': stack('stop_price'),
+        'close': stack('close'),
+        'fundamental_score': np.array(fundamental_scores, dtype=float),
+        'spy_close': spy['Close'].iloc[start:].to_numpy(dtype=float),
+    }
+
+
+def score_panel(panel, params):
+    """Scores finales (fechas x símbolos), NaN donde no pasa los filtros"""
+    with np.errstate(invalid='ignore'):
+        passes = panel['eligible'] & passes_param_filters(
+            panel['outperformance_20d'], panel['outperformance_60d'], panel['risk_pct'], params
+        )
+    _, final_score, _ = score_components(
+        panel['outperformance_20d'], panel['outperformance_60d'], panel['is_ma50'],
+        panel['fundamental_score'][None, :], panel['fixed_bonus'], panel['rr_bonus'], params
+    )
+    return np.where(passes, final_score, np.nan)
+
+
+def simulate_rotation(panel, scores, params):
+    """
+    Simulación walk-forward de las reglas de AggressiveRotationRecommender:
+    - Salida si el precio está a <= stop_loss_proximity_threshold del stop
+    - Salida si el símbolo falta del top N durante momentum_loss_days sesiones seguidas
+    - Entrada con consistencia >= min_consistency_weeks y score >= min_viable_score
+    - Rotación si el candidato supera a la posición más débil en >= min_score_difference
+    """
+    close = panel['close']
+    stops = panel['stop_price']
+    T, _ = scores.shape
+    max_positions = int(params['max_positions'])
+    cost = params['cost_bps'] / 10000.0 / max_positions
+
+    # Top N por fecha (lo que llega a detailed_results)
+    screened = np.zeros(scores.shape, dtype=bool)
+    ranked = []
+    for t in range(T):
+        valid = np.flatnonzero(~np.isnan(scores[t]))
+        top = valid[np.argsort(-scores[t, valid], kind='stable')[:int(params['top_n'])]]
+        screened[t, top] = True
+        ranked.append(top)
+
+    window = int(params['consistency_window'])
+    appearances = np.cumsum(screened, axis=0)
+    consistency = appearances.copy()
+    consistency[window:] -= appearances[:-window]
+
+    positions = {}
+    equity = 1.0
+    curve = [equity]
+    trades = stop_exits = momentum_exits = rotations = 0
+    held_days = 0
+
+    for t in range(T):
+        if t > 0 and positions:
+            # Mark-to-market t-1 -> t (huecos vacíos = liquidez)
+            daily = sum(close[t, s] / close[t - 1, s] - 1 for s in positions
+                        if math.isfinite(close[t, s]) and math.isfinite(close[t - 1, s]))
+            equity *= 1 + daily / max_positions
+            held_days += len(positions)
+
+        # 1. Salidas por stop o pérdida de momentum
+        for s in list(positions):
+            position = positions[s]
+            if screened[t, s]:
+                position['stop'] = stops[t, s]
+                position['absent'] = 0
+            else:
+                position['absent'] += 1
+
+            price = close[t, s]
+            if not math.isfinite(price):
+                continue
+            if (price - position['stop']) / price <= params['stop_loss_proximity_threshold']:
+                stop_exits += 1
+            elif position['absent'] >= params['momentum_loss_days']:
+                momentum_exits += 1
+            else:
+                continue
+            del positions[s]
+            equity *= 1 - cost
+            trades += 1
+
+        # 2. Entradas y rotaciones (candidatos ya ordenados por score)
+        for s in ranked[t]:
+            if (s in positions or consistency[t, s] < params['min_consistency_weeks'] or
+                    scores[t, s] < params['min_viable_score']):
+                continue
+
+            if len(positions) >= max_positions:
+                scored_held = [(scores[t, h], h) for h in positions if screened[t, h]]
+                if not scored_held:
+                    break
+                weakest_score, weakest = min(scored_held)
+                if scores[t, s] - weakest_score < params['min_score_difference']:
+                    break  # Si el mejor candidato no mejora, ninguno lo hará
+                del positions[weakest]
+                equity *= 1 - cost
+                trades += 1
+                rotations += 1
+
+            positions[s] = {'stop': stops[t, s] if math.isfinite(stops[t, s]) else close[t, s] * 0.90,
+                            'absent': 0}
+            equity *= 1 - cost
+            trades += 1
+
+        if t > 0:
+            curve.append(equity)
+
+    curve = np.array(curve)
+    daily_returns = np.diff(curve) / curve[:-1] if len(curve) > 1 else np.array([])
+    peak = np.maximum.accumulate(curve)
+    sharpe = 0.0
+    if len(daily_returns) > 1 and daily_returns.std() > 0:
+        sharpe = float(daily_returns.mean() / daily_returns.std() * (252 ** 0.5))
+
+    spy_close = panel['spy_close']
+    return {
+        'total_return_pct': round(float((equity - 1) * 100), 2),
+        'spy_return_pct': round(float((spy_close[-1] / spy_close[0] - 1) * 100), 2),
+        'max_drawdown_pct': round(float(((curve - peak) / peak).min() * 100), 2),
+        'sharpe': round(sharpe, 2),
+        'trades': trades,
+        'rotations': rotations,
+        'stop_exits': stop_exits,
+        'momentum_exits': momentum_exits,
+        'avg_positions': round(held_days / max(T - 1, 1), 2),
+        'avg_candidates': round(float(screened.sum(axis=1).mean()), 1),
+    }
+
+
+def _init_worker(panel):
+    global _PANEL
+    _PANEL = panel
+
+
+def evaluate_config(config):
+    """Evalúa una configuración sobre el panel del worker (sin recalcular indicadores)"""
+    params = {**DEFAULT_SCORING_PARAMS, **ROTATION_DEFAULTS, **SIMULATION_DEFAULTS, **config}
+    outcome = simulate_rotation(_PANEL, score_panel(_PANEL, params), params)
+    return {'config': config, **outcome}
+
+
+def _rank_key(result):
+    return (result['total_return_pct'], result['max_drawdown_pct'])
+
+
+def run_sweep(grid=None, cache_dir=PRICE_CACHE_DIR, lookback=60, workers=None, top=10,
+              output=SWEEP_RESULTS_FILE, price_panel_path=PRICE_PANEL_DIR):
+    """Carga panel, precalcula indicadores y evalúa todo el grid en paralelo"""
+    grid = grid or DEFAULT_GRID
+    configs = expand_grid(grid)
+    workers = workers or os.cpu_count() or 1
+
+    print(f"🧪 Barrido de parámetros: {len(configs)} configuraciones | {workers} procesos")
+
+    precompute_start = time.perf_counter()
+    panel = build_panel(PriceCache(cache_dir), lookback=lookback, workers=workers,
+                        price_panel_path=price_panel_path)
+    precompute_seconds = time.perf_counter() - precompute_start
+    print(f"📦 Panel: {len(panel['symbols'])} símbolos x {len(panel['dates'])} sesiones "
+          f"({panel['dates'][0]} → {panel['dates'][-1]}) | Indicadores: {precompute_seconds:.1f}s")
+
+    # Línea base = constantes actuales del bot
+    _init_worker(panel)
+    baseline = evaluate_config({})
+
+    sweep_start = time.perf_counter()
+    chunksize = max(1, len(configs) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(panel,)) as executor:
+        results = list(executor.map(evaluate_config, configs, chunksize=chunksize))
+    sweep_seconds = time.perf_counter() - sweep_start
+
+    results.sort(key=_rank_key, reverse=True)
+    throughput = len(configs) / sweep_seconds if sweep_seconds > 0 else 0.0
+
+    summary = {
+        'timestamp': datetime.now().isoformat(),
+        'as_of_dates': {'first': panel['dates'][0], 'last': panel['dates'][-1], 'count': len(panel['dates'])},
+        'symbols': len(panel['symbols']),
+        'grid': grid,
+        'grid_points': len(configs),
+        'workers': workers,
+        'precompute_seconds': round(precompute_seconds, 2),
+        'sweep_seconds': round(sweep_seconds, 2),
+        'grid_points_per_second': round(throughput, 1),
+        'baseline': baseline,
+        'ranking': results[:top]
+    }
+
+    with open(output, 'w') as f:
+        json.dump(summary, f, indent=2, default=str)
+
+    print(f"⚡ {len(configs)} grid points en {sweep_seconds:.1f}s → {throughput:.1f} grid points/s")
+    print(f"📏 Línea base (parámetros actuales): {baseline['total_return_pct']:+.2f}% | "
+          f"DD {baseline['max_drawdown_pct']:.2f}% | {baseline['trades']} operaciones")
+    print(f"\n🏆 TOP {min(top, len(results))} CONFIGURACIONES:")
+    for i, result in enumerate(results[:top], 1):
+        params = ", ".join(f"{k}={v}" for k, v in result['config'].items())
+        print(f"{i:2d}. {result['total_return_pct']:+7.2f}% | DD {result['max_drawdown_pct']:6.2f}% | "
+              f"Sharpe {result['sharpe']:5.2f} | Ops {result['trades']:3d} | {params}")
+    print(f"\n💾 Resultados guardados: {output}")
+
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Barrido paralelo de parámetros sobre datos cacheados')
+    parser.add_argument('--grid', help='JSON {parámetro: [valores]} (por defecto DEFAULT_GRID)')
+    parser.add_argument('--cache-dir', default=PRICE_CACHE_DIR, help='Directorio de price_cache')
+    parser.add_argument('--panel-dir', default=PRICE_PANEL_DIR, help='Directorio del panel mapeado')
+    parser.add_argument('--lookback', type=int, default=60, help='Sesiones as-of a simular')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos (por defecto: CPUs)')
+    parser.add_argument('--top', type=int, default=10, help='Configuraciones en el ranking')
+    parser.add_argument('--output', default=SWEEP_RESULTS_FILE)
+    args = parser.parse_args(argv)
+
+    grid = None
+    if args.grid:
+        with open(args.grid, 'r') as f:
+            grid = json.load(f)
+
+    try:
+        run_sweep(grid, cache_dir=args.cache_dir, lookback=args.lookback, workers=args.workers,
+                  top=args.top, output=args.output, price_panel_path=args.panel_dir)
+        return True
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Pick Outcomes - ¿Qué tal salieron las recomendaciones archivadas?
+=================================================================
+
+🗃️ Índice de todas las recomendaciones archivadas: screening (weekly_screening_results_*.json) y
+   rotación (rotation_recommendations_YYYYMMDD.json) con fecha, entrada, stop y take-profit
+📈 Rentabilidad a 5/10/21 sesiones, ¿stop o take-profit primero? y MAE/MFE hasta la salida
+🧮 Una sola pasada con arrays (recomendaciones x sesiones) sobre el panel de precios: el archivo
+   completo se recalcula en cada ejecución sin estado incremental
+⚖️ Stop y take-profit en la misma sesión: cuenta como stop (mismo criterio que exit_simulator)
+💾 historical_data/pick_outcomes.json (resumen por origen y por fecha + detalle) para el dashboard
+
+Uso:
+    python pick_outcomes.py        # o: python cli.py outcomes
+"""
+
+import glob
+import json
+import os
+import re
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+
+from exit_simulator import RECOMMENDATION_FILES, archive_session, first_hit, forward_fill, recommendation_trades
+from market_calendar import latest_completed_session
+from price_cache import PriceCache
+from price_panel import PRICE_PANEL_DIR, load_or_build_price_panel
+
+OUTCOMES_DIR = 'historical_data'
+OUTCOMES_FILE = os.path.join(OUTCOMES_DIR, 'pick_outcomes.json')
+ROTATION_FILES = 'rotation_recommendations_*.json'
+ROTATION_DATE = re.compile(r'rotation_recommendations_(\d{4})(\d{2})(\d{2})\.json$')  # No las de carteras batch
+
+FORWARD_HORIZONS = (5, 10, 21)    # Sesiones; la mayor es también la ventana de stop/take-profit
+OUTCOMES = ('stop_loss', 'take_profit', 'expired', 'open')
+SOURCES = ('screening', 'rotation')
+
+
+def screening_picks(pattern=RECOMMENDATION_FILES):
+    """Top de cada screening archivado (mismo índice que exit_simulator)"""
+    return [{'symbol': trade['symbol'], 'source': 'screening', 'pick_date': trade['entry_date'],
+             'entry_price': trade['entry_price'], 'stop_loss': trade['stop_loss'],
+             'take_profit': trade['take_profit']}
+            for trade in recommendation_trades(pattern)]
+
+
+def rotation_picks(pattern=ROTATION_FILES):
+    """Oportunidades de rotación archivadas (precio, stop y take-profit de su stock_data)"""
+    picks = {}
+    for path in sorted(glob.glob(pattern)):
+        match = ROTATION_DATE.search(os.path.basename(path))
+        if not match:
+            continue
+        try:
+            with open(path, 'r') as f:
+                rotation = json.load(f)
+        except Exception:
+            continue
+        # Sesión del screening consumido; archivos sin market_session: la cerrada antes de su análisis
+        pick_date = (archive_session(rotation) or
+                     latest_completed_session(datetime(*map(int, match.groups()), tzinfo=timezone.utc)))
+
+        for opportunity in rotation.get('rotation_opportunities', []):
+            stock = opportunity.get('stock_data') or {}
+            symbol = opportunity.get('symbol') or stock.get('symbol')
+            entry_price = stock.get('current_price') or 0
+            if not symbol or entry_price <= 0 or not stock.get('stop_loss'):
+                continue
+            picks[(symbol, pick_date)] = {
+                'symbol': symbol,
+                'source': 'rotation',
+                'pick_date': pick_date,
+                'entry_price': float(entry_price),
+                'stop_loss': float(stock['stop_loss']),
+                'take_profit': float(stock['take_profit']) if stock.get('take_profit') else None
+            }
+    return list(picks.values())
+
+
+def compute_outcomes(panel, picks, horizons=FORWARD_HORIZONS):
+    """
+    Resultado de todas las recomendaciones a la vez
+    Devuelve una lista alineada con `picks` (None si el símbolo no está en el panel o la fecha es
+    anterior a su primera sesión)
+    """
+    outcomes = [None] * len(picks)
+    dates = panel.dates
+    last = len(dates) - 1
+    entry_positions = np.array([np.searchsorted(dates, np.datetime64(p['pick_date'], 'D'), side='right') - 1
+                                for p in picks], dtype=int)
+    valid = [i for i, p in enumerate(picks) if p['symbol'] in panel and entry_positions[i] >= 0]
+    if not valid:
+        return outcomes
+
+    symbols = sorted({picks[i]['symbol'] for i in valid})
+    symbol_rows = {symbol: row for row, symbol in enumerate(symbols)}
+    panel_rows = [panel.symbol_index[s] for s in symbols]
+    data = {field: forward_fill(panel.fields[field][panel_rows].astype(np.float64))
+            for field in ('high', 'low', 'close')}
+
+    rows = np.array([symbol_rows[picks[i]['symbol']] for i in valid])
+    entry = entry_positions[valid]
+    width = max(horizons)
+    offsets = np.arange(width)
+    columns = entry[:, None] + 1 + offsets[None, :]               # Sesiones 1..width tras la recomendación
+    observed = columns <= last
+    columns = np.minimum(columns, last)
+
+    def path(field):
+        return np.where(observed, data[field][rows[:, None], columns], np.nan)
+
+    high, low, close = path('high'), path('low'), path('close')
+    entry_price = np.array([picks[i]['entry_price'] for i in valid])
+    stop = np.array([picks[i]['stop_loss'] for i in valid])
+    take_profit = np.array([picks[i]['take_profit'] or np.nan for i in valid])
+    sessions = observed.sum(axis=1)
+
+    forward = {days: np.where(observed[:, days - 1], (close[:, days - 1] / entry_price - 1) * 100, np.nan)
+               for days in horizons}
+
+    with np.errstate(invalid='ignore'):
+        stop_index = first_hit(low <= stop[:, None])
+        take_profit_index = first_hit(high >= take_profit[:, None])
+    stopped = (stop_index >= 0) & ((take_profit_index < 0) | (stop_index <= take_profit_index))
+    took_profit = (take_profit_index >= 0) & ~stopped
+    exit_index = np.where(stopped, stop_index, np.where(took_profit, take_profit_index, width - 1))
+
+    # MAE/MFE: peor mínimo y mejor máximo hasta la salida (o hasta el final de la ventana)
+    until_exit = offsets[None, :] <= exit_index[:, None]
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # Sin sesiones posteriores todavía (All-NaN slice)
+        favorable = (np.nanmax(np.where(until_exit, high, np.nan), axis=1) / entry_price - 1) * 100
+        adverse = (np.nanmin(np.where(until_exit, low, np.nan), axis=1) / entry_price - 1) * 100
+
+    def rounded(value, digits=2):
+        return round(float(value), digits) if value is not None and np.isfinite(value) else None
+
+    for k, i in enumerate(valid):
+        pick = picks[i]
+        if stopped[k]:
+            outcome, index = 'stop_loss', int(stop_index[k])
+        elif took_profit[k]:
+            outcome, index = 'take_profit', int(take_profit_index[k])
+        else:
+            outcome, index = ('expired' if sessions[k] == width else 'open'), -1
+        result = {
+            'symbol': pick['symbol'],
+            'source': pick['source'],
+            'pick_date': pick['pick_date'].isoformat(),
+            'entry_date': str(dates[entry[k]]),
+            'entry_price': rounded(entry_price[k]),
+            'stop_loss': rounded(stop[k]),
+            'take_profit': rounded(take_profit[k]),
+            'sessions': int(sessions[k]),
+        }
+        for days in horizons:
+            result[f'return_{days}d'] = rounded(forward[days][k])
+        result.update({
+            'outcome': outcome,
+            'outcome_date': str(dates[entry[k] + 1 + index]) if index >= 0 else None,
+            'outcome_sessions': index + 1 if index >= 0 else None,
+            'max_favorable_pct': rounded(favorable[k]),
+            'max_adverse_pct': rounded(adverse[k])
+        })
+        outcomes[i] = result
+    return outcomes
+
+
+def summarize(outcomes, horizons=FORWARD_HORIZONS):
+    """Rentabilidad por horizonte, tasas de stop/take-profit y MAE/MFE medios"""
+    evaluated = [o for o in outcomes if o and o['sessions'] > 0]
+    summary = {'picks': len(outcomes), 'evaluated': len(evaluated)}
+    if not evaluated:
+        return summary
+
+    def column(key):
+        return np.array([o[key] for o in evaluated if o[key] is not None], dtype=float)
+
+    def mean(values):
+        return round(float(values.mean()), 2) if len(values) else None
+
+    summary['forward_returns'] = {}
+    for days in horizons:
+        values = column(f'return_{days}d')
+        summary['forward_returns'][f'{days}d'] = {
+            'count': len(values),
+            'avg_pct': mean(values),
+            'median_pct': round(float(np.median(values)), 2) if len(values) else None,
+            'win_rate': round(float((values > 0).mean()) * 100, 1) if len(values) else None
+        }
+
+    counts = {outcome: sum(o['outcome'] == outcome for o in evaluated) for outcome in OUTCOMES}
+    resolved = counts['stop_loss'] + counts['take_profit']
+    summary.update({
+        'outcomes': counts,
+        'outcomes_pct': {outcome: round(count / len(evaluated) * 100, 1) for outcome, count in counts.items()},
+        # De las que ya tocaron un nivel, % que llegó antes al take-profit
+        'take_profit_hit_rate': round(counts['take_profit'] / resolved * 100, 1) if resolved else None,
+        'avg_max_favorable_pct': mean(column('max_favorable_pct')),
+        'avg_max_adverse_pct': mean(column('max_adverse_pct'))
+    })
+    return summary
+
+
+def summarize_by_date(outcomes, horizons=FORWARD_HORIZONS):
+    """Una fila por fecha de recomendación (evolución para el dashboard)"""
+    by_date = {}
+    for outcome in outcomes:
+        if outcome and outcome['sessions'] > 0:
+            by_date.setdefault(outcome['pick_date'], []).append(outcome)
+
+    rows = []
+    for pick_date, group in sorted(by_date.items()):
+        row = {'date': pick_date, 'picks': len(group)}
+        for days in horizons:
+            values = [o[f'return_{days}d'] for o in group if o[f'return_{days}d'] is not None]
+            row[f'avg_return_{days}d'] = round(sum(values) / len(values), 2) if values else None
+        row.update({outcome: sum(o['outcome'] == outcome for o in group) for outcome in OUTCOMES})
+        rows.append(row)
+    return rows
+
+
+def run_pick_outcomes(panel=None, screening_pattern=RECOMMENDATION_FILES, rotation_pattern=ROTATION_FILES):
+    """Recalcula el archivo completo de recomendaciones contra el panel"""
+    started = time.perf_counter()
+    panel = panel if panel is not None else load_or_build_price_panel(PriceCache(), PRICE_PANEL_DIR)
+    picks = screening_picks(screening_pattern) + rotation_picks(rotation_pattern)
+
+    start = time.perf_counter()
+    outcomes = compute_outcomes(panel, picks)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    evaluated = [o for o in outcomes if o]
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'panel_last_date': str(panel.dates[-1]),
+        'elapsed_ms': round(elapsed_ms, 2),
+        'total_seconds': round(time.perf_counter() - started, 2),
+        'parameters': {'horizons': list(FORWARD_HORIZONS), 'window_sessions': max(FORWARD_HORIZONS)},
+        'summary': summarize(outcomes),
+        'by_source': {source: summarize([o for o, p in zip(outcomes, picks) if p['source'] == source])
+                      for source in SOURCES},
+        'by_date': summarize_by_date(outcomes),
+        'picks': sorted(evaluated, key=lambda o: (o['pick_date'], o['source'], o['symbol']))
+    }
+
+
+def main():
+    try:
+        results = run_pick_outcomes()
+    except Exception as e:
+        print(f"❌ Resultados de recomendaciones no disponibles: {e}")
+        return False
+
+    os.makedirs(OUTCOMES_DIR, exist_ok=True)
+    with open(OUTCOMES_FILE, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    summary = results['summary']
+    print(f"🗃️ {summary['picks']} recomendaciones archivadas, {summary['evaluated']} con sesiones posteriores "
+          f"({results['elapsed_ms']:.1f} ms, panel hasta {results['panel_last_date']})")
+    for source, source_summary in results['by_source'].items():
+        if not source_summary.get('evaluated'):
+            continue
+        returns = " | ".join(f"{horizon} {stats['avg_pct']:+.2f}% ({stats['win_rate']:.0f}% >0)"
+                             for horizon, stats in source_summary['forward_returns'].items() if stats['count'])
+        hit_rate = source_summary['take_profit_hit_rate']
+        print(f"   {source:10s} | {returns or 'sin horizontes completos'} | "
+              f"TP antes que stop: {f'{hit_rate:.0f}%' if hit_rate is not None else 'N/A'} | "
+              f"MFE {source_summary['avg_max_favorable_pct']:+.1f}% / MAE {source_summary['avg_max_adverse_pct']:+.1f}%")
+    print(f"💾 {OUTCOMES_FILE}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Price Cache - Caché local de históricos y ticker.info
+=====================================================
+
+💾 Write-through desde RobustDataFetcher: cada histórico descargado se fusiona en disco
+📈 El histórico se acumula entre ejecuciones (más allá de los 6 meses de cada descarga)
+🧪 Base de datos offline para parameter_sweep.py y análisis sin red
+📅 Solo guarda sesiones completadas: si la caché cubre la última sesión, no se descarga
+"""
+
+import json
+import os
+import threading
+
+import pandas as pd
+
+PRICE_CACHE_DIR = os.environ.get('PRICE_CACHE_DIR', 'price_cache')
+
+
+def safe_name(symbol):
+    return symbol.replace('/', '_').replace('^', '_')
+
+
+def session_dates(hist):
+    """Fechas de sesión (Nueva York) de cada barra"""
+    index = hist.index
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_convert('America/New_York')
+    return index.date
+
+
+def trim_to_period(hist, period):
+    """Recorta un histórico acumulado al periodo de yfinance ('6mo', '1y', '30d'...)"""
+    if hist.empty or not period or period == 'max':
+        return hist
+    units = {'mo': 'months', 'y': 'years', 'd': 'days'}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            start = hist.index[-1] - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+            return hist[hist.index > start]
+    return hist
+
+
+class PriceCache:
+    """Caché en disco: <dir>/history/<SYMBOL>.pkl y <dir>/info/<SYMBOL>.json"""
+
+    def __init__(self, cache_dir=PRICE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.history_dir = os.path.join(cache_dir, 'history')
+        self.info_dir = os.path.join(cache_dir, 'info')
+        self._lock = threading.Lock()
+        self._dirs_ready = False
+
+    def _ensure_dirs(self):
+        if not self._dirs_ready:
+            with self._lock:
+                os.makedirs(self.history_dir, exist_ok=True)
+                os.makedirs(self.info_dir, exist_ok=True)
+                self._dirs_ready = True
+
+    def history_path(self, symbol):
+        return os.path.join(self.history_dir, f"{safe_name(symbol)}.pkl")
+
+    def info_path(self, symbol):
+        return os.path.join(self.info_dir, f"{safe_name(symbol)}.json")
+
+    def load_history(self, symbol):
+        """Histórico cacheado (DataFrame vacío si no existe o está corrupto)"""
+        try:
+            return pd.read_pickle(self.history_path(symbol))
+        except Exception:
+            return pd.DataFrame()
+
+    def load_covering_history(self, symbol, session, period=None):
+        """Histórico cacheado si ya incluye la sesión `session` (None si hay que descargar)"""
+        if session is None:
+            return None
+        hist = self.load_history(symbol)
+        if hist.empty or session_dates(hist)[-1] < session:
+            return None
+        return trim_to_period(hist, period)
+
+    def store_history(self, symbol, hist, complete_through=None):
+        """
+        Fusiona `hist` con lo cacheado (las barras nuevas prevalecen)
+        - complete_through: última sesión cerrada; las barras posteriores (parciales) no se guardan
+        """
+        if hist is None or hist.empty:
+            return
+        try:
+            if complete_through is not None:
+                hist = hist[session_dates(hist) <= complete_through]
+                if hist.empty:
+                    return
+            self._ensure_dirs()
+            cached = self.load_history(symbol)
+            if not cached.empty:
+                merged = pd.concat([cached, hist])
+                hist = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+            # Escritura atómica: un proceso concurrente nunca lee un pickle a medias
+            path = self.history_path(symbol)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            hist.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            pass
+
+    def load_info(self, symbol):
+        """ticker.info cacheado (None si no existe)"""
+        try:
+            with open(self.info_path(symbol), 'r') as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def store_info(self, symbol, info):
+        if not info:
+            return
+        try:
+            self._ensure_dirs()
+            path = self.info_path(symbol)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(info, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception:
+            pass
+
+    def cached_symbols(self):
+        """Símbolos con histórico en caché"""
+        if not os.path.isdir(self.history_dir):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.history_dir) if name.endswith('.pkl'))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Price Panel - Panel columnar float32 en memoria mapeada
+=======================================================
+
+🧱 Un .npy por campo: open/high/low/close float32, volume uint64 (símbolos x sesiones)
+🗺️ Memoria mapeada: varios procesos se adjuntan al mismo fichero sin copiar ni serializar
+🔍 Lecturas como vistas NumPy: series(símbolo), cross_section(campo, fecha), window(...)
+📏 Orden por símbolo: la serie de un símbolo es contigua (screening y backtests por símbolo)
+🔁 Se construye desde price_cache/ (build_price_panel) y se reconstruye si la caché cambia
+
+Uso:
+    python price_panel.py              # Construye/actualiza price_panel/ desde price_cache/
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from price_cache import PRICE_CACHE_DIR, PriceCache, session_dates
+
+PRICE_PANEL_DIR = os.environ.get('PRICE_PANEL_DIR', 'price_panel')
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+FIELD_DTYPES = {'open': np.float32, 'high': np.float32, 'low': np.float32, 'close': np.float32,
+                'volume': np.uint64}
+FRAME_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+
+class PricePanel:
+    """Panel de precios de solo lectura sobre ficheros .npy mapeados en memoria"""
+
+    def __init__(self, path=PRICE_PANEL_DIR):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            self.meta = json.load(f)
+
+        self.symbols = self.meta['symbols']
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.dates = np.load(os.path.join(path, 'dates.npy'))  # datetime64[D]
+        self.fields = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+            for name in FIELD_DTYPES
+        }
+
+    def __reduce__(self):
+        # Al pasar el panel a otro proceso solo viaja la ruta: el worker re-mapea los ficheros
+        return (PricePanel, (self.path,))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.symbol_index
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.fields.values())
+
+    def date_position(self, as_of):
+        """Nº de sesiones <= as_of (para cortar vistas por fecha)"""
+        return int(np.searchsorted(self.dates, np.datetime64(as_of, 'D'), side='right'))
+
+    def series(self, symbol, field='close', as_of=None):
+        """Vista 1-D (sin copia) de un campo de un símbolo, opcionalmente hasta as_of"""
+        row = self.fields[field][self.symbol_index[symbol]]
+        return row if as_of is None else row[:self.date_position(as_of)]
+
+    def cross_section(self, field, as_of):
+        """Vista de un campo para todos los símbolos en una sesión (NaN si no cotizó)"""
+        position = self.date_position(as_of) - 1
+        return self.fields[field][:, position]
+
+    def window(self, field, start=None, end=None):
+        """Vista 2-D (símbolos x sesiones) entre dos fechas (end incluido)"""
+        first = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, 'D')))
+        last = len(self.dates) if end is None else self.date_position(end)
+        return self.fields[field][:, first:last]
+
+    def to_frame(self, symbol, as_of=None):
+        """
+        DataFrame OHLCV float64 de un símbolo (compatible con screening_core)
+        Solo se copia la fila del símbolo; se omiten las sesiones sin cotización
+        """
+        i = self.symbol_index[symbol]
+        end = len(self.dates) if as_of is None else self.date_position(as_of)
+        close = self.fields['close'][i, :end]
+        traded = ~np.isnan(close)
+
+        frame = pd.DataFrame(
+            {FRAME_COLUMNS[name]: self.fields[name][i, :end][traded].astype(np.float64)
+             for name in FIELD_DTYPES},
+            index=pd.DatetimeIndex(self.dates[:end][traded])
+        )
+        frame['Volume'] = frame['Volume'].astype(np.int64)
+        return frame
+
+
+def _replace_dir(tmp_path, path):
+    """Sustituye el panel publicado (los lectores abiertos conservan sus mapeos)"""
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def build_price_panel(cache, path=PRICE_PANEL_DIR, symbols=None):
+    """Construye el panel desde la caché de históricos, escribiendo fila a fila"""
+    symbols = symbols if symbols is not None else cache.cached_symbols()
+
+    # Calendario común = unión de sesiones de todos los símbolos
+    histories = {}
+    calendar = set()
+    for symbol in symbols:
+        hist = cache.load_history(symbol)
+        if hist.empty:
+            continue
+        histories[symbol] = hist
+        calendar.update(session_dates(hist))
+
+    if not histories:
+        raise ValueError("No hay históricos en la caché para construir el panel")
+
+    dates = np.array(sorted(calendar), dtype='datetime64[D]')
+    ordered_symbols = sorted(histories)
+    shape = (len(ordered_symbols), len(dates))
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    arrays = {
+        name: np.lib.format.open_memmap(os.path.join(tmp_path, f"{name}.npy"), mode='w+',
+                                        dtype=dtype, shape=shape)
+        for name, dtype in FIELD_DTYPES.items()
+    }
+    for name in PRICE_FIELDS:
+        arrays[name][:] = np.nan
+
+    for i, symbol in enumerate(ordered_symbols):
+        hist = histories[symbol]
+        positions = np.searchsorted(dates, np.array(session_dates(hist), dtype='datetime64[D]'))
+        for name in PRICE_FIELDS:
+            arrays[name][i, positions] = hist[FRAME_COLUMNS[name]].to_numpy(dtype=np.float32)
+        volume = np.nan_to_num(hist['Volume'].to_numpy(dtype=np.float64), nan=0.0)
+        arrays['volume'][i, positions] = np.clip(volume, 0, None).astype(np.uint64)
+
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    np.save(os.path.join(tmp_path, 'dates.npy'), dates)
+    meta = {
+        'built_at': datetime.now().isoformat(),
+        'source': os.path.abspath(cache.cache_dir),
+        'symbols': ordered_symbols,
+        'shape': list(shape),
+        'first_date': str(dates[0]),
+        'last_date': str(dates[-1]),
+        'dtypes': {name: np.dtype(dtype).name for name, dtype in FIELD_DTYPES.items()},
+        'layout': 'symbol_major'
+    }
+    with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    _replace_dir(tmp_path, path)
+    return PricePanel(path)
+
+
+def panel_is_current(cache, path=PRICE_PANEL_DIR):
+    """True si el panel existe y es posterior a todos los históricos cacheados"""
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return False
+    built = os.path.getmtime(meta_path)
+    if not os.path.isdir(cache.history_dir):
+        return True
+    with os.scandir(cache.history_dir) as entries:
+        return all(entry.stat().st_mtime <= built for entry in entries if entry.name.endswith('.pkl'))
+
+
+def load_or_build_price_panel(cache, path=PRICE_PANEL_DIR):
+    """Abre el panel publicado o lo reconstruye si la caché es más reciente"""
+    if panel_is_current(cache, path):
+        return PricePanel(path)
+    return build_price_panel(cache, path)
+
+
+def main():
+    cache = PriceCache(PRICE_CACHE_DIR)
+    start = time.perf_counter()
+    try:
+        panel = build_price_panel(cache)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+    pickle_bytes = sum(os.path.getsize(cache.history_path(s)) for s in panel.symbols)
+    print(f"🧱 Panel construido en {time.perf_counter() - start:.1f}s: "
+          f"{len(panel.symbols)} símbolos x {len(panel.dates)} sesiones "
+          f"({panel.meta['first_date']} → {panel.meta['last_date']})")
+    print(f"💾 {panel.nbytes / 1e6:.1f} MB mapeados vs {pickle_bytes / 1e6:.1f} MB en pickles (float64)")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
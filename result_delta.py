@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Result Delta - Cambios del screening respecto a la ejecución anterior
+=====================================================================
+
+🔀 Por símbolo: entra / sale del top, score movido más de DELTA_SCORE_POINTS, stop movido más de
+   DELTA_STOP_PCT % y cambio de categoría de momentum (EXCEPTIONAL / STRONG / MODERATE)
+📄 screening_delta.json compacto: solo los símbolos con cambios (+ lista de los que no cambian)
+⏮️ Ejecución anterior = último weekly_screening_results_YYYYMMDD.json de un día previo
+🧾 Lo muestran el mensaje de commit, el reporte y el dashboard como bloque de cambios (no sustituye al snapshot)
+🪶 Solo stdlib: subcomando ligero (python cli.py delta)
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+from consistency_state import CURRENT_FILE, HISTORY_PATTERN, history_dates, snapshot_date
+from screening_stats import momentum_category
+
+DELTA_FILE = 'screening_delta.json'
+DELTA_SCORE_POINTS = float(os.environ.get('DELTA_SCORE_POINTS', '5.0'))
+DELTA_STOP_PCT = float(os.environ.get('DELTA_STOP_PCT', '1.0'))
+
+CHANGE_KINDS = ('entered', 'exited', 'score_moved', 'stop_moved', 'category_changed')
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def find_previous_screening(current, pattern=HISTORY_PATTERN):
+    """(archivo, datos) del último histórico de un día anterior al screening actual"""
+    today = snapshot_date(current) or datetime.now().strftime('%Y-%m-%d')
+    for date, path in sorted(history_dates(pattern).items(), reverse=True):
+        if date < today:
+            data = _load_json(path)
+            if data is not None:
+                return path, data
+    return None, None
+
+
+def _snapshot(screening):
+    """símbolo -> (posición, score, stop, categoría) del top del screening"""
+    rows = {}
+    for rank, result in enumerate((screening or {}).get('detailed_results', []), 1):
+        symbol = result.get('symbol')
+        if not symbol:
+            continue
+        score = result.get('score', 0) or 0
+        rows[symbol] = {
+            'rank': rank,
+            'score': score,
+            'stop_loss': result.get('stop_loss'),
+            'category': momentum_category(score, result.get('outperformance_20d', 0) or 0)
+        }
+    return rows
+
+
+def compute_delta(previous, current, score_points=DELTA_SCORE_POINTS, stop_pct=DELTA_STOP_PCT):
+    """Cambios por símbolo entre dos resultados de screening (previous=None: todo entra)"""
+    before, after = _snapshot(previous), _snapshot(current)
+    changes = {}
+    unchanged = []
+
+    for symbol, now in after.items():
+        then = before.get(symbol)
+        if then is None:
+            changes[symbol] = {'changes': ['entered'], 'rank': [None, now['rank']],
+                               'score': [None, now['score']], 'stop_loss': [None, now['stop_loss']],
+                               'category': [None, now['category']]}
+            continue
+
+        kinds = []
+        if abs(now['score'] - then['score']) > score_points:
+            kinds.append('score_moved')
+        if then['stop_loss'] and now['stop_loss'] is not None:
+            if abs(now['stop_loss'] - then['stop_loss']) / then['stop_loss'] * 100 > stop_pct:
+                kinds.append('stop_moved')
+        if now['category'] != then['category']:
+            kinds.append('category_changed')
+
+        if kinds:
+            changes[symbol] = {'changes': kinds, 'rank': [then['rank'], now['rank']],
+                               'score': [then['score'], now['score']],
+                               'stop_loss': [then['stop_loss'], now['stop_loss']],
+                               'category': [then['category'], now['category']]}
+        else:
+            unchanged.append(symbol)
+
+    for symbol, then in before.items():
+        if symbol not in after:
+            changes[symbol] = {'changes': ['exited'], 'rank': [then['rank'], None],
+                               'score': [then['score'], None], 'stop_loss': [then['stop_loss'], None],
+                               'category': [then['category'], None]}
+
+    summary = {kind: sum(kind in entry['changes'] for entry in changes.values()) for kind in CHANGE_KINDS}
+    summary['unchanged'] = len(unchanged)
+    return {'summary': summary, 'changes': changes, 'unchanged': sorted(unchanged)}
+
+
+def build_delta(current_file=CURRENT_FILE, pattern=HISTORY_PATTERN, output=DELTA_FILE):
+    """Calcula y guarda el delta del screening actual frente al del día anterior"""
+    current = _load_json(current_file)
+    if current is None:
+        return None
+    previous_file, previous = find_previous_screening(current, pattern)
+
+    delta = {
+        'generated_at': datetime.now().isoformat(),
+        'current_analysis_date': current.get('analysis_date'),
+        'previous_analysis_date': previous.get('analysis_date') if previous else None,
+        'previous_file': previous_file,
+        'baseline': previous is None,
+        'thresholds': {'score_points': DELTA_SCORE_POINTS, 'stop_pct': DELTA_STOP_PCT}
+    }
+    delta.update(compute_delta(previous, current))
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(delta, f, indent=2)
+    return delta
+
+
+def load_delta(screening=None, path=DELTA_FILE):
+    """Delta guardado si corresponde al screening indicado (None si falta o es de otra ejecución)"""
+    delta = _load_json(path)
+    if delta is None:
+        return None
+    if screening is not None and delta.get('current_analysis_date') != screening.get('analysis_date'):
+        return None
+    return delta
+
+
+def format_delta_summary(delta):
+    """'+3 / -2 / Δscore 4 / Δstop 1 / Δcat 2' para logs y mensajes de commit"""
+    summary = delta['summary']
+    return (f"+{summary['entered']} / -{summary['exited']} / Δscore {summary['score_moved']} / "
+            f"Δstop {summary['stop_moved']} / Δcat {summary['category_changed']}")
+
+
+def main():
+    delta = build_delta()
+    if delta is None:
+        print(f"❌ No se pudo leer {CURRENT_FILE}")
+        return False
+
+    if delta['baseline']:
+        print("🔀 Sin screening anterior: todo el top cuenta como nuevo")
+    else:
+        print(f"🔀 Delta vs {delta['previous_file']}: {format_delta_summary(delta)} "
+              f"({delta['summary']['unchanged']} sin cambios)")
+    for symbol, entry in sorted(delta['changes'].items(), key=lambda item: item[1]['rank'][1] or 99):
+        print(f"   {symbol:6} {', '.join(entry['changes'])}")
+    print(f"✅ Delta guardado: {DELTA_FILE}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -4,20 +4,39 @@ Aggressive Rotation Recommender - ACTUALIZADO: Criterios estrictos para trading
 🌍 MANTIENE: Toda la funcionalidad de divisas y portfolio vacío existente
 🆕 AÑADE: Criterios estrictos (+30pts, stop proximity, momentum loss) para evitar overtrading
 🔄 FILOSOFÍA: Daily monitoring, monthly trading
+📂 MODO BATCH: --portfolios DIR evalúa varias carteras con una sola carga de screening/consistencia
+🕸️ ARRANQUE: consistencia, screening, cartera y tipo de cambio en paralelo (tipo estático si vence FX_TIMEOUT)
 """
 
+import argparse
 import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import math
-import requests
+
+from bootstrap import Bootstrap
+
+ROTATION_BATCH_DIR = 'rotation_batch'
+PORTFOLIO_FILE = 'current_portfolio.json'
+FX_TIMEOUT = float(os.environ.get('FX_TIMEOUT_SECONDS', '8'))  # Vencido: tipo de cambio estático
+
+
+def _read_json(path):
+    """JSON de disco (None si no existe: el llamador decide, p.ej. crear la cartera de ejemplo)"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
 
 class PortfolioCurrencyHandler:
     def __init__(self):
         self.exchange_rates = {}
         self.cache_expiry = None
         self.cache_duration_hours = 6
+        self.rate_lookups = 0  # Consultas de red (el modo batch comparte el handler)
         
     def get_exchange_rate(self, from_currency: str, to_currency: str) -> float:
         """Obtiene tipo de cambio con cache de 6 horas"""
@@ -32,20 +51,35 @@ class PortfolioCurrencyHandler:
             return self.exchange_rates[cache_key]
         
         try:
+            self.rate_lookups += 1
             rate = self._fetch_exchange_rate_multiple_sources(from_currency, to_currency)
-            
-            if rate > 0:
-                self.exchange_rates[cache_key] = rate
-                self.cache_expiry = datetime.now() + timedelta(hours=self.cache_duration_hours)
-                return rate
-            else:
-                return self._get_fallback_rate(from_currency, to_currency)
-                
-        except Exception as e:
-            return self._get_fallback_rate(from_currency, to_currency)
+        except Exception:
+            rate = 0
+        
+        # El fallback también se cachea: sin red, N carteras no deben esperar N timeouts
+        if rate <= 0:
+            return self.use_fallback_rate(from_currency, to_currency)
+        self.exchange_rates[cache_key] = rate
+        self.cache_expiry = datetime.now() + timedelta(hours=self.cache_duration_hours)
+        return rate
+    
+    def use_fallback_rate(self, from_currency: str, to_currency: str) -> float:
+        """Fija en cache el tipo de cambio estático (sin red o consulta vencida en el arranque)"""
+        rate = self._get_fallback_rate(from_currency, to_currency)
+        self.exchange_rates[f"{from_currency}_{to_currency}"] = rate
+        self.cache_expiry = datetime.now() + timedelta(hours=self.cache_duration_hours)
+        return rate
+    
+    def prefetch_portfolio_rate(self, portfolio_data: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Consulta (y deja en cache) el tipo de cambio que necesitará normalize_portfolio_to_usd"""
+        base_currency = (portfolio_data or {}).get('base_currency', 'EUR')
+        if not portfolio_data or base_currency == 'USD':
+            return None
+        return self.get_exchange_rate(base_currency, 'USD')
     
     def _fetch_exchange_rate_multiple_sources(self, from_currency: str, to_currency: str) -> float:
         """Intenta múltiples fuentes para obtener el tipo de cambio"""
+        import requests  # Import diferido: solo se paga si hay que convertir divisas
         
         # Source 1: exchangerate-api.com (free tier)
         try:
@@ -181,8 +215,11 @@ class AggressiveRotationRecommender:
         self.current_portfolio = None
         self.consistency_analysis = None
         self.screening_data = None
+        self.screening_index = {}        # símbolo -> resultado de screening (una vez por carga)
+        self.consistency_symbols = set()  # Símbolos presentes en alguna categoría de consistencia
         self.currency_handler = PortfolioCurrencyHandler()
         self.portfolio_status = None
+        self.bootstrap_portfolio = None  # Cartera leída en paralelo con el resto de datos (load_shared_data)
         
         # 🆕 CRITERIOS ESTRICTOS PARA TRADING MENSUAL
         self.min_score_difference = 30.0  # Mínimo 30 puntos de diferencia para rotación
@@ -203,6 +240,17 @@ class AggressiveRotationRecommender:
         self.strict_fundamentals_bonus = 1.10
         self.quality_stop_bonus = 1.05
         
+        # 📉 Penalización por correlación 60d con posiciones en cartera (correlation_engine.py)
+        self.correlation_aware = True
+        self.correlation_stats = None
+        self.correlation_engine = None  # Reutilizado entre carteras en modo batch
+        
+        # 🛤️ Recorrido real (High/Low) de stops, trailing y take-profit desde la entrada (exit_simulator.py)
+        self.path_aware = True
+        self.price_panel = None  # Reutilizado entre carteras en modo batch
+        self.archived_exits = None  # Recomendaciones archivadas simuladas una vez (load_shared_data)
+        self.exit_simulation = None
+        
         print(f"🎯 Recomendador con CRITERIOS ESTRICTOS para trading mensual")
         print(f"📊 Score +{self.min_score_difference}, Stop {self.stop_loss_proximity_threshold*100}%, Momentum {self.momentum_loss_days}d")
         
@@ -211,6 +259,7 @@ class AggressiveRotationRecommender:
         try:
             with open('consistency_analysis.json', 'r') as f:
                 self.consistency_analysis = json.load(f)
+            self.build_consistency_index()
             print(f"📊 Consistency analysis loaded")
             return True
         except FileNotFoundError:
@@ -225,6 +274,7 @@ class AggressiveRotationRecommender:
         try:
             with open('weekly_screening_results.json', 'r') as f:
                 self.screening_data = json.load(f)
+            self.build_screening_index()
             print(f"🔍 Screening data loaded")
             return True
         except FileNotFoundError:
@@ -234,26 +284,49 @@ class AggressiveRotationRecommender:
             print(f"❌ Error cargando screening data: {e}")
             return False
     
-    def load_current_portfolio(self):
-        """Carga la cartera actual del usuario con soporte de divisas"""
+    def build_screening_index(self):
+        """Índice símbolo -> resultado (sustituye los recorridos lineales de detailed_results)"""
+        self.screening_index = {}
+        for result in (self.screening_data or {}).get('detailed_results', []):
+            symbol = result.get('symbol')
+            if symbol and symbol not in self.screening_index:
+                self.screening_index[symbol] = result
+    
+    def build_consistency_index(self):
+        """Conjunto de símbolos con presencia en el análisis de consistencia"""
+        consistency_data = (self.consistency_analysis or {}).get('consistency_analysis', {})
+        self.consistency_symbols = {
+            item['symbol']
+            for category in ['consistent_winners', 'strong_candidates', 'emerging_opportunities', 'newly_emerged']
+            for item in consistency_data.get(category, [])
+        }
+    
+    def set_portfolio(self, raw_portfolio: Dict[str, Any]):
+        """Normaliza a USD y analiza una cartera ya leída (sin tocar screening/consistencia)"""
+        # Normalize to USD for calculations
+        self.current_portfolio = self.currency_handler.normalize_portfolio_to_usd(raw_portfolio)
+        
+        # Analyze portfolio status
+        self.portfolio_status = self.currency_handler.analyze_portfolio_status(self.current_portfolio)
+        self.correlation_stats = None
+        self.exit_simulation = None
+        
+        print(f"📂 Portfolio loaded: {self.portfolio_status['description']}")
+        print(f"💰 Status: {self.portfolio_status['status']}")
+        
+        # Display currency info if conversion happened
+        if 'currency_conversion' in self.current_portfolio:
+            conv = self.current_portfolio['currency_conversion']
+            print(f"💱 Currency: {conv['base_currency']} → {conv['target_currency']} @ {conv['exchange_rate']:.4f}")
+    
+    def load_current_portfolio(self, raw_portfolio: Optional[Dict[str, Any]] = None):
+        """Carga la cartera actual del usuario con soporte de divisas (raw_portfolio: ya leída en el arranque)"""
         try:
-            with open('current_portfolio.json', 'r') as f:
-                raw_portfolio = json.load(f)
-            
-            # Normalize to USD for calculations
-            self.current_portfolio = self.currency_handler.normalize_portfolio_to_usd(raw_portfolio)
-            
-            # Analyze portfolio status
-            self.portfolio_status = self.currency_handler.analyze_portfolio_status(self.current_portfolio)
-            
-            print(f"📂 Portfolio loaded: {self.portfolio_status['description']}")
-            print(f"💰 Status: {self.portfolio_status['status']}")
-            
-            # Display currency info if conversion happened
-            if 'currency_conversion' in self.current_portfolio:
-                conv = self.current_portfolio['currency_conversion']
-                print(f"💱 Currency: {conv['base_currency']} → {conv['target_currency']} @ {conv['exchange_rate']:.4f}")
+            if raw_portfolio is None:
+                with open(PORTFOLIO_FILE, 'r') as f:
+                    raw_portfolio = json.load(f)
             
+            self.set_portfolio(raw_portfolio)
             return True
             
         except FileNotFoundError:
@@ -320,13 +393,7 @@ class AggressiveRotationRecommender:
             if not self.screening_data:
                 return False, 0.0, "No screening data available"
             
-            detailed_results = self.screening_data.get('detailed_results', [])
-            stock_data = None
-            
-            for result in detailed_results:
-                if result.get('symbol') == symbol:
-                    stock_data = result
-                    break
+            stock_data = self.screening_index.get(symbol)
             
             if not stock_data:
                 # Calcular stop loss básico si no hay datos
@@ -349,6 +416,67 @@ class AggressiveRotationRecommender:
         except Exception as e:
             return False, 0.0, f"Error verificando stop loss: {e}"
     
+    def load_price_panel(self):
+        """Panel de precios compartido por todas las carteras (numpy solo se importa aquí)"""
+        if self.price_panel is None:
+            from price_cache import PriceCache
+            from price_panel import PRICE_PANEL_DIR, load_or_build_price_panel
+            self.price_panel = load_or_build_price_panel(PriceCache(), PRICE_PANEL_DIR)
+        return self.price_panel
+    
+    def simulate_archived_recommendations(self) -> Optional[Dict]:
+        """🛤️ Recomendaciones históricas: no dependen de la cartera, se simulan una vez por ejecución"""
+        if not self.path_aware:
+            return None
+        try:
+            from exit_simulator import simulate_recommendations
+            self.archived_exits = simulate_recommendations(self.load_price_panel())
+        except Exception as e:
+            print(f"⚠️ Recomendaciones históricas no simuladas ({e})")
+            self.archived_exits = None
+        return self.archived_exits
+    
+    def simulate_position_exits(self) -> Dict:
+        """
+        🛤️ Stops, trailing (ATR/MA50) y take-profit recorridos con High/Low desde la entrada
+        Solo las posiciones de la cartera: las recomendaciones históricas ya vienen de load_shared_data
+        """
+        self.exit_simulation = None
+        if not self.path_aware:
+            return {}
+        
+        try:
+            from exit_simulator import run_exit_simulation
+            simulation = run_exit_simulation(self.current_portfolio, self.load_price_panel(),
+                                             recommendations=self.archived_exits)
+        except Exception as e:
+            print(f"⚠️ Simulación de salidas no disponible ({e}) - solo stop estático")
+            return {}
+        
+        self.exit_simulation = {key: simulation[key] for key in
+                                ('panel_last_date', 'elapsed_ms', 'parameters', 'recommendations_summary')}
+        print(f"🛤️ Salidas simuladas en {simulation['elapsed_ms']:.1f} ms: {len(simulation['positions'])} posiciones "
+              f"+ {simulation['recommendations_summary']['evaluated']} recomendaciones históricas")
+        return simulation['positions']
+    
+    def apply_exit_path(self, exit_path: Dict, current_price: float, near_stop: bool,
+                        stop_distance: float, stop_reason: str) -> tuple:
+        """Combina el stop estático con lo ocurrido realmente desde la entrada (stop/trailing tocados)"""
+        if exit_path['stop_loss_hit']:
+            return True, stop_distance, (f"CRÍTICO: stop {exit_path['stop_loss']:.2f} tocado intradía "
+                                         f"el {exit_path['stop_loss_date']}")
+        if exit_path['trailing_atr_hit']:
+            return True, stop_distance, f"CRÍTICO: trailing stop ATR tocado el {exit_path['trailing_atr_date']}"
+        
+        level = exit_path.get('trailing_atr_level')
+        if level and current_price > 0:
+            distance = (current_price - level) / current_price
+            if distance * 100 < stop_distance:
+                if distance <= self.stop_loss_proximity_threshold:
+                    return True, distance * 100, f"CRÍTICO: Cerca del trailing stop ATR ({level:.2f})"
+                return near_stop, distance * 100, f"OK - Distancia segura del trailing stop ATR ({level:.2f})"
+        return near_stop, stop_distance, stop_reason
+    
     def check_momentum_loss(self, symbol: str) -> tuple:
         """
         🆕 NUEVO: Verifica si una acción ha perdido momentum (no aparece en screening por X días)
@@ -358,16 +486,8 @@ class AggressiveRotationRecommender:
             if not self.consistency_analysis:
                 return False, 0, "No consistency data available"
             
-            # Buscar el símbolo en análisis de consistencia
-            consistency_data = self.consistency_analysis.get('consistency_analysis', {})
-            
-            # Verificar en todas las categorías
-            all_symbols = []
-            for category in ['consistent_winners', 'strong_candidates', 'emerging_opportunities', 'newly_emerged']:
-                category_symbols = [item['symbol'] for item in consistency_data.get(category, [])]
-                all_symbols.extend(category_symbols)
-            
-            if symbol not in all_symbols:
+            # Buscar el símbolo en todas las categorías de consistencia (índice precalculado)
+            if symbol not in self.consistency_symbols:
                 # No aparece en screening actual - asumir pérdida de momentum
                 days_absent = self.momentum_loss_days + 1  # Simular días ausente
                 return True, days_absent, f"Ausente del screening por {days_absent}+ días"
@@ -426,11 +546,7 @@ class AggressiveRotationRecommender:
             return {}
         
         position_analysis = {}
-        screening_details = {}
-        
-        if self.screening_data:
-            for result in self.screening_data.get('detailed_results', []):
-                screening_details[result['symbol']] = result
+        exit_paths = self.simulate_position_exits()
         
         # Análisis de posiciones actuales con criterios estrictos
         for symbol, position_data in current_positions.items():
@@ -438,9 +554,12 @@ class AggressiveRotationRecommender:
                 entry_price = position_data.get('entry_price', 0)
                 entry_date = position_data.get('entry_date', '')
                 shares = position_data.get('shares', 0)
+                exit_path = exit_paths.get(symbol)
                 
-                # Buscar precio actual en screening data
+                # Buscar precio actual en screening data (o último cierre del panel)
                 current_price = self.get_current_price_from_screening(symbol)
+                if not current_price and exit_path:
+                    current_price = exit_path['last_close']
                 if not current_price:
                     current_price = entry_price  # Fallback
                 
@@ -448,6 +567,10 @@ class AggressiveRotationRecommender:
                 near_stop, stop_distance, stop_reason = self.check_position_near_stop_loss(
                     symbol, current_price, entry_price
                 )
+                if exit_path:
+                    near_stop, stop_distance, stop_reason = self.apply_exit_path(
+                        exit_path, current_price, near_stop, stop_distance, stop_reason
+                    )
                 
                 # 🆕 CRITERIO 2: Verificar pérdida de momentum
                 momentum_lost, days_absent, momentum_reason = self.check_momentum_loss(symbol)
@@ -479,6 +602,7 @@ class AggressiveRotationRecommender:
                         'days_absent': days_absent,
                         'reason': momentum_reason
                     },
+                    'exit_path': exit_path,
                     'recommendation': recommendation,
                     'action_urgency': urgency,
                     'monthly_trading_assessment': {
@@ -504,12 +628,8 @@ class AggressiveRotationRecommender:
             if not self.screening_data:
                 return None
             
-            detailed_results = self.screening_data.get('detailed_results', [])
-            for result in detailed_results:
-                if result.get('symbol') == symbol:
-                    return result.get('current_price', None)
-            
-            return None
+            result = self.screening_index.get(symbol)
+            return result.get('current_price', None) if result else None
         except Exception:
             return None
     
@@ -564,8 +684,7 @@ class AggressiveRotationRecommender:
         opportunities = []
         current_positions = self.current_portfolio.get('positions', {}) if self.current_portfolio else {}
         
-        # Obtener datos de screening y consistencia
-        detailed_results = self.screening_data.get('detailed_results', [])
+        # Obtener datos de consistencia (el screening se consulta por índice)
         consistency_data = self.consistency_analysis.get('consistency_analysis', {})
         
         # Analizar categorías de consistencia por orden de prioridad
@@ -575,6 +694,12 @@ class AggressiveRotationRecommender:
             ('emerging_opportunities', 0.85)
         ]
         
+        # Correlación de todos los candidatos vs cartera en una sola pasada
+        candidate_symbols = [stock_info['symbol'] for category, _ in priority_categories
+                             for stock_info in consistency_data.get(category, [])
+                             if stock_info['symbol'] not in current_positions]
+        correlations = self.get_correlation_adjustments(candidate_symbols, list(current_positions))
+        
         for category, weight_multiplier in priority_categories:
             category_stocks = consistency_data.get(category, [])
             
@@ -585,17 +710,15 @@ class AggressiveRotationRecommender:
                 # Solo analizar acciones que NO están en portfolio actual
                 if symbol not in current_positions:
                     # Buscar datos detallados de screening
-                    stock_data = None
-                    for result in detailed_results:
-                        if result.get('symbol') == symbol:
-                            stock_data = result
-                            break
+                    stock_data = self.screening_index.get(symbol)
                     
                     if stock_data and consistency_weeks >= self.min_consistency_weeks:
                         # Calcular score con bonuses (incluye MA50)
                         opportunity_analysis = self.calculate_optimization_quality_score(stock_data)
                         base_score = stock_data.get('score', 0)
-                        final_score = base_score * opportunity_analysis['quality_multiplier']
+                        correlation = correlations.get(symbol)
+                        correlation_multiplier = correlation['score_multiplier'] if correlation else 1.0
+                        final_score = base_score * opportunity_analysis['quality_multiplier'] * correlation_multiplier
                         
                         # 🆕 CRITERIO ESTRICTO: Solo recomendar si score >= threshold
                         if final_score >= self.min_viable_score:
@@ -614,6 +737,7 @@ class AggressiveRotationRecommender:
                                     'ma50_bonus_applied': opportunity_analysis['ma50_bonus_detected'],
                                     'ma50_bonus_value': opportunity_analysis['ma50_bonus_value'],
                                     'replacement_analysis': replacement_analysis,
+                                    'correlation': correlation,
                                     'monthly_trading_assessment': {
                                         'meets_strict_criteria': True,
                                         'significant_improvement': replacement_analysis['significant_improvement'],
@@ -632,6 +756,33 @@ class AggressiveRotationRecommender:
         
         return opportunities[:10]  # Top 10 oportunidades con criterios estrictos
     
+    def get_correlation_adjustments(self, candidate_symbols: List[str], held_symbols: List[str]) -> Dict:
+        """
+        📉 Correlación 60d de cada candidato con las posiciones actuales
+        numpy/pandas se importan solo aquí (el arranque de `cli.py rotate` sigue siendo ligero)
+        """
+        if not self.correlation_aware or not candidate_symbols or not held_symbols:
+            return {}
+        
+        try:
+            from correlation_engine import correlation_adjustments
+            if self.correlation_engine is None:
+                from correlation_engine import CorrelationEngine
+                self.correlation_engine = CorrelationEngine()
+            adjustments, self.correlation_stats = correlation_adjustments(candidate_symbols, held_symbols,
+                                                                          self.correlation_engine)
+        except Exception as e:
+            print(f"⚠️ Correlaciones no disponibles ({e}) - sin penalización")
+            return {}
+        
+        penalized = [s for s, adj in adjustments.items() if adj['score_multiplier'] < 1.0]
+        print(f"📉 Correlación 60d: {len(adjustments)} candidatos vs {len(held_symbols)} posiciones | "
+              f"{len(penalized)} penalizados")
+        for symbol in penalized[:5]:
+            adj = adjustments[symbol]
+            print(f"   {symbol} ~ {adj['correlated_with']} (ρ={adj['max_correlation']:.2f}) → x{adj['score_multiplier']:.2f}")
+        return adjustments
+    
     def analyze_replacement_potential(self, new_score: float, current_positions: Dict) -> Dict:
         """
         🆕 NUEVO: Analiza si una nueva oportunidad justifica reemplazar posiciones actuales
@@ -648,17 +799,13 @@ class AggressiveRotationRecommender:
         weakest_position = None
         weakest_score = float('inf')
         
-        if self.screening_data:
-            detailed_results = self.screening_data.get('detailed_results', [])
-            
-            for symbol in current_positions.keys():
-                for result in detailed_results:
-                    if result.get('symbol') == symbol:
-                        position_score = result.get('score', 0)
-                        if position_score < weakest_score:
-                            weakest_score = position_score
-                            weakest_position = symbol
-                        break
+        for symbol in current_positions.keys():
+            result = self.screening_index.get(symbol)
+            if result:
+                position_score = result.get('score', 0)
+                if position_score < weakest_score:
+                    weakest_score = position_score
+                    weakest_position = symbol
         
         if weakest_position and weakest_score > 0:
             score_improvement = new_score - weakest_score
@@ -793,13 +940,10 @@ class AggressiveRotationRecommender:
         """
         print("🎯 Generando recomendaciones ESTRICTAS para trading mensual...")
         
-        if not self.load_consistency_analysis():
+        if not self.load_shared_data(PORTFOLIO_FILE):
             return None
         
-        if not self.load_screening_data():
-            print("⚠️ Sin datos de screening - análisis limitado")
-        
-        portfolio_loaded = self.load_current_portfolio()
+        portfolio_loaded = self.load_current_portfolio(self.bootstrap_portfolio)
         
         # Archivar archivo anterior
         if os.path.exists('rotation_recommendations.json'):
@@ -814,6 +958,54 @@ class AggressiveRotationRecommender:
             except Exception as e:
                 print(f"⚠️ Error archivando recomendaciones anteriores: {e}")
         
+        recommendations = self.build_recommendations(portfolio_loaded)
+        
+        # Guardar recomendaciones
+        with open('rotation_recommendations.json', 'w') as f:
+            json.dump(recommendations, f, indent=2, default=str)
+        
+        print("✅ Recomendaciones con criterios estrictos guardadas: rotation_recommendations.json")
+        return recommendations
+    
+    def load_shared_data(self, portfolio_path: Optional[str] = None) -> bool:
+        """
+        🕸️ Consistencia + screening (e índices) + recomendaciones históricas simuladas, comunes a
+        todas las carteras, en paralelo.
+        Con portfolio_path también se lee la cartera (bootstrap_portfolio) y se consulta su tipo de
+        cambio a la vez; si la consulta vence FX_TIMEOUT se usa el tipo estático
+        """
+        boot = Bootstrap()
+        boot.add('consistency', self.load_consistency_analysis, fallback=lambda: False)
+        boot.add('screening', self.load_screening_data, fallback=lambda: False)
+        if portfolio_path:
+            boot.add('portfolio', lambda: _read_json(portfolio_path))
+            boot.add('fx', self.currency_handler.prefetch_portfolio_rate, deps=('portfolio',), timeout=FX_TIMEOUT)
+            # Cartera solo en cash: no hay salidas que simular (ni panel que cargar)
+            boot.add('exit_history', lambda portfolio: self.simulate_archived_recommendations()
+                     if (portfolio or {}).get('positions') else None, deps=('portfolio',))
+        else:
+            boot.add('exit_history', self.simulate_archived_recommendations)
+        results = boot.run()
+        
+        if portfolio_path:
+            raw_portfolio = self.bootstrap_portfolio = results['portfolio']
+            base_currency = (raw_portfolio or {}).get('base_currency', 'EUR')
+            if raw_portfolio and base_currency != 'USD' and 'fx' in boot.degraded():
+                rate = self.currency_handler.use_fallback_rate(base_currency, 'USD')
+                print(f"🛟 Tipo de cambio no disponible en {FX_TIMEOUT:g}s: {base_currency}/USD estático @ {rate:.4f}")
+        tasks = " | ".join(f"{name} {entry['seconds']:.2f}s" + ("" if entry['status'] == 'ok' else f" ({entry['status']})")
+                           for name, entry in boot.summary()['tasks'].items())
+        print(f"🕸️ Datos cargados en {boot.seconds:.2f}s: {tasks}")
+        
+        if not results['consistency']:
+            return False
+        
+        if not results['screening']:
+            print("⚠️ Sin datos de screening - análisis limitado")
+        return True
+    
+    def build_recommendations(self, portfolio_loaded: bool) -> Dict[str, Any]:
+        """Recomendaciones para la cartera cargada (sin E/S: reutilizable en modo batch)"""
         # Análisis con criterios estrictos
         rotation_opportunities = self.identify_rotation_opportunities_aggressive()
         
@@ -841,6 +1033,7 @@ class AggressiveRotationRecommender:
         # Generar reporte completo
         recommendations = {
             'analysis_date': datetime.now().isoformat(),
+            'market_session': (self.screening_data or {}).get('market_session'),  # Sesión del screening consumido
             'portfolio_status': 'loaded' if portfolio_loaded else 'example_created',
             'portfolio_details': self.portfolio_status,
             'currency_support': {
@@ -854,8 +1047,11 @@ class AggressiveRotationRecommender:
                 'min_score_difference': self.min_score_difference,
                 'stop_loss_proximity': self.stop_loss_proximity_threshold,
                 'momentum_loss_days': self.momentum_loss_days,
-                'ma50_bonus_integration': True
+                'ma50_bonus_integration': True,
+                'correlation_penalty': self.correlation_aware
             },
+            'correlation_analysis': self.correlation_stats,
+            'exit_simulation': self.exit_simulation,
             'optimization_features': optimization_features,
             'current_positions_count': len(position_analysis),
             'position_analysis': position_analysis,
@@ -870,13 +1066,49 @@ class AggressiveRotationRecommender:
             }
         }
         
-        # Guardar recomendaciones
-        with open('rotation_recommendations.json', 'w') as f:
-            json.dump(recommendations, f, indent=2, default=str)
-        
-        print("✅ Recomendaciones con criterios estrictos guardadas: rotation_recommendations.json")
         return recommendations
     
+    def generate_batch_recommendations(self, portfolio_dir: str, output_dir: str = ROTATION_BATCH_DIR):
+        """
+        📂 Evalúa todas las carteras *.json de un directorio en una pasada:
+        screening, consistencia e índices se cargan una vez; divisas y correlaciones se comparten.
+        Escribe output_dir/rotation_recommendations_<cartera>.json por cartera.
+        """
+        portfolio_files = sorted(f for f in os.listdir(portfolio_dir) if f.endswith('.json'))
+        if not portfolio_files:
+            print(f"⚠️ No hay carteras .json en {portfolio_dir}")
+            return None
+        
+        print(f"🎯 Modo batch: {len(portfolio_files)} carteras en {portfolio_dir}")
+        if not self.load_shared_data():
+            return None
+        
+        os.makedirs(output_dir, exist_ok=True)
+        results = {}
+        for filename in portfolio_files:
+            name = os.path.splitext(filename)[0]
+            try:
+                with open(os.path.join(portfolio_dir, filename), 'r') as f:
+                    raw_portfolio = json.load(f)
+            except Exception as e:
+                print(f"❌ Error cargando cartera {filename}: {e}")
+                continue
+            
+            print(f"\n📂 Cartera: {name}")
+            self.set_portfolio(raw_portfolio)
+            recommendations = self.build_recommendations(portfolio_loaded=True)
+            recommendations['portfolio_name'] = name
+            
+            output_path = os.path.join(output_dir, f"rotation_recommendations_{name}.json")
+            with open(output_path, 'w') as f:
+                json.dump(recommendations, f, indent=2, default=str)
+            results[name] = recommendations
+            print(f"✅ {name}: {len(recommendations['rotation_opportunities'])} oportunidades → {output_path}")
+        
+        print(f"\n📊 Batch completado: {len(results)}/{len(portfolio_files)} carteras | "
+              f"{self.currency_handler.rate_lookups} consultas de tipo de cambio")
+        return results
+    
     def print_currency_aware_summary(self, recommendations):
         """Imprime resumen con información de divisas y criterios estrictos"""
         if not recommendations:
@@ -936,10 +1168,19 @@ class AggressiveRotationRecommender:
                 for exit in urgent_exits:
                     print(f"   ❌ {exit['symbol']} - {exit['reason']}")
 
-def main():
+def main(argv=None):
     """Función principal con criterios estrictos y soporte de divisas"""
+    parser = argparse.ArgumentParser(description='Recomendaciones de rotación de cartera')
+    parser.add_argument('--portfolios', help='Directorio con varias carteras *.json (modo batch)')
+    parser.add_argument('--output-dir', default=ROTATION_BATCH_DIR,
+                        help='Destino de las recomendaciones en modo batch')
+    args = parser.parse_args(argv)
+    
     recommender = AggressiveRotationRecommender()
     
+    if args.portfolios:
+        return bool(recommender.generate_batch_recommendations(args.portfolios, args.output_dir))
+    
     recommendations = recommender.generate_aggressive_rotation_recommendations()
     
     if recommendations:
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Run Metrics - Telemetría de ejecución del pipeline
+==================================================
+
+⏱️ Timers por etapa (universo, SPY, lotes, fundamentales, serialización)
+📊 Histogramas de latencia por endpoint (history, info, NASDAQ API)
+🚨 Taxonomía de errores: reintentos, 429, frames vacíos, excepciones
+💾 Resultado en run_metrics.json con historial para el dashboard
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+RUN_METRICS_FILE = 'run_metrics.json'
+HISTORY_LIMIT = 60  # ~3 meses de ejecuciones diarias
+
+
+class LatencyHistogram:
+    """Histograma de latencias con buckets fijos en milisegundos"""
+
+    BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 15000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms):
+        """Registra una latencia en su bucket"""
+        index = len(self.BUCKETS_MS)
+        for i, upper in enumerate(self.BUCKETS_MS):
+            if latency_ms <= upper:
+                index = i
+                break
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, pct):
+        """Percentil aproximado (límite superior del bucket)"""
+        if self.count == 0:
+            return 0.0
+
+        target = self.count * pct / 100.0
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                if i < len(self.BUCKETS_MS):
+                    return round(min(float(self.BUCKETS_MS[i]), self.max_ms), 1)
+                return round(self.max_ms, 1)
+        return self.max_ms
+
+    def to_dict(self):
+        labels = [f"<={upper}ms" for upper in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 1) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'max_ms': round(self.max_ms, 1),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class RunMetrics:
+    """Colector thread-safe de métricas de una ejecución"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+        self._start_perf = time.perf_counter()
+        self.stages = {}
+        self.latency = defaultdict(LatencyHistogram)
+        self.counters = defaultdict(Counter)
+        self.rate_limiter_wait_seconds = 0.0
+        self.extra = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Cronometra una etapa: with metrics.stage('universe_fetch'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - start)
+
+    def add_stage_time(self, name, seconds):
+        """Acumula tiempo en una etapa (admite llamadas repetidas, p.ej. por lote)"""
+        with self._lock:
+            stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'max_seconds': 0.0})
+            stage['seconds'] += seconds
+            stage['calls'] += 1
+            stage['max_seconds'] = max(stage['max_seconds'], seconds)
+
+    def observe_request(self, endpoint, seconds, outcome):
+        """Registra latencia y resultado de un request (ok, empty, http_429, network, exception...)"""
+        with self._lock:
+            self.latency[endpoint].observe(seconds * 1000.0)
+            self.counters[endpoint]['requests'] += 1
+            self.counters[endpoint][outcome] += 1
+
+    def count(self, endpoint, event, n=1):
+        """Incrementa un contador de eventos (retries, gave_up...)"""
+        with self._lock:
+            self.counters[endpoint][event] += n
+
+    def event_count(self, endpoint, event):
+        """Valor actual de un contador (p.ej. 429 acumulados para ajustar la concurrencia)"""
+        with self._lock:
+            return self.counters[endpoint][event] if endpoint in self.counters else 0
+
+    def add_rate_limit_wait(self, seconds):
+        """Acumula tiempo esperado en el rate limiter"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.rate_limiter_wait_seconds += seconds
+
+    def set_extra(self, key, value):
+        """Adjunta información adicional de la ejecución"""
+        with self._lock:
+            self.extra[key] = value
+
+    def to_dict(self):
+        with self._lock:
+            total_seconds = time.perf_counter() - self._start_perf
+            return {
+                'timestamp': self.started_at.isoformat(),
+                'total_seconds': round(total_seconds, 2),
+                'stages': {
+                    name: {
+                        'seconds': round(stage['seconds'], 3),
+                        'calls': stage['calls'],
+                        'max_seconds': round(stage['max_seconds'], 3)
+                    }
+                    for name, stage in self.stages.items()
+                },
+                'requests': {
+                    endpoint: {
+                        'latency': self.latency[endpoint].to_dict(),
+                        'events': dict(self.counters[endpoint])
+                    }
+                    for endpoint in sorted(set(self.latency) | set(self.counters))
+                },
+                'rate_limiter_wait_seconds': round(self.rate_limiter_wait_seconds, 2),
+                'extra': dict(self.extra)
+            }
+
+    def history_entry(self, snapshot):
+        """Resumen compacto de una ejecución para el histórico del dashboard"""
+        requests_total = 0
+        errors = Counter()
+        for endpoint_data in snapshot['requests'].values():
+            events = endpoint_data['events']
+            requests_total += events.get('requests', 0)
+            for event in ('http_429', 'empty', 'network', 'exception', 'http_error', 'retries'):
+                errors[event] += events.get(event, 0)
+
+        return {
+            'timestamp': snapshot['timestamp'],
+            'total_seconds': snapshot['total_seconds'],
+            'stages': {name: stage['seconds'] for name, stage in snapshot['stages'].items()},
+            'requests': requests_total,
+            'errors': dict(errors),
+            'rate_limiter_wait_seconds': snapshot['rate_limiter_wait_seconds']
+        }
+
+    def save(self, path=RUN_METRICS_FILE, history_limit=HISTORY_LIMIT):
+        """Guarda la ejecución actual y la añade al histórico"""
+        snapshot = self.to_dict()
+
+        history = []
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    history = json.load(f).get('history', [])
+            except Exception:
+                history = []
+
+        history.append(self.history_entry(snapshot))
+        data = {
+            'latest': snapshot,
+            'history': history[-history_limit:]
+        }
+
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+
+        return data
+
+
+def load_run_metrics(path=RUN_METRICS_FILE):
+    """Carga run_metrics.json si existe (None en caso contrario)"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return None
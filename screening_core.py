@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Screening Core - Lógica de scoring pura (sin red ni estado)
+===========================================================
+
+🧮 compute_indicators: todo lo que NO depende de parámetros (se calcula una vez)
+🧩 derive_indicators: stops, bonus y R/R a partir de las medias (compartido con indicator_state.py)
+🎛️ passes_param_filters / score_components: lo que SÍ depende de parámetros
+📊 relative_strength_percentiles: ranking transversal del universo en una sola pasada
+🔁 Compartido por conservative_screener.py y parameter_sweep.py
+📐 score_components acepta escalares o arrays numpy (barrido vectorizado)
+"""
+
+import numpy as np
+import pandas as pd
+
+MIN_HISTORY_BARS = 100
+
+# Valores por defecto = constantes de MomentumResponsiveScreener.__init__
+DEFAULT_SCORING_PARAMS = {
+    'max_allowed_risk': 10.0,
+    'momentum_20d_weight': 0.7,
+    'momentum_60d_weight': 0.3,
+    'min_outperf_20d': 5.0,
+    'min_outperf_60d': 0.0,
+    'ma50_stop_bonus': 22,
+    'rr_bonus_weight': 0.8,
+}
+
+DEFAULT_BENCHMARK = {
+    'return_20d': 2.0,
+    'return_60d': 5.0,
+    'return_90d': 8.0
+}
+
+
+def _period_return(close, current, days):
+    past = close.iloc[-(days + 1)] if len(close) >= days + 1 else current
+    return ((current - past) / past) * 100
+
+
+def compute_period_returns(hist):
+    """Rendimientos 20d/60d/90d de la última barra (None si no hay histórico suficiente)"""
+    if hist is None or len(hist) < MIN_HISTORY_BARS:
+        return None
+
+    close = hist['Close']
+    current = close.iloc[-1]
+    return {
+        'return_20d': float(_period_return(close, current, 20)),
+        'return_60d': float(_period_return(close, current, 60)),
+        'return_90d': float(_period_return(close, current, 90))
+    }
+
+
+def compute_benchmark_returns(hist):
+    """Rendimientos 20d/60d/90d del benchmark (None si no hay histórico suficiente)"""
+    return compute_period_returns(hist)
+
+
+def compute_weekly_atr(hist):
+    """Calcula Weekly ATR (Average True Range)"""
+    try:
+        if len(hist) < 14:
+            return 0
+
+        # Datos semanales (viernes)
+        weekly_data = hist.resample('W-FRI').agg({
+            'Open': 'first',
+            'High': 'max',
+            'Low': 'min',
+            'Close': 'last',
+            'Volume': 'sum'
+        }).dropna()
+
+        if len(weekly_data) < 7:
+            return 0
+
+        # True Range semanal
+        prev_close = weekly_data['Close'].shift(1)
+        true_range = pd.concat([
+            weekly_data['High'] - weekly_data['Low'],
+            abs(weekly_data['High'] - prev_close),
+            abs(weekly_data['Low'] - prev_close)
+        ], axis=1).max(axis=1)
+
+        return true_range.tail(7).mean()
+
+    except Exception:
+        return 0
+
+
+def compute_fundamental_score(ticker_info):
+    """Score fundamental a partir de ticker.info (earnings, revenue, ROE)"""
+    fundamental_data = {
+        'fundamental_score': 0,
+        'earnings_growth': None,
+        'revenue_growth': None,
+        'roe': None
+    }
+
+    if not ticker_info:
+        return fundamental_data
+
+    # Earnings growth
+    earnings_growth = ticker_info.get('earningsQuarterlyGrowth')
+    if earnings_growth is not None and earnings_growth > 0:
+        fundamental_data['earnings_growth'] = earnings_growth
+        if earnings_growth > 0.50:
+            fundamental_data['fundamental_score'] += 25
+        elif earnings_growth > 0.25:
+            fundamental_data['fundamental_score'] += 20
+        elif earnings_growth > 0.15:
+            fundamental_data['fundamental_score'] += 15
+        else:
+            fundamental_data['fundamental_score'] += 10
+
+    # Revenue growth
+    revenue_growth = ticker_info.get('revenueQuarterlyGrowth')
+    if revenue_growth is not None:
+        fundamental_data['revenue_growth'] = revenue_growth
+        if revenue_growth > 0.25:
+            fundamental_data['fundamental_score'] += 20
+        elif revenue_growth > 0.10:
+            fundamental_data['fundamental_score'] += 15
+        elif revenue_growth > 0:
+            fundamental_data['fundamental_score'] += 10
+
+    # ROE
+    roe = ticker_info.get('returnOnEquity')
+    if roe is not None:
+        fundamental_data['roe'] = roe
+        if roe > 0.20:
+            fundamental_data['fundamental_score'] += 15
+        elif roe > 0.15:
+            fundamental_data['fundamental_score'] += 10
+        elif roe > 0.10:
+            fundamental_data['fundamental_score'] += 5
+
+    return fundamental_data
+
+
+def passes_fixed_filters(current_price, volume_avg_30d, ma21, ma50):
+    """Filtros fijos: precio 5-1000$, volumen medio 30d >= 1M, tendencia precio > MA21 > MA50"""
+    # Filtros básicos
+    if current_price < 5.0 or current_price > 1000.0:
+        return False
+    if volume_avg_30d < 1_000_000:
+        return False
+    # TENDENCIA
+    return bool(current_price > ma21 > ma50)
+
+
+def compute_indicators(hist):
+    """
+    Indicadores independientes de parámetros para la última barra de `hist`
+    Devuelve None si no hay histórico suficiente o no pasa los filtros fijos
+    (precio 5-1000$, volumen medio 30d >= 1M, tendencia precio > MA21 > MA50)
+    """
+    if len(hist) < MIN_HISTORY_BARS:
+        return None
+
+    close = hist['Close']
+    current_price = close.iloc[-1]
+    volume_avg_30d = hist['Volume'].tail(30).mean()
+    ma21 = close.rolling(window=21).mean().iloc[-1]
+    ma50 = close.rolling(window=50).mean().iloc[-1]
+
+    if not passes_fixed_filters(current_price, volume_avg_30d, ma21, ma50):
+        return None
+
+    # ATR para stop loss y take profit
+    prev_close = close.shift(1)
+    true_range = pd.concat([
+        hist['High'] - hist['Low'],
+        abs(hist['High'] - prev_close),
+        abs(hist['Low'] - prev_close)
+    ], axis=1).max(axis=1)
+    atr = true_range.tail(14).mean()
+
+    return derive_indicators(
+        current_price=current_price,
+        volume_avg_30d=volume_avg_30d,
+        volume_recent=hist['Volume'].tail(5).mean(),
+        ma21=ma21,
+        ma50=ma50,
+        atr=atr,
+        weekly_atr=compute_weekly_atr(hist),
+        volatility_20d=close.pct_change().tail(20).std() * (252 ** 0.5) * 100,
+        returns={days: _period_return(close, current_price, days) for days in (20, 60, 90)}
+    )
+
+
+def derive_indicators(current_price, volume_avg_30d, volume_recent, ma21, ma50, atr, weekly_atr,
+                      volatility_20d, returns):
+    """
+    Stops, bonus y R/R a partir de las medias de ventana de la última barra
+    - returns: {20: %, 60: %, 90: %}
+    """
+    # STOP LOSS inteligente
+    support_level = min(ma21, ma50, current_price * 0.92)
+    atr_stop = current_price - (atr * 2)
+    stop_price = max(support_level, atr_stop)
+    risk_pct = ((current_price - stop_price) / current_price) * 100
+
+    # 🌟 MA50 es el stop si es el soporte más bajo y el soporte gana al ATR stop
+    is_ma50_stop_loss = bool(support_level == ma50 and stop_price == support_level)
+
+    # VOLUME SURGE
+    volume_surge = (volume_recent / volume_avg_30d - 1) * 100
+
+    volume_score = 0
+    if volume_surge > 50:
+        volume_score = 15
+    elif volume_surge > 25:
+        volume_score = 10
+    elif volume_surge > 10:
+        volume_score = 5
+
+    # VOLATILITY ANALYSIS
+    volatility_bonus = 0
+    volatility_rank = "MEDIUM"
+    if volatility_20d < 20:
+        volatility_bonus = 8
+        volatility_rank = "LOW"
+    elif volatility_20d < 30:
+        volatility_bonus = 5
+        volatility_rank = "MEDIUM"
+    elif volatility_20d > 50:
+        volatility_bonus = -5
+        volatility_rank = "HIGH"
+
+    # RISK BONUS
+    risk_bonus = 0
+    if risk_pct < 5:
+        risk_bonus = 10
+    elif risk_pct < 7:
+        risk_bonus = 5
+
+    # TAKE PROFIT
+    take_profit_multiplier = 3.0 if weekly_atr > 0 else 3.5
+    atr_for_tp = weekly_atr if weekly_atr > 0 else atr
+    take_profit_price = current_price + (atr_for_tp * take_profit_multiplier)
+    upside_pct = ((take_profit_price - current_price) / current_price) * 100
+
+    # RISK/REWARD RATIO
+    risk_reward_ratio = upside_pct / max(risk_pct, 0.1)
+
+    # RR BONUS
+    rr_bonus = 0
+    if risk_reward_ratio > 4.0:
+        rr_bonus = 25
+    elif risk_reward_ratio > 3.0:
+        rr_bonus = 20
+    elif risk_reward_ratio > 2.5:
+        rr_bonus = 15
+    elif risk_reward_ratio > 2.0:
+        rr_bonus = 10
+
+    return {
+        'current_price': current_price,
+        'volume_avg_30d': volume_avg_30d,
+        'return_20d': returns[20],
+        'return_60d': returns[60],
+        'return_90d': returns[90],
+        'ma21': ma21,
+        'ma50': ma50,
+        'atr': atr,
+        'weekly_atr': weekly_atr,
+        'support_level': support_level,
+        'atr_stop': atr_stop,
+        'stop_price': stop_price,
+        'risk_pct': risk_pct,
+        'is_ma50_stop_loss': is_ma50_stop_loss,
+        'volume_surge': volume_surge,
+        'volume_score': volume_score,
+        'volatility_20d': volatility_20d,
+        'volatility_bonus': volatility_bonus,
+        'volatility_rank': volatility_rank,
+        'risk_bonus': risk_bonus,
+        'take_profit_price': take_profit_price,
+        'upside_pct': upside_pct,
+        'risk_reward_ratio': risk_reward_ratio,
+        'rr_bonus': rr_bonus
+    }
+
+
+def passes_param_filters(outperformance_20d, outperformance_60d, risk_pct, params):
+    """Filtros que dependen de parámetros (outperformance mínima y riesgo máximo)"""
+    return ((outperformance_20d >= params['min_outperf_20d']) &
+            (outperformance_60d >= params['min_outperf_60d']) &
+            (risk_pct <= params['max_allowed_risk']))
+
+
+def relative_strength_percentiles(return_20d, return_60d, params):
+    """
+    Percentil de fuerza relativa (0-100] de cada símbolo frente a todo el universo
+    - Momentum ponderado con momentum_20d_weight / momentum_60d_weight
+    - Un único sort + searchsorted sobre arrays; NaN = sin histórico (fuera del ranking)
+    """
+    weighted = (np.asarray(return_20d, dtype=float) * params['momentum_20d_weight'] +
+                np.asarray(return_60d, dtype=float) * params['momentum_60d_weight'])
+    valid = ~np.isnan(weighted)
+    ranked = np.sort(weighted[valid])
+
+    percentiles = np.full(weighted.shape, np.nan)
+    if ranked.size:
+        percentiles[valid] = np.searchsorted(ranked, weighted[valid], side='right') / ranked.size * 100
+    return percentiles
+
+
+def score_components(outperformance_20d, outperformance_60d, is_ma50_stop_loss,
+                     fundamental_score, fixed_bonus, rr_bonus, params):
+    """
+    Score técnico y final con los pesos de `params`
+    - fixed_bonus: volatility_bonus + volume_score + risk_bonus (no dependen de parámetros)
+    Devuelve (technical_score, final_score, ma50_bonus)
+    """
+    momentum_score = (
+        outperformance_20d * params['momentum_20d_weight'] +
+        outperformance_60d * params['momentum_60d_weight']
+    )
+    ma50_bonus = np.where(is_ma50_stop_loss, params['ma50_stop_bonus'], 0)
+
+    # SCORE TÉCNICO FINAL
+    technical_score = np.maximum(0,
+        momentum_score * 1.2 +
+        ma50_bonus +
+        fundamental_score * 0.8 +
+        fixed_bonus
+    )
+
+    # SCORE FINAL
+    final_score = technical_score + rr_bonus * params['rr_bonus_weight']
+    return technical_score, final_score, ma50_bonus
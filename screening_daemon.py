@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Screening Daemon - Screener residente con cachés calientes entre ejecuciones
+============================================================================
+
+🔥 Un solo proceso: pandas/yfinance importados una vez, sesiones HTTP y pool Yahoo abiertos
+🧠 En memoria entre ejecuciones: históricos (por sesión NYSE), ticker.info y universo (con TTL)
+⏰ Re-screening cada DAEMON_INTERVAL_MINUTES o bajo demanda (POST /run)
+🌐 HTTP local: /status, /results/<fichero> y el dashboard (/ y /data.json) con lo último calculado
+📡 fetch_latest(): el generador de reportes lee del daemon si SCREENER_DAEMON_URL está definido
+🪶 Solo stdlib al importar: el screener se carga al arrancar el daemon
+
+Uso:
+    python screening_daemon.py                        # 127.0.0.1:8765, cada 60 min
+    python screening_daemon.py --interval 30 --port 9000
+    curl -X POST http://127.0.0.1:8765/run            # Re-screening inmediato
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bot_logging import PROGRESS, get_logger, setup_logging, shutdown_logging
+
+logger = get_logger('daemon')
+
+DAEMON_HOST = os.environ.get('DAEMON_HOST', '127.0.0.1')
+DAEMON_PORT = int(os.environ.get('DAEMON_PORT', '8765'))
+DAEMON_INTERVAL_MINUTES = float(os.environ.get('DAEMON_INTERVAL_MINUTES', '60'))
+DAEMON_URL_ENV = 'SCREENER_DAEMON_URL'
+
+HISTORY_TTL_HOURS = 24      # La clave incluye la sesión NYSE: una sesión nueva ya invalida
+INFO_TTL_HOURS = 12
+UNIVERSE_TTL_HOURS = 24
+MAX_RESIDENT_HISTORIES = 12000
+
+DASHBOARD_PAGE = os.path.join('docs', 'index.html')
+DASHBOARD_DATA = os.path.join('docs', 'data.json')
+# Ficheros que sirve /results/<nombre> (los que escriben el screener y las etapas ligeras)
+SERVED_FILES = {
+    'weekly_screening_results.json': 'weekly_screening_results.json',
+    'screening_delta.json': 'screening_delta.json',
+    'run_metrics.json': 'run_metrics.json',
+    'data.json': DASHBOARD_DATA,
+}
+
+
+class TTLCache:
+    """Diccionario thread-safe con caducidad por entrada y tamaño máximo (sale la más antigua)"""
+
+    def __init__(self, ttl_seconds, max_items=None, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.clock = clock
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or self.clock() - item[0] > self.ttl_seconds:
+                if item is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = (self.clock(), value)
+            while self.max_items and len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        return {'items': len(self), 'hits': self.hits, 'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None}
+
+
+class ResidentCaches:
+    """Lo que sobrevive entre ejecuciones del daemon (RobustDataFetcher.resident)"""
+
+    def __init__(self):
+        self.history = TTLCache(HISTORY_TTL_HOURS * 3600, MAX_RESIDENT_HISTORIES)
+        self.info = TTLCache(INFO_TTL_HOURS * 3600)
+        self.universe = TTLCache(UNIVERSE_TTL_HOURS * 3600)
+
+    def summary(self):
+        return {'history': self.history.summary(), 'info': self.info.summary(),
+                'universe': self.universe.summary()}
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+class ScreeningDaemon:
+    """Screener residente: una ejecución cada intervalo o al pedirla, nunca dos a la vez"""
+
+    def __init__(self, interval_minutes=DAEMON_INTERVAL_MINUTES):
+        self.interval_seconds = max(1.0, interval_minutes * 60)
+        self.caches = ResidentCaches()
+        self.screener = None
+        self._run_lock = threading.Lock()
+        self._trigger = threading.Event()
+        self._stop = threading.Event()
+        self.latest = {}        # nombre servido -> JSON de la última ejecución
+        self.status = {'state': 'starting', 'runs': 0, 'started_at': datetime.now().isoformat(),
+                       'last_run': None, 'next_run': None}
+
+    def _ensure_screener(self):
+        """Primera ejecución: imports pesados y screener; después solo begin_run()"""
+        if self.screener is None:
+            from conservative_screener import MomentumResponsiveScreener
+            self.screener = MomentumResponsiveScreener()
+            self.screener.data_fetcher.resident = self.caches
+        else:
+            self.screener.begin_run()
+        return self.screener
+
+    def _refresh_outputs(self):
+        """Delta y data.json del dashboard (etapas ligeras, en proceso) y copia en memoria"""
+        try:
+            from result_delta import build_delta
+            build_delta()
+        except Exception as e:
+            logger.warning("⚠️ Delta no disponible: %s", e)
+        try:
+            from create_weekly_report import AggressiveMomentumReportGenerator
+            generator = AggressiveMomentumReportGenerator()
+            if generator.load_all_data():
+                generator.create_aggressive_dashboard_data()
+        except Exception as e:
+            logger.warning("⚠️ data.json no actualizado: %s", e)
+        self.latest = {name: data for name, data in
+                       ((name, _read_json(path)) for name, path in SERVED_FILES.items()) if data is not None}
+
+    def run_once(self, reason='schedule'):
+        """Un screening completo con las cachés residentes (False si ya hay uno en curso)"""
+        if not self._run_lock.acquire(blocking=False):
+            return False
+        started = time.perf_counter()
+        try:
+            self.status['state'] = 'running'
+            self.status['current_run'] = {'reason': reason, 'started_at': datetime.now().isoformat()}
+            results = self._ensure_screener().screen_all_stocks_momentum_responsive()
+            self._refresh_outputs()
+            self.status['last_run'] = {
+                'reason': reason,
+                'finished_at': datetime.now().isoformat(),
+                'seconds': round(time.perf_counter() - started, 1),
+                'results': len(results or []),
+                'market_session': self.screener.market_session.isoformat()
+            }
+            logger.log(PROGRESS, "🔥 Screening (%s) en %.1fs: %d resultados | cachés: %s", reason,
+                       self.status['last_run']['seconds'], self.status['last_run']['results'],
+                       self.caches.summary())
+        except Exception as e:
+            logger.exception("❌ Screening (%s) fallido: %s", reason, e)
+            self.status['last_run'] = {'reason': reason, 'finished_at': datetime.now().isoformat(),
+                                       'error': str(e)}
+        finally:
+            self.status['runs'] += 1
+            self.status['state'] = 'idle'
+            self.status.pop('current_run', None)
+            self._run_lock.release()
+        return True
+
+    def trigger(self):
+        self._trigger.set()
+
+    def stop(self):
+        self._stop.set()
+        self._trigger.set()
+
+    def snapshot_status(self):
+        return dict(self.status, interval_minutes=round(self.interval_seconds / 60, 2),
+                    caches=self.caches.summary())
+
+    def loop(self):
+        """Ejecuta al arrancar y luego cada intervalo; POST /run adelanta la siguiente"""
+        reason = 'startup'
+        while not self._stop.is_set():
+            self.run_once(reason)
+            self.status['next_run'] = (datetime.now() + timedelta(seconds=self.interval_seconds)).isoformat()
+            triggered = self._trigger.wait(self.interval_seconds)
+            self._trigger.clear()
+            reason = 'trigger' if triggered else 'schedule'
+
+
+def make_handler(daemon):
+    class DaemonRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type='application/json'):
+            payload = body if isinstance(body, bytes) else json.dumps(body, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/status':
+                return self._send(200, daemon.snapshot_status())
+            if path in ('/', '/index.html'):
+                try:
+                    with open(DASHBOARD_PAGE, 'rb') as f:
+                        return self._send(200, f.read(), 'text/html; charset=utf-8')
+                except OSError:
+                    return self._send(404, {'error': 'dashboard no disponible'})
+            name = 'data.json' if path == '/data.json' else path[len('/results/'):] if path.startswith('/results/') else None
+            if name in daemon.latest:
+                return self._send(200, daemon.latest[name])
+            return self._send(404, {'error': f'no disponible: {path}', 'served': sorted(SERVED_FILES)})
+
+        def do_POST(self):
+            if self.path.split('?', 1)[0] != '/run':
+                return self._send(404, {'error': 'solo POST /run'})
+            busy = daemon.status['state'] == 'running'
+            daemon.trigger()
+            return self._send(202, {'accepted': True, 'queued_after_current': busy})
+
+        def log_message(self, format, *args):
+            pass  # Sin una línea por petición: el dashboard refresca a menudo
+
+    return DaemonRequestHandler
+
+
+def fetch_latest(name, url=None, timeout=2.0):
+    """JSON `name` servido por el daemon (None sin SCREENER_DAEMON_URL o si no responde)"""
+    url = url or os.environ.get(DAEMON_URL_ENV)
+    if not url:
+        return None
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/results/{name}", timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Screener residente con cachés calientes y HTTP local')
+    parser.add_argument('--host', default=DAEMON_HOST, help='Interfaz HTTP (por defecto solo local)')
+    parser.add_argument('--port', type=int, default=DAEMON_PORT)
+    parser.add_argument('--interval', type=float, default=DAEMON_INTERVAL_MINUTES,
+                        help='Minutos entre screenings')
+    parser.add_argument('--once', action='store_true', help='Un screening y salir (sin servidor HTTP)')
+    args = parser.parse_args(argv)
+
+    os.environ.pop(DAEMON_URL_ENV, None)  # El reporte interno lee los archivos, no se consulta a sí mismo
+    setup_logging()
+    daemon = ScreeningDaemon(args.interval)
+    if args.once:
+        try:
+            daemon.run_once('once')
+            return 'error' not in (daemon.status['last_run'] or {})
+        finally:
+            shutdown_logging()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(daemon))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.log(PROGRESS, "🔥 Daemon de screening en http://%s:%d (cada %g min, POST /run)",
+               args.host, args.port, args.interval)
+    try:
+        daemon.loop()
+    except KeyboardInterrupt:
+        logger.log(PROGRESS, "🛑 Daemon detenido")
+    finally:
+        daemon.stop()
+        server.shutdown()
+        shutdown_logging()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Screening Scheduler - Orden por prioridad y presupuesto de tiempo del screening
+===============================================================================
+
+🎯 Prioridad: posiciones en cartera -> candidatos de consistencia de ayer -> resto del universo
+📈 El resto se ordena por probabilidad de pasar los filtros (media móvil de ejecuciones previas)
+⏳ Presupuesto (SCREENING_BUDGET_MINUTES): la fase técnica para antes de la reserva final y los
+   fundamentales al agotarse el presupuesto; lo no evaluado queda registrado en `coverage`
+💾 Historial de aprobados en price_cache/screening_priority.json (viaja con la caché del workflow)
+"""
+
+import json
+import os
+import threading
+import time
+
+from price_cache import PRICE_CACHE_DIR
+from symbol_utils import normalize_symbol
+
+PRIORITY_FILE = os.path.join(PRICE_CACHE_DIR, 'screening_priority.json')
+PORTFOLIO_FILE = 'current_portfolio.json'
+CONSISTENCY_FILE = 'consistency_analysis.json'
+CONSISTENCY_CATEGORIES = ('consistent_winners', 'strong_candidates', 'emerging_opportunities', 'newly_emerged')
+
+# Workflow con timeout de 120 min: margen para setup, consistencia, rotación y reporte
+DEFAULT_BUDGET_MINUTES = 100.0
+FINALIZE_RESERVE = 0.2      # Fracción del presupuesto reservada a ranking + fundamentales + guardado
+PASS_RATE_ALPHA = 0.3       # Peso de la última ejecución en la probabilidad de aprobado
+UNSEEN_PASS_RATE = 0.25     # Símbolos sin historial: por delante de los que nunca pasan
+
+TIER_HOLDINGS = 'holdings'
+TIER_CONSISTENCY = 'consistency'
+TIER_REST = 'rest'
+TIERS = (TIER_HOLDINGS, TIER_CONSISTENCY, TIER_REST)
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def load_holdings(path=PORTFOLIO_FILE):
+    """Símbolos con posición abierta en la cartera"""
+    positions = _load_json(path).get('positions') or {}
+    return {normalize_symbol(symbol) for symbol in positions}
+
+
+def load_consistency_symbols(path=CONSISTENCY_FILE):
+    """Candidatos de la última ejecución del análisis de consistencia"""
+    analysis = _load_json(path).get('consistency_analysis', {})
+    return {normalize_symbol(item['symbol'])
+            for category in CONSISTENCY_CATEGORIES
+            for item in analysis.get(category, []) if item.get('symbol')}
+
+
+def budget_seconds_from_env():
+    """Presupuesto en segundos (SCREENING_BUDGET_MINUTES; <= 0 desactiva el límite)"""
+    try:
+        minutes = float(os.environ.get('SCREENING_BUDGET_MINUTES', DEFAULT_BUDGET_MINUTES))
+    except ValueError:
+        minutes = DEFAULT_BUDGET_MINUTES
+    return minutes * 60 if minutes > 0 else None
+
+
+class PassHistory:
+    """Probabilidad de pasar los filtros técnicos por símbolo (media móvil exponencial)"""
+
+    def __init__(self, path=PRIORITY_FILE):
+        self.path = path
+        self.rates = _load_json(path).get('pass_rates', {}) if path else {}
+
+    def pass_rate(self, symbol):
+        return self.rates.get(symbol, UNSEEN_PASS_RATE)
+
+    def update(self, outcomes):
+        """outcomes: {símbolo: True/False} de los símbolos evaluados en esta ejecución"""
+        for symbol, passed in outcomes.items():
+            previous = self.rates.get(symbol)
+            value = 1.0 if passed else 0.0
+            rate = value if previous is None else previous + PASS_RATE_ALPHA * (value - previous)
+            self.rates[symbol] = round(rate, 4)
+
+    def save(self):
+        if not self.path:
+            return False  # Dataset local: no se escribe en price_cache/
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'pass_rates': dict(sorted(self.rates.items()))}, f)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError:
+            return False
+
+
+class ScreeningScheduler:
+    """Ordena el universo por prioridad y vigila el presupuesto de tiempo (thread-safe)"""
+
+    def __init__(self, budget_seconds=None, holdings=None, consistency=None, history=None, clock=time.monotonic):
+        self.budget_seconds = budget_seconds
+        self.holdings = set(holdings or ())
+        self.consistency = set(consistency or ()) - self.holdings
+        self.history = history if history is not None else PassHistory()
+        self.clock = clock
+        self.started = clock()
+        self._lock = threading.Lock()
+        self.total_symbols = 0
+        self.skipped_scan = []
+        self.skipped_fundamentals = []
+        self.stopped_phase = None
+
+    @classmethod
+    def from_files(cls, budget_seconds=None, history_path=PRIORITY_FILE):
+        return cls(budget_seconds, load_holdings(), load_consistency_symbols(), PassHistory(history_path))
+
+    def priority_symbols(self):
+        """Cartera + consistencia (normalizados): se evalúan aunque estén en cuarentena"""
+        return self.holdings | self.consistency
+
+    def tier_of(self, symbol):
+        if symbol in self.holdings:
+            return TIER_HOLDINGS
+        if symbol in self.consistency:
+            return TIER_CONSISTENCY
+        return TIER_REST
+
+    def order(self, symbols):
+        """Cartera, consistencia y resto por probabilidad de aprobado (orden estable en empates)"""
+        self.total_symbols = len(symbols)
+
+        def key(indexed):
+            index, symbol = indexed
+            normalized = normalize_symbol(symbol)
+            return TIERS.index(self.tier_of(normalized)), -self.history.pass_rate(normalized), index
+
+        return [symbol for _, symbol in sorted(enumerate(symbols), key=key)]
+
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def scan_expired(self):
+        """Fin de la fase técnica: presupuesto menos la reserva para terminar la ejecución"""
+        return self.budget_seconds is not None and self.elapsed() >= self.budget_seconds * (1 - FINALIZE_RESERVE)
+
+    def expired(self):
+        return self.budget_seconds is not None and self.elapsed() >= self.budget_seconds
+
+    def skip(self, symbol, phase):
+        with self._lock:
+            (self.skipped_scan if phase == 'scan' else self.skipped_fundamentals).append(symbol)
+            if self.stopped_phase is None:
+                self.stopped_phase = phase
+
+    def record_outcomes(self, technicals):
+        """Actualiza el historial con los símbolos evaluados (pasa = indicadores no nulos)"""
+        self.history.update({t['symbol']: t['indicators'] is not None for t in technicals})
+        self.history.save()
+
+    def coverage(self):
+        """Qué se evaluó y qué quedó fuera por el presupuesto (para el JSON de resultados)"""
+        skipped_by_tier = {tier: [] for tier in TIERS}
+        for symbol in self.skipped_scan:
+            skipped_by_tier[self.tier_of(normalize_symbol(symbol))].append(symbol)
+        return {
+            'complete': not self.skipped_scan and not self.skipped_fundamentals,
+            'stopped_phase': self.stopped_phase,
+            'budget_minutes': round(self.budget_seconds / 60, 2) if self.budget_seconds else None,
+            'elapsed_minutes': round(self.elapsed() / 60, 2),
+            'symbols_total': self.total_symbols,
+            'symbols_evaluated': self.total_symbols - len(self.skipped_scan),
+            'skipped_count': len(self.skipped_scan),
+            'skipped_by_tier': {tier: len(symbols) for tier, symbols in skipped_by_tier.items()},
+            # Las prioridades se listan completas; del resto solo el conteo (pueden ser miles)
+            'skipped_holdings': sorted(skipped_by_tier[TIER_HOLDINGS]),
+            'skipped_consistency': sorted(skipped_by_tier[TIER_CONSISTENCY]),
+            'skipped_fundamentals': sorted(self.skipped_fundamentals)
+        }
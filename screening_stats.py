@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Screening Stats - Agregados de detailed_results en una sola pasada
+==================================================================
+
+🧮 compute_screening_stats: conteos MA50/Weekly ATR/earnings, medias de score/RR/upside,
+   outperformers y categorías de momentum recorriendo detailed_results una única vez
+📋 detailed_results es el top 15 guardado por el screener: los agregados son del top, no de todos
+   los candidatos (el total de detecciones MA50 del universo está en ma50_bonus_count del fichero)
+💾 Cache por hash (sha256) del fichero de screening: el reporte, docs/data.json y el
+   mensaje de commit (procesos distintos en el workflow) comparten el mismo cálculo
+🪶 Solo stdlib: se importa desde comandos ligeros (report, commit-msg)
+"""
+
+import hashlib
+import json
+import os
+
+SCREENING_FILE = 'weekly_screening_results.json'
+SCREENING_STATS_CACHE = 'screening_stats_cache.json'
+STATS_VERSION = 2  # 2: MA50 desde is_ma50_stop_loss / ma50_bonus de cada resultado
+
+HIGH_QUALITY_RR = 2.5
+OUTPERFORMER_20D = 5.0
+
+_memory_cache = {}
+
+
+def momentum_category(score, momentum_20d):
+    """Categoría de momentum del dashboard (EXCEPTIONAL / STRONG / MODERATE)"""
+    if score > 200 or momentum_20d > 25:
+        return 'EXCEPTIONAL'
+    if score > 150 or momentum_20d > 15:
+        return 'STRONG'
+    return 'MODERATE'
+
+
+def ma50_bonus_of(result):
+    """(MA50 es el stop, bonus) de un resultado; `optimizations` solo en resultados antiguos"""
+    optimizations = result.get('optimizations', {})
+    applied = result.get('is_ma50_stop_loss', optimizations.get('ma50_bonus_applied', False))
+    return bool(applied), result.get('ma50_bonus', optimizations.get('ma50_bonus_value', 0)) or 0
+
+
+def compute_screening_stats(screening):
+    """Todos los agregados de detailed_results en un único recorrido"""
+    results = (screening or {}).get('detailed_results', [])
+    total = len(results)
+
+    ma50_stocks = []
+    ma50_bonus_total = 0
+    weekly_atr_count = weekly_atr_sum = 0
+    daily_atr_count = daily_atr_sum = 0
+    positive_earnings = restrictive_stops = high_quality = 0
+    outperformers_20d = outperformers_60d = 0
+    strong_band = 0
+    score_sum = momentum_20d_sum = rr_sum = upside_sum = technical_sum = 0
+    categories = {'EXCEPTIONAL': [], 'STRONG': [], 'MODERATE': []}
+
+    for result in results:
+        symbol = result.get('symbol')
+        score = result.get('score', 0)
+        momentum_20d = result.get('outperformance_20d', 0)
+        rr = result.get('risk_reward_ratio', 0)
+        weekly_atr = result.get('weekly_atr', 0)
+        daily_atr = result.get('atr', 0)
+        ma50_applied, bonus_value = ma50_bonus_of(result)
+
+        if ma50_applied:
+            ma50_bonus_total += bonus_value
+            ma50_stocks.append({
+                'symbol': symbol,
+                'bonus_value': bonus_value,
+                'final_score': score,
+                'risk_pct': result.get('risk_pct', 0),
+                'upside_pct': result.get('upside_pct', 0)
+            })
+
+        if weekly_atr > 0:
+            weekly_atr_count += 1
+            weekly_atr_sum += weekly_atr
+        if daily_atr > 0:
+            daily_atr_count += 1
+            daily_atr_sum += daily_atr
+
+        if result.get('fundamental_data', {}).get('quarterly_earnings_positive', False):
+            positive_earnings += 1
+        stop_method = result.get('stop_analysis', {}).get('stop_selection', '')
+        if 'ma50_priority' in stop_method or 'ma21_priority' in stop_method:
+            restrictive_stops += 1
+        if rr > HIGH_QUALITY_RR:
+            high_quality += 1
+        if momentum_20d > OUTPERFORMER_20D:
+            outperformers_20d += 1
+        if result.get('outperformance_60d', 0) > 0:
+            outperformers_60d += 1
+        if 150 <= score <= 200 or 15 <= momentum_20d <= 25:
+            strong_band += 1
+
+        categories[momentum_category(score, momentum_20d)].append(symbol)
+
+        score_sum += score
+        momentum_20d_sum += momentum_20d
+        rr_sum += rr
+        upside_sum += result.get('upside_pct', 0)
+        technical_sum += result.get('technical_score', 0)
+
+    def average(value_sum, count):
+        return value_sum / count if count else 0
+
+    return {
+        'version': STATS_VERSION,
+        'total': total,
+        'ma50_count': len(ma50_stocks),
+        'ma50_bonus_total': ma50_bonus_total,
+        'avg_ma50_bonus': average(ma50_bonus_total, len(ma50_stocks)),
+        'ma50_stocks': ma50_stocks,
+        'weekly_atr_count': weekly_atr_count,
+        'avg_weekly_atr': average(weekly_atr_sum, weekly_atr_count),
+        'daily_atr_count': daily_atr_count,
+        'daily_atr_sum': daily_atr_sum,
+        'avg_daily_atr': average(daily_atr_sum, daily_atr_count),
+        'positive_earnings_count': positive_earnings,
+        'positive_earnings_pct': (positive_earnings / total) * 100 if total else 0,
+        'restrictive_stop_count': restrictive_stops,
+        'high_quality_count': high_quality,
+        'outperformers_20d': outperformers_20d,
+        'outperformers_60d': outperformers_60d,
+        # Banda 150-200 / 15-25% del reporte (solapa con EXCEPTIONAL, a diferencia de las categorías)
+        'strong_band_count': strong_band,
+        'momentum_categories': categories,
+        'avg_score': average(score_sum, total),
+        'avg_outperformance_20d': average(momentum_20d_sum, total),
+        'avg_risk_reward': average(rr_sum, total),
+        'avg_upside': average(upside_sum, total),
+        'has_technical_score': bool(results) and 'technical_score' in results[0],
+        'avg_technical_score': average(technical_sum, total)
+    }
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def load_screening_stats(path=SCREENING_FILE, screening=None, cache_path=SCREENING_STATS_CACHE):
+    """
+    Agregados del fichero de screening, recalculados solo si cambia su hash
+    - screening: datos ya parseados (evita un segundo json.load en caso de fallo de cache)
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return compute_screening_stats(screening)
+
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest in _memory_cache:
+        return _memory_cache[digest]
+
+    cached = _load_cache(cache_path)
+    stats = cached.get('stats') if cached.get('sha256') == digest else None
+    if not stats or stats.get('version') != STATS_VERSION:
+        stats = compute_screening_stats(screening if screening is not None else json.loads(raw))
+        try:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'sha256': digest, 'source': path, 'stats': stats}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    _memory_cache[digest] = stats
+    return stats
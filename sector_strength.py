@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Sector Strength - Fuerza por sector sobre todo el universo evaluado
+===================================================================
+
+🗂️ sector_map.json: sector/industria por símbolo, refrescado cada SECTOR_REFRESH_DAYS días
+   desde las filas del screener de NASDAQ (ya descargadas para el universo: 0 requests extra)
+🏷️ Nombres de NASDAQ: los sectores de Yahoo (ticker.info) se traducen antes de guardarse
+🧮 Group-by vectorizado (np.unique + bincount + lexsort): mediana de outperformance 20d/60d,
+   breadth (% del sector sobre su MA50) y momentum de cada acción relativo a su sector
+🌟 Bonus de sector para el score final: sectores con breadth alta y mediana positiva
+"""
+
+import json
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from symbol_utils import normalize_symbol
+
+SECTOR_MAP_FILE = 'sector_map.json'
+SECTOR_REFRESH_DAYS = 30
+UNKNOWN_SECTOR = 'Unknown'
+MIN_SECTOR_SYMBOLS = 5  # Sectores más pequeños no puntúan (mediana poco fiable)
+
+# Sector de Yahoo -> sector de NASDAQ (mismas parejas que benchmarks.SECTOR_ETFS)
+YAHOO_SECTOR_ALIASES = {
+    'Healthcare': 'Health Care',
+    'Financial Services': 'Finance',
+    'Consumer Cyclical': 'Consumer Discretionary',
+    'Consumer Defensive': 'Consumer Staples',
+    'Communication Services': 'Telecommunications',
+}
+
+
+def canonical_sector(sector):
+    """Nombre de sector en el vocabulario de NASDAQ (un sector = un grupo en aggregate_sectors)"""
+    sector = (sector or '').strip()
+    return YAHOO_SECTOR_ALIASES.get(sector, sector)
+
+# Bonus de sector: (breadth mínima, bonus) si la mediana de outperformance 20d es positiva
+SECTOR_BONUS_LEVELS = ((60.0, 10), (50.0, 5))
+WEAK_SECTOR_BREADTH = 30.0
+WEAK_SECTOR_PENALTY = -5
+
+
+class SectorMap:
+    """Tabla persistente símbolo -> (sector, industria)"""
+
+    def __init__(self, path=SECTOR_MAP_FILE, today=None):
+        self.path = path
+        self.today = today or date.today()
+        self._lock = threading.Lock()
+        self.updated = None
+        self.symbols = {}
+        self.changed = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.symbols = data.get('symbols', {})
+            for entry in self.symbols.values():  # Tablas guardadas antes de normalizar los nombres
+                entry['sector'] = canonical_sector(entry.get('sector'))
+            self.updated = date.fromisoformat(data['updated']) if data.get('updated') else None
+        except Exception:
+            self.symbols = {}
+            self.updated = None
+
+    def save(self):
+        if not self.changed:
+            return False
+        with self._lock:
+            data = {
+                'updated': self.updated.isoformat() if self.updated else None,
+                'symbols': dict(sorted(self.symbols.items()))
+            }
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(data, f, indent=1)
+            self.changed = False
+            return True
+        except Exception:
+            return False
+
+    def needs_refresh(self):
+        return self.updated is None or self.today - self.updated >= timedelta(days=SECTOR_REFRESH_DAYS)
+
+    def refresh_from_rows(self, rows):
+        """Actualiza desde las filas del screener de NASDAQ (symbol, sector, industry)"""
+        refreshed = 0
+        with self._lock:
+            for row in rows:
+                symbol = normalize_symbol(row.get('symbol', ''))
+                sector = canonical_sector(row.get('sector'))
+                if not symbol or not sector:
+                    continue
+                self.symbols[symbol] = {'sector': sector, 'industry': (row.get('industry') or '').strip()}
+                refreshed += 1
+            if refreshed:
+                self.updated = self.today
+                self.changed = True
+        return refreshed
+
+    def learn(self, symbol, ticker_info):
+        """Completa símbolos sin sector con el ticker.info que ya se descargó"""
+        if not ticker_info or not ticker_info.get('sector'):
+            return
+        with self._lock:
+            if symbol in self.symbols:
+                return
+            self.symbols[symbol] = {'sector': canonical_sector(str(ticker_info['sector'])),
+                                    'industry': str(ticker_info.get('industry') or '')}
+            self.changed = True
+
+    def sector_of(self, symbol):
+        entry = self.symbols.get(symbol)
+        return entry['sector'] if entry else UNKNOWN_SECTOR
+
+    def industry_of(self, symbol):
+        entry = self.symbols.get(symbol)
+        return entry.get('industry', '') if entry else ''
+
+
+def _group_medians(codes, values, n_groups):
+    """Mediana de `values` por grupo (un lexsort para todos los grupos)"""
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    lower = starts + (counts - 1) // 2
+    upper = starts + counts // 2
+    medians = np.full(n_groups, np.nan)
+    present = counts > 0
+    medians[present] = (sorted_values[lower[present]] + sorted_values[upper[present]]) / 2
+    return medians
+
+
+def aggregate_sectors(sectors, outperformance_20d, outperformance_60d, above_ma50, params):
+    """
+    Estadísticas por sector y momentum relativo de cada símbolo a su sector
+    - params: momentum_20d_weight / momentum_60d_weight (mismos pesos que el score)
+    Devuelve (lista de sectores ordenada por mediana 20d, array de momentum relativo por símbolo)
+    """
+    sectors = np.asarray(sectors, dtype=object)
+    outperformance_20d = np.asarray(outperformance_20d, dtype=float)
+    outperformance_60d = np.asarray(outperformance_60d, dtype=float)
+    above_ma50 = np.asarray(above_ma50, dtype=float)
+    momentum = (outperformance_20d * params['momentum_20d_weight'] +
+                outperformance_60d * params['momentum_60d_weight'])
+
+    relative_momentum = np.full(len(sectors), np.nan)
+    known = (sectors != UNKNOWN_SECTOR) & ~np.isnan(momentum)
+    if not known.any():
+        return [], relative_momentum
+
+    names, codes = np.unique(sectors[known].astype(str), return_inverse=True)
+    n_groups = len(names)
+    counts = np.bincount(codes, minlength=n_groups)
+    median_20d = _group_medians(codes, outperformance_20d[known], n_groups)
+    median_60d = _group_medians(codes, outperformance_60d[known], n_groups)
+    median_momentum = _group_medians(codes, momentum[known], n_groups)
+    breadth = np.bincount(codes, weights=above_ma50[known], minlength=n_groups) / counts * 100
+
+    relative_momentum[known] = momentum[known] - median_momentum[codes]
+
+    stats = [
+        {
+            'sector': str(names[i]),
+            'symbols': int(counts[i]),
+            'median_outperformance_20d': round(float(median_20d[i]), 2),
+            'median_outperformance_60d': round(float(median_60d[i]), 2),
+            'median_momentum': round(float(median_momentum[i]), 2),
+            'breadth_ma50': round(float(breadth[i]), 1),
+            'bonus': sector_bonus(breadth[i], median_20d[i], counts[i])
+        }
+        for i in range(n_groups)
+    ]
+    stats.sort(key=lambda s: s['median_outperformance_20d'], reverse=True)
+    return stats, relative_momentum
+
+
+def sector_bonus(breadth_ma50, median_outperformance_20d, symbols):
+    """Puntos extra (o penalización) por la fuerza del sector"""
+    if symbols < MIN_SECTOR_SYMBOLS:
+        return 0
+    if median_outperformance_20d > 0:
+        for min_breadth, bonus in SECTOR_BONUS_LEVELS:
+            if breadth_ma50 >= min_breadth:
+                return bonus
+    if breadth_ma50 < WEAK_SECTOR_BREADTH:
+        return WEAK_SECTOR_PENALTY
+    return 0
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Symbol Quarantine - Cuarentena de símbolos muertos con backoff exponencial
+==========================================================================
+
+🪦 Registra por símbolo el tipo de fallo (sin datos, histórico corto, excepción) y su conteo
+⏳ Backoff por días: 1, 2, 4, 8... hasta QUARANTINE_MAX_DAYS; un éxito lo libera
+💸 Estima los requests ahorrados (intentos que costó su último fallo)
+💾 Persistido en symbol_quarantine.json entre ejecuciones
+⚠️ Los 429 y los fallos de red (timeouts, conexiones cortadas) NO ponen en cuarentena: no son del símbolo
+🛟 Si falla casi todo el universo (caída de Yahoo) los fallos de la ejecución se descartan
+💼 Cartera y consistencia (exempt) se evalúan siempre aunque estén en cuarentena
+"""
+
+import json
+import threading
+from datetime import date, timedelta
+
+from symbol_utils import normalize_symbol
+
+QUARANTINE_FILE = 'symbol_quarantine.json'
+QUARANTINE_BASE_DAYS = 1
+QUARANTINE_MAX_DAYS = 64
+
+# Caída sistémica: más de este ratio de fallos (con un mínimo de fallos) no es culpa de los símbolos
+OUTAGE_FAILURE_RATIO = 0.8
+OUTAGE_MIN_FAILURES = 50
+
+# Fallos atribuibles al símbolo (delistado, renombrado, sin cobertura); 'network' y 'http_429' no entran
+QUARANTINE_FAILURES = ('empty', 'short_history', 'exception')
+
+
+class SymbolQuarantine:
+    """Registro thread-safe de símbolos en cuarentena"""
+
+    def __init__(self, path=QUARANTINE_FILE, today=None):
+        self.path = path
+        self.today = today or date.today()
+        self._lock = threading.Lock()
+        self.entries = {}
+        self.requests_saved_total = 0
+        self.run_stats = {'skipped': 0, 'requests_saved': 0, 'new_quarantined': 0, 'released': 0,
+                          'failures': 0, 'successes': 0, 'exempted': 0, 'outage_discarded': False}
+        self._previous_entries = {}  # Estado previo de los símbolos que fallan en esta ejecución
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.entries = data.get('symbols', {})
+            self.requests_saved_total = int(data.get('requests_saved_total', 0))
+        except Exception:
+            self.entries = {}
+            self.requests_saved_total = 0
+
+    def _discard_outage_failures(self):
+        """Revierte los fallos de esta ejecución si parecen una caída del proveedor"""
+        failures = self.run_stats['failures']
+        attempted = failures + self.run_stats['successes']
+        if failures < OUTAGE_MIN_FAILURES or failures <= attempted * OUTAGE_FAILURE_RATIO:
+            return
+        for symbol, previous in self._previous_entries.items():
+            if previous is None:
+                self.entries.pop(symbol, None)
+            else:
+                self.entries[symbol] = previous
+        self._previous_entries = {}
+        self.run_stats['new_quarantined'] = 0
+        self.run_stats['outage_discarded'] = True
+
+    def save(self):
+        with self._lock:
+            self._discard_outage_failures()
+            data = {
+                'updated': self.today.isoformat(),
+                'requests_saved_total': self.requests_saved_total,
+                'last_run': dict(self.run_stats),
+                'symbols': dict(sorted(self.entries.items()))
+            }
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(data, f, indent=2)
+        except Exception:
+            pass
+        return data
+
+    @staticmethod
+    def backoff_days(failures):
+        return min(QUARANTINE_BASE_DAYS * 2 ** (max(failures, 1) - 1), QUARANTINE_MAX_DAYS)
+
+    def is_quarantined(self, symbol):
+        entry = self.entries.get(symbol)
+        return bool(entry) and date.fromisoformat(entry['quarantined_until']) > self.today
+
+    def partition(self, symbols, exempt=()):
+        """Separa el universo en (a procesar, en cuarentena) y contabiliza el ahorro (exempt: normalizados)"""
+        active, quarantined = [], []
+        saved = exempted = 0
+        with self._lock:
+            for symbol in symbols:
+                key = normalize_symbol(symbol)
+                entry = self.entries.get(key)
+                if entry and date.fromisoformat(entry['quarantined_until']) > self.today:
+                    if key in exempt:
+                        active.append(symbol)
+                        exempted += 1
+                        continue
+                    quarantined.append(symbol)
+                    saved += entry.get('attempts', 1)
+                else:
+                    active.append(symbol)
+
+            self.run_stats['skipped'] += len(quarantined)
+            self.run_stats['exempted'] += exempted
+            self.run_stats['requests_saved'] += saved
+            self.requests_saved_total += saved
+        return active, quarantined
+
+    def record_failure(self, symbol, failure_type, attempts):
+        """Fallo definitivo tras reintentos: (re)entra en cuarentena con backoff"""
+        if failure_type not in QUARANTINE_FAILURES:
+            return
+        with self._lock:
+            entry = self.entries.get(symbol)
+            if symbol not in self._previous_entries:
+                self._previous_entries[symbol] = dict(entry) if entry else None
+            self.run_stats['failures'] += 1
+            if entry is None:
+                entry = {'first_failure': self.today.isoformat(), 'failures': 0, 'total_failures': 0}
+                self.run_stats['new_quarantined'] += 1
+            entry['failures'] += 1
+            entry['total_failures'] += 1
+            entry['failure_type'] = failure_type
+            entry['attempts'] = int(attempts)
+            entry['last_failure'] = self.today.isoformat()
+            entry['quarantined_until'] = (self.today + timedelta(days=self.backoff_days(entry['failures']))).isoformat()
+            self.entries[symbol] = entry
+
+    def record_success(self, symbol):
+        """Datos válidos: el símbolo sale de la cuarentena"""
+        with self._lock:
+            self.run_stats['successes'] += 1
+            if self.entries.pop(symbol, None) is not None:
+                self.run_stats['released'] += 1
+
+    def summary(self):
+        with self._lock:
+            active = sum(1 for entry in self.entries.values()
+                         if date.fromisoformat(entry['quarantined_until']) > self.today)
+            return {
+                'registry_size': len(self.entries),
+                'active': active,
+                'requests_saved_total': self.requests_saved_total,
+                **self.run_stats
+            }
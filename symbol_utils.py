@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Symbol Utils - Utilidades de símbolos sin dependencias pesadas
+==============================================================
+
+🪶 Solo librería estándar: importable desde cualquier script sin cargar pandas/yfinance
+🔎 quick_filter_symbol: descarte rápido de símbolos problemáticos
+🔤 normalize_symbol: formato NASDAQ -> formato Yahoo Finance
+"""
+
+
+def quick_filter_symbol(symbol):
+    """Filtro rápido para descartar símbolos obvios sin requests pesados"""
+    if not symbol or len(symbol) > 6:
+        return False
+
+    # Skip símbolos problemáticos conocidos
+    problem_patterns = ['^', '.PK', '.OB', 'WARR', 'TEST']
+    for pattern in problem_patterns:
+        if pattern in symbol:
+            return False
+
+    # Skip penny stocks típicos por patrones de nombre
+    if len(symbol) >= 4 and symbol.endswith(('Q', 'E', 'F')):
+        return False
+
+    return True
+
+
+def normalize_symbol(symbol):
+    """Convierte símbolos de formato NASDAQ a formato Yahoo Finance"""
+    if not symbol or not isinstance(symbol, str):
+        return symbol
+
+    symbol = symbol.strip().upper()
+
+    if symbol.startswith('^'):
+        return symbol
+
+    if symbol.endswith('Q') and len(symbol) > 1:
+        return symbol
+
+    # Preferred stocks
+    if '^' in symbol:
+        parts = symbol.split('^')
+        if len(parts) == 2:
+            base, suffix = parts
+            if suffix.isalpha() and len(suffix) <= 2:
+                return f"{base}-P{suffix}"
+
+    if 'p' in symbol and len(symbol) > 3:
+        p_index = symbol.rfind('p')
+        if p_index > 0 and p_index < len(symbol) - 1:
+            base = symbol[:p_index]
+            suffix = symbol[p_index + 1:]
+            if len(suffix) <= 2 and suffix.isalnum():
+                return f"{base}-P{suffix}"
+
+    # Class shares con punto
+    if '.' in symbol:
+        parts = symbol.split('.')
+        if len(parts) == 2 and len(parts[1]) <= 2:
+            return f"{parts[0]}-{parts[1]}"
+
+    return symbol
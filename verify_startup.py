@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script para verificar el tiempo de arranque de cada subcomando de cli.py
+- Cada subcomando se importa en un intérprete limpio (subproceso)
+- Los subcomandos ligeros no pueden cargar pandas/numpy/yfinance/requests
+- El tiempo de import debe quedar por debajo del presupuesto (STARTUP_BUDGET_SECONDS)
+"""
+import json
+import os
+import subprocess
+import sys
+
+from cli import COMMANDS, LIGHT_COMMANDS, VERIFY_TARGETS
+
+LIGHT_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', '0.5'))
+RUNS_PER_COMMAND = 3  # Se toma el mejor de N para reducir ruido
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import cli
+for module_name, function_name in json.loads(sys.argv[1]):
+    cli.load_command(module_name, function_name)
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'heavy': [m for m in cli.HEAVY_MODULES if m in sys.modules]}))
+"""
+
+
+def _command_targets(command):
+    if command == 'verify':
+        return [target for name, target in VERIFY_TARGETS.items() if name != 'startup']
+    module_name, function_name, _ = COMMANDS[command]
+    return [(module_name, function_name)]
+
+
+def measure_startup(command, runs=RUNS_PER_COMMAND):
+    """Mide el import del subcomando en un intérprete limpio (mejor de N)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE, json.dumps(_command_targets(command))],
+            cwd=here, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def verify_startup():
+    try:
+        print(f"=== TIEMPO DE ARRANQUE POR SUBCOMANDO (presupuesto ligeros: {LIGHT_BUDGET_SECONDS:.2f}s) ===")
+        all_ok = True
+
+        for command in list(COMMANDS) + ['verify']:
+            result = measure_startup(command)
+            seconds = result['seconds']
+
+            if command in LIGHT_COMMANDS:
+                heavy_ok = not result['heavy']
+                time_ok = seconds <= LIGHT_BUDGET_SECONDS
+                status = '✅' if heavy_ok and time_ok else '❌'
+                print(f"{status} {command:<17} {seconds * 1000:7.1f} ms")
+                if not heavy_ok:
+                    print(f"   ERROR: carga módulos pesados: {', '.join(result['heavy'])}")
+                if not time_ok:
+                    print(f"   ERROR: supera el presupuesto de {LIGHT_BUDGET_SECONDS:.2f}s")
+                all_ok = all_ok and heavy_ok and time_ok
+            else:
+                # `screen` necesita pandas/yfinance: solo se informa
+                print(f"ℹ️ {command:<17} {seconds * 1000:7.1f} ms (pesado: {', '.join(result['heavy']) or 'ninguno'})")
+
+        return all_ok
+
+    except Exception as e:
+        print(f"ERROR verificando tiempo de arranque: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = verify_startup()
+    sys.exit(0 if success else 1)
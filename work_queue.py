@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Work Queue - Cola compartida de símbolos con concurrencia auto-ajustada
+======================================================================
+
+🧺 Elementos de trabajo pequeños (SCREENER_BATCH_SIZE símbolos, 1 por defecto) en una cola común:
+   un hilo libre toma el siguiente, sin lotes fijos que dejen hilos ociosos al final
+📈 Concurrencia AIMD: +1 hilo activo por ventana con latencia estable, /2 si aparecen 429
+🔢 Rango configurable (SCREENER_MIN_WORKERS..SCREENER_MAX_WORKERS, inicio SCREENER_WORKERS)
+📊 Resumen de ajustes para run_metrics.json (extra 'concurrency')
+"""
+
+import queue
+import threading
+import time
+
+ADJUST_WINDOW = 20              # Elementos completados entre ajustes
+RATE_LIMIT_TOLERANCE = 0.02     # Fracción de 429 por elemento a partir de la que se reduce a la mitad
+LATENCY_TOLERANCE = 1.5         # Latencia media > 1.5x la mejor observada: no se sube
+LATENCY_BACKOFF = 2.5           # Latencia media > 2.5x la mejor observada: -1 hilo
+
+
+class AdaptiveConcurrency:
+    """Límite de hilos activos ajustado por incremento aditivo / decremento multiplicativo"""
+
+    def __init__(self, initial, minimum=1, maximum=None, rate_limit_probe=None, window=ADJUST_WINDOW):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum or initial)
+        self.initial = min(max(initial, self.minimum), self.maximum)
+        self.limit = self.initial
+        self.window = window
+        self.rate_limit_probe = rate_limit_probe  # -> total de 429 observados hasta ahora
+        self._condition = threading.Condition()
+        self.active = 0
+        self._latencies = []
+        self._last_rate_limited = rate_limit_probe() if rate_limit_probe else 0
+        self.best_latency = None
+        self.peak = self.limit
+        self.increases = 0
+        self.decreases = 0
+        self.completed = 0
+        self.limit_samples = []
+
+    def acquire(self):
+        with self._condition:
+            while self.active >= self.limit:
+                self._condition.wait()
+            self.active += 1
+
+    def release(self, seconds=None):
+        """Libera el hueco y registra la latencia del elemento (None: no llegó a procesar nada)"""
+        with self._condition:
+            self.active -= 1
+            if seconds is not None:
+                self.completed += 1
+                self._latencies.append(seconds)
+                if len(self._latencies) >= self.window:
+                    self._adjust()
+            self._condition.notify_all()
+
+    def _adjust(self):
+        average = sum(self._latencies) / len(self._latencies)
+        items = len(self._latencies)
+        self._latencies = []
+
+        rate_limited = 0
+        if self.rate_limit_probe:
+            total = self.rate_limit_probe()
+            rate_limited = total - self._last_rate_limited
+            self._last_rate_limited = total
+
+        if self.best_latency is None or average < self.best_latency:
+            self.best_latency = average
+
+        if rate_limited / items > RATE_LIMIT_TOLERANCE:
+            new_limit = max(self.minimum, self.limit // 2)
+        elif average > self.best_latency * LATENCY_BACKOFF:
+            new_limit = max(self.minimum, self.limit - 1)
+        elif average <= self.best_latency * LATENCY_TOLERANCE:
+            new_limit = min(self.maximum, self.limit + 1)
+        else:
+            new_limit = self.limit
+
+        if new_limit > self.limit:
+            self.increases += 1
+        elif new_limit < self.limit:
+            self.decreases += 1
+        self.limit = new_limit
+        self.peak = max(self.peak, new_limit)
+        self.limit_samples.append(new_limit)
+
+    def summary(self):
+        with self._condition:
+            samples = self.limit_samples or [self.limit]
+            return {
+                'initial': self.initial,
+                'minimum': self.minimum,
+                'maximum': self.maximum,
+                'final': self.limit,
+                'peak': self.peak,
+                'average': round(sum(samples) / len(samples), 2),
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'items_completed': self.completed,
+                'best_item_latency_ms': round(self.best_latency * 1000, 1) if self.best_latency else None
+            }
+
+
+def chunk(items, size):
+    """Elementos de trabajo de `size` símbolos (el último puede ser menor)"""
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_work_queue(work_items, worker, controller, on_result=None):
+    """
+    Procesa work_items (en orden de cola) con controller.maximum hilos, de los que solo
+    controller.limit trabajan a la vez. on_result(índice, resultado) se llama serializado.
+    Devuelve los resultados en orden de finalización (None si el worker falló)
+    """
+    pending = queue.Queue()
+    for index, item in enumerate(work_items):
+        pending.put((index, item))
+
+    results = []
+    results_lock = threading.Lock()
+
+    def run():
+        while True:
+            # Primero el hueco y luego el elemento: la cola conserva el orden de prioridad
+            controller.acquire()
+            try:
+                index, item = pending.get_nowait()
+            except queue.Empty:
+                controller.release()
+                return
+            start = time.perf_counter()
+            try:
+                result = worker(item)
+            except Exception:
+                result = None
+            finally:
+                controller.release(time.perf_counter() - start)
+            with results_lock:
+                results.append(result)
+                if on_result:
+                    try:
+                        on_result(index, result)
+                    except Exception:
+                        pass  # El progreso nunca detiene el procesamiento
+
+    threads = [threading.Thread(target=run, daemon=True)
+               for _ in range(min(controller.maximum, len(work_items)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results